@@ -8,7 +8,17 @@ import hashlib
 import logging
 import os
 import uuid
-from typing import Awaitable, Callable, List, Optional, Tuple, TypeVar, Union, cast
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
 
 import flask_sqlalchemy
 import jwt
@@ -20,6 +30,7 @@ from sqlalchemy.sql import expression
 from typing_extensions import ParamSpec
 
 from backend import config, routes, util
+from game.decision_functions import memory, opening_book, profiling
 
 compat.register()
 
@@ -35,6 +46,12 @@ logger.info("Connected to %s", os.environ["DATABASE_URL"])
 
 _C: config.Config = config.get()
 logger.info(f"Configuration: {_C}")
+if _C.PROFILE_SEARCH:
+    profiling.enable()
+if _C.TRACE_MEMORY:
+    memory.start_tracing()
+# Before any search forks workers, so they share the mapping.
+opening_book.load()
 
 # For Database support.
 db = flask_sqlalchemy.SQLAlchemy(app)
@@ -198,6 +215,23 @@ async def hello_world() -> str:
     return "<p>Hello, World!</p>"
 
 
+@debuggable
+@app.route("/search_profile", methods=["GET"])  # pyre-ignore[56]
+async def search_profile() -> Union[profiling.SerializedProfile, Dict[str, str]]:
+    """Where the AI searches spent their time, if PROFILE_SEARCH is set."""
+    if (profile := profiling.current()) is None:
+        return {"message": "Search profiling is disabled."}
+    return profile.to_json()
+
+
+@debuggable
+@app.route("/memory", methods=["GET"])  # pyre-ignore[56]
+async def memory_usage() -> memory.MemoryUsage:
+    """Memory used by the AI caches and loaded games. Set TRACE_MEMORY to also
+    report the lines that allocated the most memory."""
+    return memory.usage(routes.live_games())
+
+
 @sio.event  # pyre-ignore[56]
 @login_required
 async def list_games(username: str, sid: str) -> routes.ListGamesResponse:
@@ -329,7 +363,12 @@ async def act(
     else:
         session = await sio.get_session(sid)
         responses = await routes.action(
-            data, session.get("playerIdx"), username, fetchGame, saveGame
+            data,
+            session.get("playerIdx"),
+            username,
+            fetchGame,
+            saveGame,
+            ponder=_C.PONDER,
         )
     # Send in one-update to maintain order.
     await sio.emit("update", responses, room=gameIdStr)
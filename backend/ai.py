@@ -13,6 +13,10 @@ AIFunc = Callable[[state.GameState], int]
 class AILevel(enum.Enum):
     EASY = 1
     MEDIUM = 2
+    # Numbered after HARD so pickled games keep their levels.
+    ADVANCED = 4
+    # Does not see the draw order, unlike HARD.
+    FAIR = 5
     HARD = 3
 
     @staticmethod
@@ -20,7 +24,7 @@ class AILevel(enum.Enum):
         if not label:
             return None
         label = label.upper()
-        if label in ("EASY", "MEDIUM", "HARD"):
+        if label in ("EASY", "MEDIUM", "ADVANCED", "FAIR", "HARD"):
             return AILevel[label]
         return None
 
@@ -34,6 +38,8 @@ def get() -> Mapping[AILevel, AIFunc]:
         _AIs = {
             AILevel.EASY: ai.first_move,
             AILevel.MEDIUM: ai.random,
+            AILevel.ADVANCED: ai.heuristic_ai,
+            AILevel.FAIR: ai.pimc_ai,
             AILevel.HARD: ai.oracle_ai,
         }
     return _AIs
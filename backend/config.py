@@ -9,6 +9,9 @@ class Config:
     RESET_DATABASE: bool
     RESET_USERS: bool
     RESET_GAMES: bool
+    PONDER: bool
+    PROFILE_SEARCH: bool
+    TRACE_MEMORY: bool
 
     def __init__(self) -> None:
         _VALID_TRUE = ["true", "1", "t", "y", "yes"]
@@ -17,6 +20,13 @@ class Config:
         self.RESET_DATABASE = os.environ.get("DROP_ALL", "false").lower() in _VALID_TRUE
         self.RESET_USERS = os.environ.get("DROP_USERS", "false").lower() in _VALID_TRUE
         self.RESET_GAMES = os.environ.get("DROP_GAMES", "false").lower() in _VALID_TRUE
+        self.PONDER = os.environ.get("PONDER", "false").lower() in _VALID_TRUE
+        self.PROFILE_SEARCH = (
+            os.environ.get("PROFILE_SEARCH", "false").lower() in _VALID_TRUE
+        )
+        self.TRACE_MEMORY = (
+            os.environ.get("TRACE_MEMORY", "false").lower() in _VALID_TRUE
+        )
 
         assert self.SECRET_KEY
 
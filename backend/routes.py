@@ -1,8 +1,10 @@
+import asyncio
 import copy
 import dataclasses
 import datetime as datetime_lib
 import enum
 import uuid
+import weakref
 from datetime import datetime
 from typing import (
     Any,
@@ -22,6 +24,7 @@ from typing_extensions import NotRequired, TypedDict
 
 from backend import ai
 from game import info, ra
+from game.decision_functions import ponder, session
 
 
 @enum.unique
@@ -51,6 +54,7 @@ class RaExecutor(ra.RaGame, mutable.Mutable):
     """Required so database can update on changes to state."""
 
     def __init__(self, num_players: Optional[int] = None, **kwargs: Any) -> None:
+        _LIVE_GAMES.add(self)
         self._kwargs: Dict[str, Any] = kwargs
         self._player_names: List[str] = kwargs.get("player_names", [])
         self._players: List[PlayerInfo] = [
@@ -60,6 +64,8 @@ class RaExecutor(ra.RaGame, mutable.Mutable):
             num_players if num_players is not None else len(self._players)
         )
         self._initialized: bool = False
+        # Identifies the search session shared by the AI players of this game.
+        self._session_id: str = uuid.uuid4().hex
         if len(self._players) == self._num_players:
             self._init_game()
 
@@ -91,10 +97,53 @@ class RaExecutor(ra.RaGame, mutable.Mutable):
             # Not an AI.
             return None
         name = self.player_names[self.game_state.current_player]
-        action = ai.get()[level](self.game_state)
+        search_session = session.get(self.session_id())
+        # Never blocks. Callers on the event loop wait for pondering to stop through
+        # stop_pondering in an executor first.
+        search_session.stop_pondering(timeout=0)
+        with session.activate(search_session):
+            action = ai.get()[level](self.game_state)
         self.execute_action(action)
+        if self.game_state.is_game_ended():
+            self.release_session()
         return name, action
 
+    def session_id(self) -> str:
+        """Returns the id of the search session used by the AI players."""
+        if not hasattr(self, "_session_id"):
+            # Games pickled before search sessions existed.
+            self._session_id = uuid.uuid4().hex
+        return self._session_id
+
+    def release_session(self) -> None:
+        """Frees the search state of this game. It is rebuilt if ever needed again."""
+        session.release(self.session_id())
+
+    def start_pondering(self) -> bool:
+        """Searches the replies of the current human player in the background.
+
+        Only the HARD AI searches, so we only ponder for games with one.
+
+        Returns if pondering started.
+        """
+        if (
+            not self.initialized()
+            or self.game_state.is_game_ended()
+            or self._players[self.game_state.current_player].quality
+            or ai.AILevel.HARD not in [player.quality for player in self._players]
+        ):
+            return False
+        ponder.start(self.game_state, session.get(self.session_id()))
+        return True
+
+    def stop_pondering(self) -> None:
+        """Cancels any pondering, keeping what was already searched.
+
+        Waits for the background search to stop, so run it in an executor.
+        """
+        if (search_session := session.find(self.session_id())) is not None:
+            search_session.stop_pondering()
+
     def add_ai_players(self, levels: List[ai.AILevel]) -> bool:
         """Adds AI players of the specified levels to the game.
 
@@ -168,6 +217,19 @@ class RaExecutor(ra.RaGame, mutable.Mutable):
         d.pop("_parents", None)
         return d
 
+    def __setstate__(self, state: Dict[str, str]) -> None:
+        self.__dict__.update(state)
+        _LIVE_GAMES.add(self)
+
+
+# Every game loaded in this process, until it is garbage collected.
+_LIVE_GAMES: "weakref.WeakSet[RaExecutor]" = weakref.WeakSet()
+
+
+def live_games() -> List[RaExecutor]:
+    """Returns the initialized games currently loaded in this process."""
+    return [game for game in _LIVE_GAMES if game.initialized()]
+
 
 @enum.unique
 class Status(enum.Enum):
@@ -471,6 +533,7 @@ async def delete(
         )
     if not await persistDelete(gameId):
         return WarningMessage(message=f"No game with id {gameId} found."), None
+    game.release_session()
     return SuccessMessage(message=f"Deleted game: {gameId}"), single_game(str(gameId))
 
 
@@ -481,6 +544,7 @@ async def action(
     username: str,
     fetchGame: Callable[[uuid.UUID], Awaitable[Optional[RaExecutor]]],
     saveGame: Callable[[uuid.UUID, RaExecutor], Awaitable[bool]],
+    ponder: bool = False,
 ) -> Union[Message, List[ActionResponse]]:
     """Performs the action as specified by the request.
 
@@ -491,6 +555,8 @@ async def action(
         fetchGame: A funcion that generates a game for the provided game UUID.
         saveGame: A function that given a game, persist it in storage under the
             provided UUID.
+        ponder: When set, AI players keep searching in the background while the
+            next human player thinks.
 
     Returns:
         The reponse to return to the client as well as boolean indicating if
@@ -544,6 +610,8 @@ async def action(
         ]
         return InfoMessage(message=f"Only legal actions are: {description}")
 
+    # Waiting for the cancelled search must not block the event loop.
+    await asyncio.get_running_loop().run_in_executor(None, game.stop_pondering)
     game.execute_action(parsedAction, legal_actions)
     responses = [
         ActionResponse(
@@ -565,6 +633,8 @@ async def action(
     if not (await saveGame(gameId, game)):
         return ErrorMessage(f"Failed to update game: {gameId}. Repeat action.")
 
+    if ponder:
+        game.start_pondering()
     return responses
 
 
@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import patch
 
 from backend import ai, ai_names
+from game import decision_functions
 
 
 class TestAI(unittest.TestCase):
@@ -11,6 +12,8 @@ class TestAI(unittest.TestCase):
         self.assertIsNone(ai.AILevel.from_str("invalid"))
         self.assertEqual(ai.AILevel.from_str("easy"), ai.AILevel.EASY)
         self.assertEqual(ai.AILevel.from_str("Medium"), ai.AILevel.MEDIUM)
+        self.assertEqual(ai.AILevel.from_str("advanced"), ai.AILevel.ADVANCED)
+        self.assertEqual(ai.AILevel.from_str("Fair"), ai.AILevel.FAIR)
         self.assertEqual(ai.AILevel.from_str("haRD"), ai.AILevel.HARD)
 
     @patch.object(ai_names, "ALL", new=["koala"])  # pyre-ignore[56]
@@ -29,5 +32,13 @@ class TestAI(unittest.TestCase):
 
     def test_get(self) -> None:
         self.assertSequenceEqual(
-            list(ai.get().keys()), [ai.AILevel.EASY, ai.AILevel.MEDIUM, ai.AILevel.HARD]
+            list(ai.get().keys()),
+            [
+                ai.AILevel.EASY,
+                ai.AILevel.MEDIUM,
+                ai.AILevel.ADVANCED,
+                ai.AILevel.FAIR,
+                ai.AILevel.HARD,
+            ],
         )
+        self.assertIs(ai.get()[ai.AILevel.FAIR], decision_functions.pimc_ai)
@@ -14,10 +14,13 @@ class ConfigTest(unittest.TestCase):
         self.assertEqual(
             str(config.get()),
             """{'DEBUG': True,
+ 'PONDER': False,
+ 'PROFILE_SEARCH': False,
  'RESET_DATABASE': False,
  'RESET_GAMES': False,
  'RESET_USERS': False,
- 'SECRET_KEY': 'debug'}""",
+ 'SECRET_KEY': 'debug',
+ 'TRACE_MEMORY': False}""",
         )
 
     @patch.dict(os.environ, {}, clear=True)
@@ -32,6 +35,9 @@ class ConfigTest(unittest.TestCase):
         self.assertEqual(C.RESET_DATABASE, False)
         self.assertEqual(C.RESET_GAMES, False)
         self.assertEqual(C.RESET_USERS, False)
+        self.assertEqual(C.PONDER, False)
+        self.assertEqual(C.PROFILE_SEARCH, False)
+        self.assertEqual(C.TRACE_MEMORY, False)
         self.assertEqual(C.SECRET_KEY, "secret_key")
 
     @patch.dict(os.environ, {"DEBUG": "true"}, clear=True)
@@ -51,6 +57,9 @@ class ConfigTest(unittest.TestCase):
             "DROP_ALL": "false",
             "DROP_GAMES": "true",
             "DROP_USERS": "yes",
+            "PONDER": "1",
+            "PROFILE_SEARCH": "t",
+            "TRACE_MEMORY": "yes",
         },
         clear=True,
     )
@@ -60,4 +69,7 @@ class ConfigTest(unittest.TestCase):
         self.assertEqual(C.RESET_DATABASE, False)
         self.assertEqual(C.RESET_GAMES, True)
         self.assertEqual(C.RESET_USERS, True)
+        self.assertEqual(C.PONDER, True)
+        self.assertEqual(C.PROFILE_SEARCH, True)
+        self.assertEqual(C.TRACE_MEMORY, True)
         self.assertEqual(C.SECRET_KEY, "secret_key")
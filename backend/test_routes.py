@@ -12,6 +12,7 @@ import jwt
 
 from backend import ai, ai_names, routes
 from game import info, ra
+from game.decision_functions import session
 
 
 class TestVisibility(unittest.TestCase):
@@ -49,6 +50,15 @@ class TestRaExector(unittest.TestCase):
         self.assertEqual(game.maybe_add_player("test1"), 0)
         self.assertEqual(game.maybe_add_player("test2"), 1)
 
+    def test_live_games(self) -> None:
+        game = routes.RaExecutor(num_players=2, randomize_play_order=False)
+        self.assertNotIn(game, routes.live_games())
+        game.maybe_add_player("test1")
+        game.maybe_add_player("test2")
+        self.assertIn(game, routes.live_games())
+        # Games loaded from the database are unpickled.
+        self.assertIn(copy.deepcopy(game), routes.live_games())
+
     def test_add_ai_players(self) -> None:
         game = routes.RaExecutor(num_players=3, randomize_play_order=False)
 
@@ -69,6 +79,15 @@ class TestRaExector(unittest.TestCase):
         self.assertIn("human", game.get_player_names())
         self.assertEqual(len(game.get_player_names()), 3)
 
+    def test_add_fair_ai_players(self) -> None:
+        game = routes.RaExecutor(num_players=2, randomize_play_order=False)
+        self.assertEqual(game.maybe_add_player("human"), 0)
+        self.assertTrue(game.add_ai_players(levels=[ai.AILevel.FAIR]))
+        self.assertTrue(game.initialized())
+        self.assertTrue(game.get_player_names()[1].startswith("Fair "))
+        # Only HARD AIs search ahead of their turn.
+        self.assertFalse(game.start_pondering())
+
     def test_add_ai_players_last(self) -> None:
         game = routes.RaExecutor(num_players=3, randomize_play_order=False)
 
@@ -95,6 +114,38 @@ class TestRaExector(unittest.TestCase):
         self.assertEqual(game.get_player_names(), ["human", name])
         self.assertEqual(len(game.logged_moves), 2)
 
+    def test_session_id(self) -> None:
+        game = routes.RaExecutor(num_players=2)
+        other = routes.RaExecutor(num_players=2)
+        self.assertNotEqual(game.session_id(), other.session_id())
+
+        # Games pickled before sessions existed get one on first use.
+        del game.__dict__["_session_id"]
+        self.assertEqual(game.session_id(), game.session_id())
+
+        search_session = session.get(game.session_id())
+        self.assertIs(session.get(game.session_id()), search_session)
+        game.release_session()
+        self.assertIsNot(session.get(game.session_id()), search_session)
+        game.release_session()
+
+    def test_start_pondering(self) -> None:
+        game = routes.RaExecutor(num_players=2, randomize_play_order=False)
+        self.assertEqual(game.maybe_add_player("human"), 0)
+        self.assertTrue(game.add_ai_players(levels=[ai.AILevel.EASY]))
+        # Only HARD AIs search.
+        self.assertFalse(game.start_pondering())
+
+        game = routes.RaExecutor(num_players=2, randomize_play_order=False)
+        self.assertEqual(game.maybe_add_player("human"), 0)
+        self.assertTrue(game.add_ai_players(levels=[ai.AILevel.HARD]))
+        self.assertTrue(game.start_pondering())
+        game.stop_pondering()
+        search_session = session.find(game.session_id())
+        assert search_session is not None
+        self.assertFalse(search_session.is_pondering())
+        game.release_session()
+
 
 class RoutesTest(unittest.TestCase):
     def test_single_game(self) -> None:
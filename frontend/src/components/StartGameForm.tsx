@@ -30,8 +30,9 @@ function StartGameForm(): JSX.Element {
   const [numPlayers, setNumPlayers] = useState<number>(2);
   // Number of AI players. numPlayers - numAIPlayers is the number of human players.
   const [numAIPlayers, setNumAIPlayers] = useState<number>(1);
-  // The difficulty. Rough mapping is 0 => Easy, 1 => Medium, 2 => Hard.
-  const [aiLevelIdx, setAILevelIdx] = useState<number>(2);
+  // The difficulty. Rough mapping is 0 => Easy, 1 => Medium, 2 => Advanced,
+  // 3 => Fair, 4 => Hard.
+  const [aiLevelIdx, setAILevelIdx] = useState<number>(4);
 
   const handleNewGame = useCallback((visibility: Visibility) => {
     const request: StartRequest = {
@@ -109,7 +110,7 @@ function StartGameForm(): JSX.Element {
                   size="medium"
                   step={1}
                   min={0}
-                  max={2}
+                  max={AILevels.length - 1}
                   valueLabelDisplay="auto"
                   valueLabelFormat={(idx: number) => AILevels[idx]}
                   disabled={numAIPlayers <= 0}
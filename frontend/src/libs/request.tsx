@@ -17,7 +17,7 @@ type ActionResponse = {
   username: string;
 };
 
-const AILevels = ['EASY', 'MEDIUM', 'HARD'] as const;
+const AILevels = ['EASY', 'MEDIUM', 'ADVANCED', 'FAIR', 'HARD'] as const;
 type AILevel = typeof AILevels[number];
 type StartRequest = {
   // The number of *human* players.
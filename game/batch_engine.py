@@ -0,0 +1,823 @@
+"""
+Lockstep engine stepping many games of Ra at once.
+
+Instead of one GameState per game, the state of every game lives in flat typed
+arrays laid out game-major (games x players x tile types, games x draw order, ...),
+and legal_mask and step advance every game in a single pass over them. This is
+meant for self-play, data generation and rollouts, where the per-game object graph
+and deep copies of GameState dominate.
+
+The rules, including their quirks, mirror ra.get_possible_actions and
+ra.execute_action_internal exactly. BatchState converts to and from GameState so
+the two engines can be cross-checked.
+"""
+import array
+import random
+from typing import List, Optional, Sequence, Tuple
+
+from game import info as gi
+from game import state as gs
+
+NUM_ACTIONS: int = len(gi.ACTION_MAPPING)
+# Most suns a player can hold, usable or not.
+MAX_SUNS: int = max(
+    len(suns) for sun_sets in gi.STARTING_SUN.values() for suns in sun_sets
+)
+# Stands in for None in the arrays, eg. for players that have not bid.
+NONE: int = -1
+
+_NUM_COLLECTIBLES: int = gi.NUM_COLLECTIBLE_TILE_TYPES
+_CIVS: range = range(gi.STARTING_INDEX_OF_CIVS, gi.STARTING_INDEX_OF_CIVS + gi.NUM_CIVS)
+_MONUMENTS: range = range(
+    gi.STARTING_INDEX_OF_MONUMENTS, gi.STARTING_INDEX_OF_MONUMENTS + gi.NUM_MONUMENTS
+)
+_DISASTERS: range = range(
+    gi.STARTING_INDEX_OF_DISASTERS, gi.STARTING_INDEX_OF_DISASTERS + gi.NUM_DISASTERS
+)
+_TEMPORARY: List[int] = gi.list_of_temporary_collectible_indexes()
+
+
+class BatchState:
+    """The state of num_games games with the same number of players.
+
+    Arrays holding one value per player are indexed by game * num_players + player,
+    and those holding several values per player (collections, suns) by that index
+    times the number of values. Empty sun slots and missing bids hold NONE.
+    """
+
+    __slots__ = (
+        "num_games",
+        "num_players",
+        "num_ras_per_round",
+        "player_names",
+        # Per game, draw order and tiles left of each type.
+        "draw_order",
+        "draw_cursor",
+        "bag",
+        # Per game.
+        "current_round",
+        "num_ras_this_round",
+        "center_sun",
+        "auction_tiles",
+        "num_auction_tiles",
+        "auction_started",
+        "auction_forced",
+        "auction_start_player",
+        "current_player",
+        "num_mons_to_discard",
+        "num_civs_to_discard",
+        "auction_winning_player",
+        "game_ended",
+        # Per game and player.
+        "active",
+        "auction_suns",
+        "points",
+        "collection",
+        "usable_sun",
+        "num_usable_sun",
+        "unusable_sun",
+        "num_unusable_sun",
+    )
+
+    def __init__(
+        self,
+        num_games: int,
+        num_players: int,
+        player_names: Optional[Sequence[str]] = None,
+    ) -> None:
+        """Allocates the arrays of num_games games, without dealing them."""
+        if num_players not in gi.STARTING_SUN:
+            raise ValueError(f"Cannot have {num_players} players")
+        self.num_games = num_games
+        self.num_players = num_players
+        self.num_ras_per_round = gi.NUM_RAS_PER_ROUND[num_players]
+        self.player_names: List[str] = list(
+            player_names or [f"P{idx + 1}" for idx in range(num_players)]
+        )
+        assert len(self.player_names) == num_players, "One name per player"
+        num_seats = num_games * num_players
+
+        self.draw_order = array.array("b", [0]) * (num_games * gi.STARTING_NUM_TILES)
+        self.draw_cursor = array.array("h", [0]) * num_games
+        self.bag = array.array("b", [0]) * (num_games * gi.NUM_TILE_TYPES)
+
+        self.current_round = array.array("b", [1]) * num_games
+        self.num_ras_this_round = array.array("b", [0]) * num_games
+        self.center_sun = array.array("b", [gi.STARTING_CENTER_SUN]) * num_games
+        self.auction_tiles = array.array("b", [0]) * (num_games * gi.MAX_AUCTION_TILES)
+        self.num_auction_tiles = array.array("b", [0]) * num_games
+        self.auction_started = array.array("b", [0]) * num_games
+        self.auction_forced = array.array("b", [0]) * num_games
+        self.auction_start_player = array.array("b", [NONE]) * num_games
+        self.current_player = array.array("b", [0]) * num_games
+        self.num_mons_to_discard = array.array("b", [0]) * num_games
+        self.num_civs_to_discard = array.array("b", [0]) * num_games
+        self.auction_winning_player = array.array("b", [NONE]) * num_games
+        self.game_ended = array.array("b", [0]) * num_games
+
+        self.active = array.array("b", [1]) * num_seats
+        self.auction_suns = array.array("b", [NONE]) * num_seats
+        self.points = array.array("h", [gi.STARTING_PLAYER_POINTS]) * num_seats
+        self.collection = array.array("b", [0]) * (num_seats * _NUM_COLLECTIBLES)
+        self.usable_sun = array.array("b", [NONE]) * (num_seats * MAX_SUNS)
+        self.num_usable_sun = array.array("b", [0]) * num_seats
+        self.unusable_sun = array.array("b", [NONE]) * (num_seats * MAX_SUNS)
+        self.num_unusable_sun = array.array("b", [0]) * num_seats
+
+    def deal(self, game: int, rng: random.Random) -> None:
+        """Starts a new game in the given slot, shuffling like GameState does."""
+        draw_order = [
+            idx
+            for idx, tile in enumerate(gi.TILE_INFO)
+            for _ in range(gi.tile_starting_num(tile))
+        ]
+        rng.shuffle(draw_order)
+        # Sorted since GameState shuffles the starting sun sets in place.
+        sun_sets = sorted(suns[:] for suns in gi.STARTING_SUN[self.num_players])
+        other_sets = sun_sets[1:]
+        rng.shuffle(other_sets)
+        sun_sets[1:] = other_sets
+        self._load_bag(game, draw_order, gi.STARTING_NUM_TILES, None)
+
+        self.current_round[game] = 1
+        self.num_ras_this_round[game] = 0
+        self.center_sun[game] = gi.STARTING_CENTER_SUN
+        self.num_auction_tiles[game] = 0
+        self.auction_started[game] = 0
+        self.auction_forced[game] = 0
+        self.auction_start_player[game] = NONE
+        self.current_player[game] = 0
+        self.num_mons_to_discard[game] = 0
+        self.num_civs_to_discard[game] = 0
+        self.auction_winning_player[game] = NONE
+        self.game_ended[game] = 0
+        for player, suns in enumerate(sun_sets):
+            seat = game * self.num_players + player
+            self.active[seat] = 1
+            self.auction_suns[seat] = NONE
+            self.points[seat] = gi.STARTING_PLAYER_POINTS
+            start = seat * _NUM_COLLECTIBLES
+            self.collection[start : start + _NUM_COLLECTIBLES] = array.array(
+                "b", [0] * _NUM_COLLECTIBLES
+            )
+            self._set_suns(seat, sorted(suns), [])
+
+    def _load_bag(
+        self,
+        game: int,
+        draw_order: Sequence[int],
+        num_tiles_left: int,
+        bag: Optional[Sequence[int]],
+    ) -> None:
+        assert (
+            len(draw_order) == gi.STARTING_NUM_TILES
+        ), f"Expected a draw order of {gi.STARTING_NUM_TILES} tiles"
+        start = game * gi.STARTING_NUM_TILES
+        self.draw_order[start : start + gi.STARTING_NUM_TILES] = array.array(
+            "b", draw_order
+        )
+        self.draw_cursor[game] = gi.STARTING_NUM_TILES - num_tiles_left
+        if bag is None:
+            counts = [0] * gi.NUM_TILE_TYPES
+            for tile in draw_order:
+                counts[tile] += 1
+            bag = counts
+        start = game * gi.NUM_TILE_TYPES
+        self.bag[start : start + gi.NUM_TILE_TYPES] = array.array("b", bag)
+
+    def _set_suns(
+        self, seat: int, usable_sun: Sequence[int], unusable_sun: Sequence[int]
+    ) -> None:
+        start = seat * MAX_SUNS
+        padding = [NONE] * MAX_SUNS
+        self.usable_sun[start : start + MAX_SUNS] = array.array(
+            "b", [*usable_sun, *padding][:MAX_SUNS]
+        )
+        self.num_usable_sun[seat] = len(usable_sun)
+        self.unusable_sun[start : start + MAX_SUNS] = array.array(
+            "b", [*unusable_sun, *padding][:MAX_SUNS]
+        )
+        self.num_unusable_sun[seat] = len(unusable_sun)
+
+    @classmethod
+    def from_game_states(cls, game_states: Sequence[gs.GameState]) -> "BatchState":
+        """Packs games with the same players, eg. to continue them in lockstep."""
+        assert game_states, "Cannot batch zero games"
+        num_players = game_states[0].get_num_players()
+        states = cls(len(game_states), num_players, game_states[0].player_names)
+        for game, game_state in enumerate(game_states):
+            assert game_state.get_num_players() == num_players, "Mixed player counts"
+            tile_bag = game_state.get_tile_bag()
+            states._load_bag(
+                game,
+                tile_bag.get_draw_order(),
+                tile_bag.get_num_tiles_left(),
+                tile_bag.get_bag_contents(),
+            )
+            states.current_round[game] = game_state.current_round
+            states.num_ras_this_round[game] = game_state.num_ras_this_round
+            states.center_sun[game] = game_state.center_sun
+            num_tiles = len(game_state.auction_tiles)
+            start = game * gi.MAX_AUCTION_TILES
+            states.auction_tiles[start : start + num_tiles] = array.array(
+                "b", game_state.auction_tiles
+            )
+            states.num_auction_tiles[game] = num_tiles
+            states.auction_started[game] = game_state.auction_started
+            states.auction_forced[game] = game_state.auction_forced
+            states.auction_start_player[game] = _from_optional(
+                game_state.auction_start_player
+            )
+            states.current_player[game] = game_state.current_player
+            states.num_mons_to_discard[game] = game_state.num_mons_to_discard
+            states.num_civs_to_discard[game] = game_state.num_civs_to_discard
+            states.auction_winning_player[game] = _from_optional(
+                game_state.auction_winning_player
+            )
+            states.game_ended[game] = game_state.game_ended
+            for player, player_state in enumerate(game_state.player_states):
+                seat = game * num_players + player
+                states.active[seat] = game_state.active_players[player]
+                states.auction_suns[seat] = _from_optional(
+                    game_state.auction_suns[player]
+                )
+                states.points[seat] = player_state.points
+                start = seat * _NUM_COLLECTIBLES
+                states.collection[start : start + _NUM_COLLECTIBLES] = array.array(
+                    "b", player_state.collection
+                )
+                states._set_suns(
+                    seat, player_state.usable_sun, player_state.unusable_sun
+                )
+        return states
+
+    def select(self, games: Sequence[int]) -> "BatchState":
+        """Copies the given games, in order, into a new batch. Games may repeat."""
+        states = BatchState(len(games), self.num_players, self.player_names)
+        for name in BatchState.__slots__:
+            source = getattr(self, name)
+            if not isinstance(source, array.array):
+                continue
+            stride = len(source) // self.num_games
+            selected = array.array(source.typecode)
+            for game in games:
+                selected += source[game * stride : (game + 1) * stride]
+            setattr(states, name, selected)
+        return states
+
+    def to_game_state(self, game: int) -> gs.GameState:
+        """Unpacks a single game, eg. to hand it to the search or the frontend."""
+        num_players = self.num_players
+        tile_bag = gs.TileBag(
+            list(
+                self.draw_order[
+                    game * gi.STARTING_NUM_TILES : (game + 1) * gi.STARTING_NUM_TILES
+                ]
+            )
+        )
+        tile_bag.num_tiles_left = gi.STARTING_NUM_TILES - self.draw_cursor[game]
+        tile_bag.bag = list(
+            self.bag[game * gi.NUM_TILE_TYPES : (game + 1) * gi.NUM_TILE_TYPES]
+        )
+
+        player_states = []
+        for player in range(num_players):
+            seat = game * num_players + player
+            player_state = gs.PlayerState(
+                self.player_names[player], player, self.usable_suns(seat)
+            )
+            start = seat * _NUM_COLLECTIBLES
+            for idx, count in enumerate(
+                self.collection[start : start + _NUM_COLLECTIBLES]
+            ):
+                player_state.add_tiles([idx] * count)
+            player_state.unusable_sun = self.unusable_suns(seat)
+            player_state.set_usable_sun(player_state.usable_sun)
+            player_state.points = self.points[seat]
+            player_states.append(player_state)
+
+        seats = range(game * num_players, (game + 1) * num_players)
+        game_state = gs.GameState.shallow()
+        game_state.total_rounds = gi.NUM_ROUNDS
+        game_state.num_ras_per_round = self.num_ras_per_round
+        game_state.num_players = num_players
+        game_state.max_auction_tiles = gi.MAX_AUCTION_TILES
+        game_state.tile_bag = tile_bag
+        game_state.current_round = self.current_round[game]
+        game_state.active_players = [bool(self.active[seat]) for seat in seats]
+        game_state.num_ras_this_round = self.num_ras_this_round[game]
+        game_state.center_sun = self.center_sun[game]
+        game_state.auction_tiles = self.auction_tiles_of(game)
+        game_state.auction_suns = [
+            _to_optional(self.auction_suns[seat]) for seat in seats
+        ]
+        game_state.auction_forced = bool(self.auction_forced[game])
+        game_state.auction_started = bool(self.auction_started[game])
+        game_state.auction_start_player = _to_optional(self.auction_start_player[game])
+        game_state.current_player = self.current_player[game]
+        game_state.num_mons_to_discard = self.num_mons_to_discard[game]
+        game_state.num_civs_to_discard = self.num_civs_to_discard[game]
+        game_state.auction_winning_player = _to_optional(
+            self.auction_winning_player[game]
+        )
+        game_state.player_states = player_states
+        game_state.player_names = list(self.player_names)
+        game_state.game_ended = bool(self.game_ended[game])
+        return game_state
+
+    def usable_suns(self, seat: int) -> List[int]:
+        start = seat * MAX_SUNS
+        return list(self.usable_sun[start : start + self.num_usable_sun[seat]])
+
+    def unusable_suns(self, seat: int) -> List[int]:
+        start = seat * MAX_SUNS
+        return list(self.unusable_sun[start : start + self.num_unusable_sun[seat]])
+
+    def auction_tiles_of(self, game: int) -> List[int]:
+        start = game * gi.MAX_AUCTION_TILES
+        return list(self.auction_tiles[start : start + self.num_auction_tiles[game]])
+
+    def scores(self, game: int) -> List[int]:
+        """The points of every player of the game."""
+        start = game * self.num_players
+        return list(self.points[start : start + self.num_players])
+
+    def all_ended(self) -> bool:
+        return all(self.game_ended)
+
+
+def _from_optional(value: Optional[int]) -> int:
+    return NONE if value is None else value
+
+
+def _to_optional(value: int) -> Optional[int]:
+    return None if value == NONE else value
+
+
+def new_batch(
+    num_games: int, num_players: int, rng: Optional[random.Random] = None
+) -> BatchState:
+    """Deals num_games new games."""
+    rng = rng or random.Random()
+    states = BatchState(num_games, num_players)
+    for game in range(num_games):
+        states.deal(game, rng)
+    return states
+
+
+""" RULES """
+
+
+def legal_actions(states: BatchState, game: int) -> List[int]:  # noqa: C901
+    """Same as ra.get_possible_actions, but empty once the game has ended."""
+    if states.game_ended[game]:
+        return []
+    num_players = states.num_players
+    current_player = states.current_player[game]
+    seat = game * num_players + current_player
+    actions = []
+
+    if states.auction_started[game]:
+        max_bid = max(
+            states.auction_suns[game * num_players : (game + 1) * num_players]
+        )
+        start = seat * MAX_SUNS
+        for i in range(states.num_usable_sun[seat]):
+            if states.usable_sun[start + i] > max_bid:
+                actions.append(gi.BID_1 + i)
+        if (
+            current_player != states.auction_start_player[game]
+            or states.auction_forced[game]
+            or max_bid != NONE
+        ):
+            actions.append(gi.BID_NOTHING)
+
+    elif states.num_civs_to_discard[game] > 0 or states.num_mons_to_discard[game] > 0:
+        winner = states.auction_winning_player[game]
+        assert winner != NONE
+        start = (game * num_players + winner) * _NUM_COLLECTIBLES
+        if states.num_civs_to_discard[game] > 0:
+            for i, idx in enumerate(_CIVS):
+                if states.collection[start + idx] > 0:
+                    actions.append(gi.DISCARD_ASTR + i)
+        else:
+            for i, idx in enumerate(_MONUMENTS):
+                if states.collection[start + idx] > 0:
+                    actions.append(gi.DISCARD_FORT + i)
+
+    else:
+        num_auction_tiles = states.num_auction_tiles[game]
+        if num_auction_tiles < gi.MAX_AUCTION_TILES:
+            actions.append(gi.DRAW)
+        actions.append(gi.AUCTION)
+        if (
+            num_auction_tiles < gi.MAX_AUCTION_TILES
+            and states.collection[seat * _NUM_COLLECTIBLES + gi.INDEX_OF_GOD] > 0
+        ):
+            start = game * gi.MAX_AUCTION_TILES
+            for i in range(num_auction_tiles):
+                if states.auction_tiles[start + i] not in _DISASTERS:
+                    actions.append(gi.GOD_1 + i)
+
+    return actions
+
+
+def legal_mask(states: BatchState) -> bytearray:
+    """Flags the legal actions of every game, indexed by game * NUM_ACTIONS + action.
+
+    Games that have ended have no legal actions.
+    """
+    mask = bytearray(states.num_games * NUM_ACTIONS)
+    for game in range(states.num_games):
+        for action in legal_actions(states, game):
+            mask[game * NUM_ACTIONS + action] = 1
+    return mask
+
+
+def step(states: BatchState, actions: Sequence[int]) -> List[Optional[int]]:
+    """Takes one action in every game, on behalf of its current player.
+
+    The actions of games that have ended are ignored.
+
+    Returns:
+        For every game, the tile drawn if the action was a draw.
+    """
+    assert len(actions) == states.num_games, "Expected one action per game"
+    tiles_drawn: List[Optional[int]] = []
+    for game, action in enumerate(actions):
+        if states.game_ended[game]:
+            tiles_drawn.append(None)
+            continue
+        legal = legal_actions(states, game)
+        if action not in legal:
+            raise Exception(
+                f"Cannot execute non-legal action '{action}' in game {game}. "
+                f"Legal actions: '{legal}'"
+            )
+        tiles_drawn.append(_execute(states, game, action))
+    return tiles_drawn
+
+
+def _execute(states: BatchState, game: int, action: int) -> Optional[int]:
+    """Mirrors ra.execute_action_internal for a legal action."""
+    if action == gi.DRAW:
+        return _draw(states, game)
+    if action == gi.AUCTION:
+        _start_auction(
+            states,
+            game,
+            states.num_auction_tiles[game] == gi.MAX_AUCTION_TILES,
+        )
+        _advance_current_player(states, game)
+    elif gi.GOD_1 <= action <= gi.GOD_8:
+        _use_god(states, game, action - gi.GOD_1)
+    elif gi.BID_1 <= action <= gi.BID_4:
+        _bid(states, game, action - gi.BID_1)
+    elif action == gi.BID_NOTHING:
+        _bid(states, game, None)
+    elif gi.DISCARD_ASTR <= action <= gi.DISCARD_ART:
+        states.num_civs_to_discard[game] -= 1
+        _discard(states, game, _CIVS[action - gi.DISCARD_ASTR])
+    else:
+        states.num_mons_to_discard[game] -= 1
+        _discard(states, game, _MONUMENTS[action - gi.DISCARD_FORT])
+    return None
+
+
+def _draw(states: BatchState, game: int) -> int:
+    cursor = states.draw_cursor[game]
+    # Like drawing from an empty TileBag.
+    assert cursor < gi.STARTING_NUM_TILES
+    tile = states.draw_order[game * gi.STARTING_NUM_TILES + cursor]
+    states.draw_cursor[game] = cursor + 1
+    states.bag[game * gi.NUM_TILE_TYPES + tile] -= 1
+
+    if tile == gi.INDEX_OF_RA:
+        if states.num_ras_this_round[game] >= states.num_ras_per_round:
+            raise Exception(
+                f"Cannot increase num ras beyond {states.num_ras_this_round[game]}"
+            )
+        states.num_ras_this_round[game] += 1
+        if states.num_ras_this_round[game] == states.num_ras_per_round:
+            _end_round(states, game)
+            return tile
+        _start_auction(states, game, True)
+    else:
+        num_auction_tiles = states.num_auction_tiles[game]
+        if num_auction_tiles >= gi.MAX_AUCTION_TILES:
+            raise Exception(
+                f"There are already {num_auction_tiles} auction tiles. "
+                "Cannot add another."
+            )
+        states.auction_tiles[game * gi.MAX_AUCTION_TILES + num_auction_tiles] = tile
+        states.num_auction_tiles[game] = num_auction_tiles + 1
+    _advance_current_player(states, game)
+    return tile
+
+
+def _start_auction(states: BatchState, game: int, forced: bool) -> None:
+    states.auction_started[game] = 1
+    states.auction_forced[game] = forced
+    states.auction_start_player[game] = states.current_player[game]
+
+
+def _end_auction(states: BatchState, game: int) -> None:
+    num_players = states.num_players
+    start = game * num_players
+    states.auction_suns[start : start + num_players] = array.array(
+        "b", [NONE] * num_players
+    )
+    states.auction_started[game] = 0
+
+
+def _use_god(states: BatchState, game: int, position: int) -> None:
+    start = game * gi.MAX_AUCTION_TILES
+    num_auction_tiles = states.num_auction_tiles[game]
+    tile = states.auction_tiles[start + position]
+    states.auction_tiles[
+        start + position : start + num_auction_tiles - 1
+    ] = states.auction_tiles[start + position + 1 : start + num_auction_tiles]
+    states.num_auction_tiles[game] = num_auction_tiles - 1
+
+    seat = game * states.num_players + states.current_player[game]
+    states.collection[seat * _NUM_COLLECTIBLES + tile] += 1
+    _remove_single_tile(states, seat, gi.INDEX_OF_GOD)
+    _advance_current_player(states, game)
+
+
+def _bid(states: BatchState, game: int, sun_position: Optional[int]) -> None:
+    current_player = states.current_player[game]
+    seat = game * states.num_players + current_player
+    if sun_position is not None:
+        if states.auction_suns[seat] != NONE:
+            raise Exception(
+                f"Player {current_player} already has bid {states.auction_suns[seat]}"
+            )
+        states.auction_suns[seat] = states.usable_sun[seat * MAX_SUNS + sun_position]
+    if current_player == states.auction_start_player[game]:
+        _handle_auction_end(states, game)
+    else:
+        _advance_current_player(states, game)
+
+
+def _discard(states: BatchState, game: int, idx: int) -> None:
+    """Discards a single tile of the auction winner to resolve a disaster."""
+    winner = states.auction_winning_player[game]
+    _remove_single_tile(states, game * states.num_players + winner, idx)
+    _mark_player_passed_if_no_disasters(states, game, winner)
+
+    # Resume play from after the auction starter.
+    if not _disasters_must_be_resolved(states, game):
+        states.current_player[game] = states.auction_start_player[game]
+        _advance_current_player(states, game)
+
+
+def _handle_auction_end(states: BatchState, game: int) -> None:  # noqa: C901
+    num_players = states.num_players
+    bids = states.auction_suns[game * num_players : (game + 1) * num_players]
+    max_sun = max(bids)
+    if max_sun == NONE:
+        # Nobody bid, so a full track of auction tiles is thrown away.
+        if states.num_auction_tiles[game] == gi.MAX_AUCTION_TILES:
+            states.num_auction_tiles[game] = 0
+    else:
+        winner = bids.index(max_sun)
+        seat = game * num_players + winner
+        _exchange_sun(states, seat, max_sun, states.center_sun[game])
+        states.center_sun[game] = max_sun
+
+        auction_tiles = states.auction_tiles_of(game)
+        states.num_auction_tiles[game] = 0
+        start = seat * _NUM_COLLECTIBLES
+        collection = states.collection
+        for tile in auction_tiles:
+            if tile < _NUM_COLLECTIBLES:
+                collection[start + tile] += 1
+
+        num_to_discard = gi.NUM_DISCARDS_PER_DISASTER * auction_tiles.count(
+            gi.INDEX_OF_DIS_PHAR
+        )
+        if num_to_discard > 0:
+            collection[start + gi.INDEX_OF_PHAR] -= min(
+                num_to_discard, collection[start + gi.INDEX_OF_PHAR]
+            )
+
+        num_to_discard = gi.NUM_DISCARDS_PER_DISASTER * auction_tiles.count(
+            gi.INDEX_OF_DIS_NILE
+        )
+        if num_to_discard > 0:
+            num_floods = min(collection[start + gi.INDEX_OF_FLOOD], num_to_discard)
+            num_niles = min(
+                num_to_discard - num_floods, collection[start + gi.INDEX_OF_NILE]
+            )
+            collection[start + gi.INDEX_OF_FLOOD] -= num_floods
+            collection[start + gi.INDEX_OF_NILE] -= num_niles
+
+        num_to_discard = gi.NUM_DISCARDS_PER_DISASTER * auction_tiles.count(
+            gi.INDEX_OF_DIS_CIV
+        )
+        if num_to_discard > 0:
+            if sum(collection[start + idx] for idx in _CIVS) <= num_to_discard:
+                for idx in _CIVS:
+                    collection[start + idx] = 0
+            else:
+                states.num_civs_to_discard[game] = num_to_discard
+                states.auction_winning_player[game] = winner
+
+        num_to_discard = gi.NUM_DISCARDS_PER_DISASTER * auction_tiles.count(
+            gi.INDEX_OF_DIS_MON
+        )
+        if num_to_discard > 0:
+            if sum(collection[start + idx] for idx in _MONUMENTS) <= num_to_discard:
+                for idx in _MONUMENTS:
+                    collection[start + idx] = 0
+            else:
+                states.num_mons_to_discard[game] = num_to_discard
+                states.auction_winning_player[game] = winner
+
+        _mark_player_passed_if_no_disasters(states, game, winner)
+
+    _end_auction(states, game)
+
+    if _is_final_round(states, game) and _are_all_players_passed(states, game):
+        _end_round(states, game)
+    elif not _disasters_must_be_resolved(states, game):
+        _advance_current_player(states, game)
+    else:
+        states.current_player[game] = states.auction_winning_player[game]
+
+
+def _mark_player_passed_if_no_disasters(
+    states: BatchState, game: int, player: int
+) -> None:
+    if _disasters_must_be_resolved(states, game):
+        return
+    seat = game * states.num_players + player
+    if states.num_usable_sun[seat] == 0:
+        states.active[seat] = 0
+    if _are_all_players_passed(states, game):
+        _end_round(states, game)
+
+
+def _end_round(states: BatchState, game: int) -> None:
+    states.num_auction_tiles[game] = 0
+    _end_auction(states, game)
+    states.num_ras_this_round[game] = 0
+
+    num_players = states.num_players
+    seats = range(game * num_players, (game + 1) * num_players)
+    for seat, points in zip(seats, _round_end_points(states, seats)):
+        states.points[seat] += points
+    for seat in seats:
+        start = seat * _NUM_COLLECTIBLES
+        for idx in _TEMPORARY:
+            states.collection[start + idx] = 0
+        states._set_suns(
+            seat, sorted(states.usable_suns(seat) + states.unusable_suns(seat)), []
+        )
+
+    if _is_final_round(states, game):
+        for seat, points in zip(seats, _game_end_points(states, seats)):
+            states.points[seat] += points
+        states.game_ended[game] = 1
+        return
+
+    states.active[seats.start : seats.stop] = array.array("b", [1] * num_players)
+    _advance_current_player(states, game)
+    if states.current_round[game] >= gi.NUM_ROUNDS:
+        raise Exception(f"Cannot advance round beyond {states.current_round[game]}")
+    states.current_round[game] += 1
+
+
+def _round_end_points(states: BatchState, seats: range) -> List[int]:
+    """Same as scoring_utils.round_end_points."""
+    collection = states.collection
+    starts = [seat * _NUM_COLLECTIBLES for seat in seats]
+    pharaohs = [collection[start + gi.INDEX_OF_PHAR] for start in starts]
+    least_pharaohs, most_pharaohs = min(pharaohs), max(pharaohs)
+    points = []
+    for start, num_pharaohs in zip(starts, pharaohs):
+        num_floods = collection[start + gi.INDEX_OF_FLOOD]
+        num_civs = sum(1 for idx in _CIVS if collection[start + idx] > 0)
+        points.append(
+            collection[start + gi.INDEX_OF_GOD] * gi.POINTS_PER_GOD
+            + collection[start + gi.INDEX_OF_GOLD] * gi.POINTS_PER_GOLD
+            + (gi.POINTS_FOR_LEAST_PHAR if num_pharaohs == least_pharaohs else 0)
+            + (gi.POINTS_FOR_MOST_PHAR if num_pharaohs == most_pharaohs else 0)
+            + (
+                collection[start + gi.INDEX_OF_NILE] + num_floods
+                if num_floods > 0
+                else 0
+            )
+            + gi.POINTS_FOR_CIVS[num_civs]
+        )
+    return points
+
+
+def _game_end_points(states: BatchState, seats: range) -> List[int]:
+    """Same as scoring_utils.game_end_points."""
+    suns = [
+        sum(states.usable_suns(seat)) + sum(states.unusable_suns(seat))
+        for seat in seats
+    ]
+    least_suns, most_suns = min(suns), max(suns)
+    points = []
+    for seat, num_suns in zip(seats, suns):
+        start = seat * _NUM_COLLECTIBLES
+        monuments = [states.collection[start + idx] for idx in _MONUMENTS]
+        points.append(
+            sum(gi.points_for_monument_depth(count) for count in monuments)
+            + gi.POINTS_FOR_MON_BREADTH[sum(1 for count in monuments if count > 0)]
+            + (gi.POINTS_FOR_LEAST_SUN if num_suns == least_suns else 0)
+            + (gi.POINTS_FOR_MOST_SUN if num_suns == most_suns else 0)
+        )
+    return points
+
+
+def _exchange_sun(
+    states: BatchState, seat: int, sun_to_give: int, sun_to_receive: int
+) -> None:
+    usable_sun = states.usable_suns(seat)
+    usable_sun.remove(sun_to_give)
+    states._set_suns(
+        seat, usable_sun, sorted(states.unusable_suns(seat) + [sun_to_receive])
+    )
+
+
+def _remove_single_tile(states: BatchState, seat: int, idx: int) -> None:
+    if states.collection[seat * _NUM_COLLECTIBLES + idx] > 0:
+        states.collection[seat * _NUM_COLLECTIBLES + idx] -= 1
+
+
+def _advance_current_player(states: BatchState, game: int) -> None:
+    """Moves on to the next player with sun, like GameState.advance_current_player."""
+    num_players = states.num_players
+    current_player = states.current_player[game]
+    next_player = None
+    for i in range(1, num_players + 1):
+        player = (current_player + i) % num_players
+        if states.active[game * num_players + player]:
+            next_player = player
+            break
+    assert next_player is not None
+    states.current_player[game] = next_player
+
+
+def _disasters_must_be_resolved(states: BatchState, game: int) -> bool:
+    return states.num_mons_to_discard[game] > 0 or states.num_civs_to_discard[game] > 0
+
+
+def _is_final_round(states: BatchState, game: int) -> bool:
+    return states.current_round[game] == gi.NUM_ROUNDS
+
+
+def _are_all_players_passed(states: BatchState, game: int) -> bool:
+    start = game * states.num_players
+    return not any(states.active[start : start + states.num_players])
+
+
+""" GYM-LIKE API """
+
+
+class BatchEnv:
+    """Plays num_games games in lockstep, resetting them all at once.
+
+    Rewards are the points each player gained during the step, so they sum up to
+    the final score minus the starting points over a game.
+    """
+
+    __slots__ = ("num_games", "num_players", "rng", "states")
+
+    def __init__(
+        self, num_games: int, num_players: int, seed: Optional[int] = None
+    ) -> None:
+        self.num_games = num_games
+        self.num_players = num_players
+        self.rng = random.Random(seed)
+        self.states = BatchState(num_games, num_players)
+
+    def reset(self) -> BatchState:
+        """Deals new games in every slot."""
+        for game in range(self.num_games):
+            self.states.deal(game, self.rng)
+        return self.states
+
+    def legal_mask(self) -> bytearray:
+        return legal_mask(self.states)
+
+    def step(
+        self, actions: Sequence[int]
+    ) -> Tuple[BatchState, List[List[int]], List[bool]]:
+        """Returns the states, the points gained by each player and which games
+        have ended."""
+        points_before = list(self.states.points)
+        step(self.states, actions)
+        num_players = self.num_players
+        rewards = [
+            [
+                self.states.points[seat] - points_before[seat]
+                for seat in range(game * num_players, (game + 1) * num_players)
+            ]
+            for game in range(self.num_games)
+        ]
+        return self.states, rewards, [bool(ended) for ended in self.states.game_ended]
@@ -0,0 +1,278 @@
+"""
+Micro-benchmarks of the engine hot paths.
+
+Every benchmark runs over the same corpus of positions, reached by seeded random
+play, so results are comparable between commits:
+
+    python -m game.benchmark -o before.json
+    # ... change things ...
+    python -m game.benchmark -o after.json --compare before.json
+
+Results are written as JSON, keyed by benchmark name.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from game import info as gi
+from game import ra, scoring_utils
+from game import state as gs
+from game.decision_functions import evaluate_game_state as e
+from game.proxy import copy
+
+_VERSION: int = 1
+
+# In order of precedence, eg. a disaster in the final round counts as a disaster.
+PHASES: List[str] = ["disaster", "auction", "final_round", "early"]
+DEFAULT_POSITIONS_PER_PHASE: int = 4
+# Random games played at most while looking for positions of every phase.
+_MAX_CORPUS_GAMES: int = 1000
+
+
+class Position(NamedTuple):
+    num_players: int
+    phase: str
+    game_state: gs.GameState
+
+
+def phase(game_state: gs.GameState) -> Optional[str]:
+    """The phase a position covers, if any."""
+    if game_state.disasters_must_be_resolved():
+        return "disaster"
+    if game_state.is_auction_started():
+        return "auction"
+    if game_state.is_final_round():
+        return "final_round"
+    if game_state.get_current_round() == 1:
+        return "early"
+    return None
+
+
+def build_corpus(
+    seed: int = 0,
+    positions_per_phase: int = DEFAULT_POSITIONS_PER_PHASE,
+    player_counts: Sequence[int] = tuple(sorted(gi.STARTING_SUN)),
+) -> List[Position]:
+    """Collects positions_per_phase positions of every phase and player count."""
+    rng = random.Random(seed)
+    corpus: List[Position] = []
+    for num_players in player_counts:
+        found: Dict[str, int] = {name: 0 for name in PHASES}
+        for _ in range(_MAX_CORPUS_GAMES):
+            if min(found.values()) >= positions_per_phase:
+                break
+            random.seed(rng.random())
+            game_state = gs.new_game([f"P{idx + 1}" for idx in range(num_players)])
+            try:
+                while not game_state.is_game_ended():
+                    name = phase(game_state)
+                    # Sample sparsely so positions come from many games.
+                    if (
+                        name is not None
+                        and found[name] < positions_per_phase
+                        and rng.random() < 0.05
+                        and _steps_cleanly(game_state)
+                    ):
+                        found[name] += 1
+                        corpus.append(
+                            Position(num_players, name, copy.deepcopy(game_state))
+                        )
+                    legal_actions = ra.get_possible_actions(game_state)
+                    assert legal_actions is not None
+                    ra.execute_action_internal(
+                        game_state, rng.choice(legal_actions), legal_actions
+                    )
+            except AssertionError:
+                # Random play occasionally trips an engine assertion. Move on.
+                continue
+        assert (
+            min(found.values()) >= positions_per_phase
+        ), f"Could not find enough positions for {num_players} players: {found}"
+    return sorted(corpus, key=lambda position: (position.num_players, position.phase))
+
+
+def _steps_cleanly(game_state: gs.GameState) -> bool:
+    """Whether the first legal action can be taken without tripping an engine
+    assertion, which execute_action_internal is benchmarked on."""
+    try:
+        _execute_first_action(copy.deepcopy(game_state))
+    except AssertionError:
+        return False
+    return True
+
+
+class Benchmark(NamedTuple):
+    name: str
+    # Prepares the inputs of one timed pass, untimed.
+    setup: Callable[[Sequence[gs.GameState], int], List[object]]
+    # Called once per input.
+    run: Callable[[object], object]
+
+
+def _repeated(game_states: Sequence[gs.GameState], loops: int) -> List[object]:
+    return list(game_states) * loops
+
+
+def _copies(game_states: Sequence[gs.GameState], loops: int) -> List[object]:
+    """Inputs for benchmarks that mutate the game state."""
+    return [
+        copy.deepcopy(game_state) for _ in range(loops) for game_state in game_states
+    ]
+
+
+def _auction_tile_inputs(
+    game_states: Sequence[gs.GameState], loops: int
+) -> List[object]:
+    return [
+        (game_state.get_auction_tiles(), game_state.player_states)
+        for game_state in game_states
+    ] * loops
+
+
+def _execute_first_action(game_state: gs.GameState) -> Optional[int]:
+    legal_actions = ra.get_possible_actions(game_state)
+    assert legal_actions is not None
+    return ra.execute_action_internal(game_state, legal_actions[0], legal_actions)
+
+
+BENCHMARKS: List[Benchmark] = [
+    Benchmark("get_possible_actions", _repeated, ra.get_possible_actions),
+    Benchmark("execute_action_internal", _copies, _execute_first_action),
+    Benchmark("deepcopy", _repeated, copy.deepcopy),
+    Benchmark("hash", _repeated, hash),
+    Benchmark(
+        "evaluate_game_state_no_auction_tiles",
+        _repeated,
+        e.evaluate_game_state_no_auction_tiles,
+    ),
+    Benchmark(
+        "calculate_value_of_auction_tiles",
+        _auction_tile_inputs,
+        lambda args: scoring_utils.calculate_value_of_auction_tiles(*args),
+    ),
+    Benchmark("serialize", _repeated, gs.GameState.serialize),
+]
+
+
+class Result(NamedTuple):
+    # Nanoseconds per call, over the fastest and the median pass.
+    best_ns: float
+    median_ns: float
+    # Calls per pass.
+    num_calls: int
+
+
+def run_benchmark(
+    benchmark: Benchmark,
+    game_states: Sequence[gs.GameState],
+    loops: int = 20,
+    repeat: int = 5,
+) -> Result:
+    """Times repeat passes of loops calls per position."""
+    timings = []
+    num_calls = 0
+    for _ in range(repeat):
+        inputs = benchmark.setup(game_states, loops)
+        run = benchmark.run
+        start = time.perf_counter_ns()
+        for args in inputs:
+            run(args)
+        timings.append((time.perf_counter_ns() - start) / len(inputs))
+        num_calls = len(inputs)
+    return Result(min(timings), statistics.median(timings), num_calls)
+
+
+def run_all(
+    corpus: Sequence[Position],
+    names: Optional[Sequence[str]] = None,
+    loops: int = 20,
+    repeat: int = 5,
+) -> Dict[str, Result]:
+    game_states = [position.game_state for position in corpus]
+    return {
+        benchmark.name: run_benchmark(benchmark, game_states, loops, repeat)
+        for benchmark in BENCHMARKS
+        if names is None or benchmark.name in names
+    }
+
+
+def to_json(
+    results: Dict[str, Result], corpus: Sequence[Position], seed: int
+) -> Dict[str, object]:
+    return {
+        "version": _VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": seed,
+        "numPositions": len(corpus),
+        "results": {name: result._asdict() for name, result in results.items()},
+    }
+
+
+def compare(
+    baseline: Dict[str, object], current: Dict[str, object], threshold: float = 0.1
+) -> List[str]:
+    """Describes the change of every benchmark in both result files.
+
+    Benchmarks whose best time grew by more than threshold are marked REGRESSED.
+    """
+    lines = []
+    old_results = baseline["results"]
+    new_results = current["results"]
+    assert isinstance(old_results, dict) and isinstance(new_results, dict)
+    for name, new in new_results.items():
+        if name not in old_results:
+            lines.append(f"{name}: new")
+            continue
+        ratio = new["best_ns"] / max(old_results[name]["best_ns"], 1e-9)
+        marker = "  REGRESSED" if ratio > 1 + threshold else ""
+        lines.append(
+            f"{name}: {old_results[name]['best_ns']:.0f} -> {new['best_ns']:.0f} ns "
+            f"({ratio:.2f}x){marker}"
+        )
+    return lines
+
+
+def get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarks the Ra engine.")
+    parser.add_argument(
+        "--outfile", "-o", default=None, help="Where to write the JSON results."
+    )
+    parser.add_argument(
+        "--compare", "-c", default=None, help="Earlier results to compare against."
+    )
+    parser.add_argument(
+        "--benchmarks",
+        "-b",
+        nargs="+",
+        default=None,
+        choices=[benchmark.name for benchmark in BENCHMARKS],
+        help="Benchmarks to run. Defaults to all of them.",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seeds the corpus.")
+    parser.add_argument(
+        "--loops", type=int, default=20, help="Calls per position in each pass."
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Passes to time.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args: argparse.Namespace = get_args()
+    corpus = build_corpus(args.seed)
+    results = run_all(corpus, args.benchmarks, args.loops, args.repeat)
+    data = to_json(results, corpus, args.seed)
+    for name, result in results.items():
+        print(
+            f"{name:<40}{result.best_ns:>12.0f} ns{result.median_ns:>12.0f} ns (median)"
+        )
+    if args.outfile:
+        with open(args.outfile, "w") as f:
+            json.dump(data, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            print("\n".join(compare(json.load(f), data)))
@@ -0,0 +1,339 @@
+"""
+Compact binary move histories with a random-access index.
+
+Text move histories spell out the player names, the draw order, the starting suns
+(if recorded) and every move in decimal, one per line. The binary format stores the
+same history as:
+
+    header      magic, version, player count, tile width, suns per player,
+                index interval, number of moves, number of tiles and the length of
+                the moves in bytes
+    names       every player name, as a length byte followed by UTF-8
+    suns        the starting suns of every player, a byte each, if the history
+                records the deal (suns per player is 0 otherwise)
+    draw order  every tile packed into the tile width in bits
+    moves       every action as a varint of action << 1 | has_tile, where has_tile
+                marks draws that record their tile
+    index       where every index_interval-th move starts within the moves and
+                the number of draws before it, as little-endian uint32 and uint16
+
+Draws always take the next tile of the draw order, so the tile of a draw is never
+stored: a reader counts the draws instead, and encode() rejects histories that
+record any other tile. A reader decodes only the header, the names, the suns and the
+draw order up front, and jumps to move N by decoding at most index_interval - 1
+moves.
+
+Files are about 3x smaller than text and parse about 2x faster, not an order of
+magnitude: every move still takes a byte, and the packed draw order is close to
+random. Deflating whole files roughly halves them again, at the cost of random
+access, so compress archives at rest if size matters more. To convert an archive of
+text move histories, or back with --text:
+
+    python -m game.binary_history move_histories/*.txt -o archive
+"""
+import argparse
+import os
+import struct
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from game import info as gi
+from game import ra
+
+MAGIC: bytes = b"RaMH"
+VERSION: int = 2
+SUFFIX: str = ".rah"
+DEFAULT_INDEX_INTERVAL: int = 32
+
+_HEADER: struct.Struct = struct.Struct("<4s4BHIHI")
+_INDEX_ENTRY: struct.Struct = struct.Struct("<IH")
+_TILE_BITS: int = (gi.NUM_TILE_TYPES - 1).bit_length()
+
+
+# An action and the tile recorded for it, if it is a draw that records one.
+Move = Tuple[int, Optional[int]]
+
+
+class History(NamedTuple):
+    player_names: List[str]
+    draw_order: List[int]
+    moves: List[Move]
+    # The suns each player was dealt, if recorded.
+    starting_suns: Optional[List[List[int]]] = None
+
+
+def read_text(path: str) -> History:
+    """Parses a text move history, as written by RaGame."""
+    with open(path, "r") as f:
+        lines = [line.split() for line in f]
+    if len(lines) < 2:
+        raise ValueError(f"{path}: missing the player names or the draw order")
+    starting_suns = ra.parse_starting_suns(lines[2]) if len(lines) > 2 else None
+    moves: List[Move] = []
+    first_move = 2 if starting_suns is None else 3
+    for line_number, line in enumerate(lines[first_move:], first_move + 1):
+        if not line:
+            continue
+        if len(line) > 2:
+            raise ValueError(f"{path}: line {line_number}: cannot parse {line}")
+        moves.append((int(line[0]), int(line[1]) if len(line) == 2 else None))
+    return History(lines[0], [int(tile) for tile in lines[1]], moves, starting_suns)
+
+
+def write_text(history: History, path: str) -> None:
+    lines = [" ".join(history.player_names), " ".join(map(str, history.draw_order))]
+    if history.starting_suns is not None:
+        lines.append(ra.format_starting_suns(history.starting_suns))
+    lines += [
+        f"{action}" if tile is None else f"{action} {tile}"
+        for action, tile in history.moves
+    ]
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    """Returns the varint at offset and the offset following it."""
+    value, shift = 0, 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def encode(history: History, index_interval: int = DEFAULT_INDEX_INTERVAL) -> bytes:
+    """Encodes a history in the binary format."""
+    moves, index = bytearray(), bytearray()
+    num_draws = 0
+    for move_number, (action, tile) in enumerate(history.moves):
+        if move_number % index_interval == 0:
+            index += _INDEX_ENTRY.pack(len(moves), num_draws)
+        if action == gi.DRAW:
+            num_draws += 1
+            if tile is not None and tile != history.draw_order[num_draws - 1]:
+                raise ValueError(
+                    f"move {move_number + 1}: records tile {tile}, not the next tile "
+                    "of the draw order"
+                )
+        elif tile is not None:
+            raise ValueError(f"move {move_number + 1}: action {action} drew no tile")
+        _write_varint(moves, action << 1 | (tile is not None))
+
+    names = bytearray()
+    for name in history.player_names:
+        encoded = name.encode("utf-8")
+        if len(encoded) > 0xFF:
+            raise ValueError(f"Player name too long: {name}")
+        names += bytes([len(encoded)]) + encoded
+
+    starting_suns = history.starting_suns or []
+    if starting_suns and (
+        len(starting_suns) != len(history.player_names)
+        or len({len(player_suns) for player_suns in starting_suns}) != 1
+    ):
+        raise ValueError(f"Cannot deal {starting_suns} to every player")
+    suns = bytes(sun for player_suns in starting_suns for sun in player_suns)
+
+    packed = 0
+    for position, tile in enumerate(history.draw_order):
+        packed |= tile << (position * _TILE_BITS)
+    draw_order = packed.to_bytes(
+        (len(history.draw_order) * _TILE_BITS + 7) // 8, "little"
+    )
+    header = _HEADER.pack(
+        MAGIC,
+        VERSION,
+        len(history.player_names),
+        _TILE_BITS,
+        len(starting_suns[0]) if starting_suns else 0,
+        index_interval,
+        len(history.moves),
+        len(history.draw_order),
+        len(moves),
+    )
+    return header + names + suns + draw_order + moves + index
+
+
+def is_binary(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class BinaryHistory:
+    """Reads a binary move history, decoding moves only when asked for."""
+
+    __slots__ = (
+        "player_names",
+        "starting_suns",
+        "draw_order",
+        "num_moves",
+        "index_interval",
+        "_data",
+        "_moves_start",
+        "_index_start",
+    )
+
+    def __init__(self, data: bytes) -> None:
+        if len(data) < _HEADER.size:
+            raise ValueError("Truncated binary move history")
+        (
+            magic,
+            version,
+            num_players,
+            tile_bits,
+            suns_per_player,
+            index_interval,
+            num_moves,
+            num_tiles,
+            moves_length,
+        ) = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} binary move history")
+
+        offset = _HEADER.size
+        self.player_names: List[str] = []
+        for _ in range(num_players):
+            length = data[offset]
+            name = data[offset + 1 : offset + 1 + length]
+            self.player_names.append(bytes(name).decode("utf-8"))
+            offset += 1 + length
+
+        self.starting_suns: Optional[List[List[int]]] = None
+        if suns_per_player:
+            self.starting_suns = [
+                list(data[start : start + suns_per_player])
+                for start in range(
+                    offset, offset + num_players * suns_per_player, suns_per_player
+                )
+            ]
+            offset += num_players * suns_per_player
+
+        draw_order_length = (num_tiles * tile_bits + 7) // 8
+        packed = int.from_bytes(data[offset : offset + draw_order_length], "little")
+        mask = (1 << tile_bits) - 1
+        self.draw_order: List[int] = [
+            packed >> (position * tile_bits) & mask for position in range(num_tiles)
+        ]
+
+        self.num_moves: int = num_moves
+        self.index_interval: int = index_interval
+        self._data: bytes = data
+        self._moves_start: int = offset + draw_order_length
+        self._index_start: int = self._moves_start + moves_length
+        num_entries = -(-num_moves // index_interval)
+        if len(data) < self._index_start + num_entries * _INDEX_ENTRY.size:
+            raise ValueError("Truncated binary move history")
+
+    def __len__(self) -> int:
+        return self.num_moves
+
+    def moves(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Move]:
+        """Decodes moves start up to stop, starting from the closest indexed move."""
+        stop = self.num_moves if stop is None else min(stop, self.num_moves)
+        if start >= stop:
+            return
+        data = self._data
+        draw_order = self.draw_order
+        entry, skip = divmod(start, self.index_interval)
+        offset, num_draws = _INDEX_ENTRY.unpack_from(
+            data, self._index_start + entry * _INDEX_ENTRY.size
+        )
+        offset += self._moves_start
+        for move_number in range(start - skip, stop):
+            value = data[offset]
+            offset += 1
+            # Every action fits in a single byte.
+            if value >= 0x80:
+                value, offset = _read_varint(data, offset - 1)
+            action = value >> 1
+            tile = draw_order[num_draws] if value & 1 else None
+            if action == gi.DRAW:
+                num_draws += 1
+            if move_number >= start:
+                yield action, tile
+
+    def move(self, n: int) -> Move:
+        if not 0 <= n < self.num_moves:
+            raise IndexError(f"Move {n} out of range for {self.num_moves} moves")
+        return next(self.moves(n, n + 1))
+
+    def history(self) -> History:
+        return History(
+            list(self.player_names),
+            list(self.draw_order),
+            list(self.moves()),
+            self.starting_suns and [list(suns) for suns in self.starting_suns],
+        )
+
+
+def load(path: str) -> BinaryHistory:
+    with open(path, "rb") as f:
+        return BinaryHistory(f.read())
+
+
+def write(
+    history: History, path: str, index_interval: int = DEFAULT_INDEX_INTERVAL
+) -> None:
+    with open(path, "wb") as f:
+        f.write(encode(history, index_interval))
+
+
+def convert(
+    path: str, outdir: str, index_interval: int = DEFAULT_INDEX_INTERVAL
+) -> str:
+    """Converts a text move history to the binary format, returning its path."""
+    stem, _ = os.path.splitext(os.path.basename(path))
+    outpath = os.path.join(outdir, stem + SUFFIX)
+    write(read_text(path), outpath, index_interval)
+    return outpath
+
+
+def get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Converts Ra move histories between the text and binary formats."
+    )
+    parser.add_argument("histories", nargs="+", help="Move-history files to convert.")
+    parser.add_argument(
+        "--outdir", "-o", required=True, help="Folder to write the converted files."
+    )
+    parser.add_argument(
+        "--index_interval",
+        "-k",
+        type=int,
+        default=DEFAULT_INDEX_INTERVAL,
+        help="Number of moves between index entries.",
+    )
+    parser.add_argument(
+        "--text",
+        action="store_true",
+        help="Convert binary move histories back to text.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args: argparse.Namespace = get_args()
+    os.makedirs(args.outdir, exist_ok=True)
+    in_bytes, out_bytes = 0, 0
+    for path in args.histories:
+        if args.text:
+            stem, _ = os.path.splitext(os.path.basename(path))
+            outpath = os.path.join(args.outdir, stem + ".txt")
+            write_text(load(path).history(), outpath)
+        else:
+            outpath = convert(path, args.outdir, args.index_interval)
+        in_bytes += os.path.getsize(path)
+        out_bytes += os.path.getsize(outpath)
+    print(
+        f"Converted {len(args.histories)} files from {in_bytes} to {out_bytes} bytes "
+        f"({in_bytes / max(out_bytes, 1):.1f}x)."
+    )
@@ -1,5 +1,7 @@
 from .ai_base import make_first_move_ai as first_move
 from .ai_base import random_ai as random
+from .heuristic import heuristic_ai_player as heuristic_ai
 from .oracle import oracle_ai_player as oracle_ai
+from .pimc import pimc_ai_player as pimc_ai
 
-__all__ = ["first_move", "random", "oracle_ai"]
+__all__ = ["first_move", "random", "heuristic_ai", "oracle_ai", "pimc_ai"]
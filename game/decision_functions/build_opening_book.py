@@ -0,0 +1,105 @@
+"""
+Offline tool that builds the opening book read by opening_book.lookup().
+
+Every opening position is searched with PIMC, so the book does not depend on the
+draw order of any particular game.
+"""
+import argparse
+import logging
+import math
+from typing import Dict, List, Optional
+
+from game import info as gi
+from game.decision_functions import opening_book as ob
+from game.decision_functions import pimc
+from game.decision_functions import search as s
+
+logger: logging.Logger = logging.getLogger("uvicorn.info")
+
+
+def build_book(
+    path: str,
+    player_counts: List[int],
+    depth: int = 0,
+    num_samples: int = pimc.DEFAULT_NUM_SAMPLES,
+    max_workers: Optional[int] = None,
+    num_auctions_allowed: Optional[int] = None,
+) -> int:
+    """Computes the PIMC value of every opening position and writes the book.
+
+    Returns the number of positions in the book.
+    """
+    entries: Dict[int, Dict[ob.TAction, float]] = {}
+    for num_players in player_counts:
+        for game_state in ob.opening_positions(num_players, depth):
+            key = ob.canonical_key(game_state)
+            if key in entries:
+                continue
+            action_values = pimc.pimc_action_values(
+                game_state,
+                num_samples=num_samples,
+                deadline=math.inf,
+                max_workers=max_workers,
+                num_auctions_allowed=num_auctions_allowed,
+                seed=key,
+            )
+            entries[key] = {
+                action: s.calculate_state_score_for_player(
+                    game_state.get_current_player(), dict(enumerate(values))
+                )
+                for action, values in action_values.items()
+            }
+            logger.info(f"Added position {len(entries)} for {num_players} players.")
+    ob.write_book(path, entries)
+    return len(entries)
+
+
+def get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Builds the Ra opening book.")
+    parser.add_argument(
+        "--outfile", "-o", default="opening_book.bin", help="Where to write the book."
+    )
+    parser.add_argument(
+        "--num_players",
+        "-n",
+        type=int,
+        nargs="+",
+        default=sorted(gi.STARTING_SUN.keys()),
+        help="Player counts to include in the book.",
+    )
+    parser.add_argument(
+        "--depth",
+        "-d",
+        type=int,
+        default=0,
+        help="Number of opening draws to include in the book.",
+    )
+    parser.add_argument(
+        "--samples",
+        "-k",
+        type=int,
+        default=pimc.DEFAULT_NUM_SAMPLES,
+        help="Number of determinizations searched per position.",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=None,
+        help="Number of worker processes. 0 searches in-process.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    args: argparse.Namespace = get_args()
+    num_positions = build_book(
+        args.outfile,
+        args.num_players,
+        depth=args.depth,
+        num_samples=args.samples,
+        max_workers=args.workers,
+    )
+    pimc.shutdown_pool()
+    print(f"Wrote {num_positions} positions to {args.outfile}")
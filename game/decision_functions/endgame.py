@@ -0,0 +1,168 @@
+"""
+Exact solver for the end of the game.
+
+Near the end of the final round the remaining game tree is small enough to search
+all the way to the end of the game, where the value of a state is simply the final
+score of each player (including the game-end scoring). Like the oracle, the solver
+sees the tiles that will be drawn, and never searches golden god actions.
+"""
+import logging
+import time
+from typing import Dict, Mapping, Optional
+
+from game import info as gi
+from game import ra
+from game import state as gs
+from game.decision_functions import search as s
+from game.decision_functions import session, transposition
+from game.proxy import copy
+
+logger: logging.Logger = logging.getLogger("uvicorn.info")
+
+TAction = int
+TScore = float
+
+# Maximum number of unique states a single solve may expand.
+DEFAULT_NODE_LIMIT: int = 200_000
+# Positions whose estimated tree size is below this are solved exactly.
+DEFAULT_TREE_SIZE_THRESHOLD: int = 100_000
+# Size of the memo table. Once full, entries of earlier solves are replaced first.
+DEFAULT_MAX_SLOTS: int = 1 << 18
+
+
+class NodeLimitExceeded(Exception):
+    """Raised when a solve expands more states than allowed."""
+
+
+def draws_until_game_end(game_state: gs.GameState) -> int:
+    """Number of draws until the last Ra of the final round is drawn."""
+    tile_bag = game_state.get_tile_bag()
+    draw_order = tile_bag.get_draw_order()
+    remaining = draw_order[len(draw_order) - tile_bag.get_num_tiles_left() :]
+    ras_left = game_state.get_num_ras_per_round() - game_state.get_current_num_ras()
+    for draws, tile in enumerate(remaining):
+        if tile == gi.INDEX_OF_RA:
+            ras_left -= 1
+            if ras_left == 0:
+                return draws + 1
+    return len(remaining)
+
+
+def estimate_tree_size(game_state: gs.GameState) -> int:
+    """Rough upper bound on the number of states searched until the game ends.
+
+    Golden gods are never searched (see search.filter_actions), so every turn before
+    the last Ra is drawn offers at most a draw or an auction. Every sun still held
+    can be bid at most once, with every player choosing between passing or one of
+    their suns.
+    """
+    if game_state.is_game_ended():
+        return 1
+    if not game_state.is_final_round():
+        return -1
+    num_usable_sun = sum(
+        len(player_state.get_usable_sun()) for player_state in game_state.player_states
+    )
+    return 2 ** draws_until_game_end(game_state) * (
+        (game_state.get_num_players() + 1) ** num_usable_sun
+    )
+
+
+def is_solvable(
+    game_state: gs.GameState, threshold: int = DEFAULT_TREE_SIZE_THRESHOLD
+) -> bool:
+    """Returns true if the position is in the final round and small enough to solve."""
+    return 0 < estimate_tree_size(game_state) <= threshold
+
+
+def _best_values(
+    current_player: int, action_values: Mapping[TAction, tuple[TScore, ...]]
+) -> tuple[TScore, ...]:
+    best_values = None
+    best_state_score = float("-inf")
+    for player_values in action_values.values():
+        curr_player_state_score = s.calculate_state_score_for_player(
+            current_player, dict(enumerate(player_values))
+        )
+        if curr_player_state_score > best_state_score:
+            best_values = player_values
+            best_state_score = curr_player_state_score
+    assert best_values is not None, "no best action found"
+    return best_values
+
+
+class EndgameSolver:
+    """Searches to the end of the game using its own memo table."""
+
+    def __init__(
+        self, node_limit: int = DEFAULT_NODE_LIMIT, max_slots: int = DEFAULT_MAX_SLOTS
+    ) -> None:
+        # Final scores are exact, so they are valid across solves. Points are small
+        # integers, which the float16 values of the table represent exactly.
+        self.table: transposition.TranspositionTable = transposition.TranspositionTable(
+            max_slots
+        )
+        self.node_limit: int = node_limit
+        # The number of unique states expanded by the current solve.
+        self.num_nodes: int = 0
+
+    def solve(
+        self, game_state: gs.GameState
+    ) -> Optional[Dict[TAction, tuple[TScore, ...]]]:
+        """Returns the final scores reached by each legal action.
+
+        Returns None if the node limit is reached before the solve completes.
+        """
+        start_time = time.time()
+        self.num_nodes = 0
+        self.table.new_search()
+        try:
+            action_values = self._action_values(game_state)
+        except NodeLimitExceeded:
+            logger.info(f"Endgame solve aborted after {self.num_nodes} states.")
+            return None
+        logger.info(
+            f"Endgame solved with {self.num_nodes} states. "
+            f"Time elapsed: {(time.time() - start_time)} s"
+        )
+        return action_values
+
+    def _action_values(
+        self, game_state: gs.GameState
+    ) -> Dict[TAction, tuple[TScore, ...]]:
+        legal_actions = ra.get_possible_actions(game_state)
+        assert (
+            legal_actions is not None and len(legal_actions) > 0
+        ), "Cannot solve endgame because no legal actions"
+
+        action_values: Dict[TAction, tuple[TScore, ...]] = {}
+        for action in s.filter_actions(legal_actions):
+            game_state_copy = copy.deepcopy(game_state)
+            ra.execute_action_internal(game_state_copy, action, legal_actions)
+            action_values[action] = self._value(game_state_copy)
+        return action_values
+
+    def _value(self, game_state: gs.GameState) -> tuple[TScore, ...]:
+        gameHash = hash(game_state)
+        num_players = len(game_state.player_states)
+        if (cached := self.table.probe(gameHash)) is not None:
+            return cached[:num_players]
+
+        if game_state.is_game_ended():
+            value = tuple(
+                float(player_state.get_player_points())
+                for player_state in game_state.player_states
+            )
+        else:
+            session.raise_if_cancelled()
+            self.num_nodes += 1
+            if self.num_nodes > self.node_limit:
+                raise NodeLimitExceeded()
+            value = _best_values(
+                game_state.get_current_player(), self._action_values(game_state)
+            )
+        self.table.store(gameHash, value)
+        return value
+
+
+solver: EndgameSolver = EndgameSolver()
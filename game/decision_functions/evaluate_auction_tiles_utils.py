@@ -1,13 +1,100 @@
-from typing import List, Mapping, Tuple
+import functools
+import itertools
+import logging
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
 
 from game import info as gi
+from game import state as gs
+from game.decision_functions import probability
+
+logger: logging.Logger = logging.getLogger("uvicorn.info")
+
+
+class AuctionContext(NamedTuple):
+    """Everything value_auction_tiles needs to know about the player winning them.
+
+    Hashable, so valuations can be memoized on (tiles, context).
+    """
+
+    # The player's collection, indexed by collectible tile index.
+    collection: Tuple[int, ...]
+    # (num pharaohs, is active) of every opponent.
+    opponent_pharaohs: Tuple[Tuple[int, bool], ...]
+    # Number of ra tiles left before the round ends.
+    ra_tiles_left_in_round: int
+    num_rounds_left_inc_this_one: int
+    # Number of usable suns the player has.
+    how_many_sun_left: int
+    # Chance the player can still collect a flood before the round ends.
+    prob_flood_this_round: Optional[float] = None
+    # Chance a tile worth taking with a golden god is drawn before the round ends.
+    prob_god_target: Optional[float] = None
+
+
+def auction_context(game_state: gs.GameState, player_idx: int) -> AuctionContext:
+    """Returns the context of the given player winning the current auction tiles."""
+    player_state = game_state.player_states[player_idx]
+    collection = player_state.get_player_collection()
+    return AuctionContext(
+        collection=tuple(collection),
+        opponent_pharaohs=tuple(
+            (
+                other.get_player_collection()[gi.INDEX_OF_PHAR],
+                game_state.is_player_active(other.get_player_idx()),
+            )
+            for other in game_state.player_states
+            if other.get_player_idx() != player_idx
+        ),
+        ra_tiles_left_in_round=max(
+            0, game_state.get_num_ras_per_round() - game_state.get_current_num_ras()
+        ),
+        num_rounds_left_inc_this_one=max(
+            1, game_state.get_total_rounds() - game_state.get_current_round() + 1
+        ),
+        how_many_sun_left=len(player_state.get_usable_sun()),
+        prob_flood_this_round=(
+            1.0
+            if collection[gi.INDEX_OF_FLOOD] > 0
+            else probability.outlook(game_state).prob_tiles[gi.INDEX_OF_FLOOD]
+        ),
+        prob_god_target=probability.prob_any_before_round_end(
+            game_state, god_targets(collection)
+        ),
+    )
+
+
+def god_targets(collection: Sequence[int]) -> List[int]:
+    """
+    The tiles most worth taking with a golden god: new civs, 3rd copies of monuments
+    and, once the player has 6 distinct monuments, new monuments.
+    """
+    targets = [
+        idx
+        for idx in range(
+            gi.STARTING_INDEX_OF_CIVS, gi.STARTING_INDEX_OF_CIVS + gi.NUM_CIVS
+        )
+        if collection[idx] == 0
+    ]
+    monuments = range(
+        gi.STARTING_INDEX_OF_MONUMENTS,
+        gi.STARTING_INDEX_OF_MONUMENTS + gi.NUM_MONUMENTS,
+    )
+    num_distinct_monuments = sum(1 for idx in monuments if collection[idx] > 0)
+    for idx in monuments:
+        if collection[idx] == 2 or (
+            collection[idx] == 0 and num_distinct_monuments >= 6
+        ):
+            targets.append(idx)
+    return targets
+
 
 """ Top-level Evaluation Functions """
 
 
 def value_auction_tiles(
-    auction_tiles: List[int],
-    verbose: bool = True,  # will print out its reasoning
+    auction_tiles: Sequence[int],
+    context: AuctionContext,
+    verbose: bool = False,  # will print out its reasoning
 ) -> float:
     """
     Estimate the "value" of a set of auction tiles.
@@ -19,13 +106,201 @@ def value_auction_tiles(
     function and the actual value of the tiles so long as the above requirement
     is upheld, though there is some attempt to not make the number too far
     off from the actual value of the tiles.
+
+    Valuations are memoized on the multiset of tiles and the context.
+    """
+    values = _value_auction_tiles(tuple(sorted(auction_tiles)), context)
+    if verbose:
+        logger.info(f"Valuation of {list(auction_tiles)}: {dict(values)}")
+    return sum(value for _reason, value in values)
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _value_auction_tiles(
+    auction_tiles: Tuple[int, ...], context: AuctionContext
+) -> Tuple[Tuple[str, float], ...]:
+    """Returns the value of each part of the auction tiles.
+
+    The tiles are collected first and disasters are then resolved against the
+    resulting collection, like ra.py does.
     """
-    return 0
+    new = [0] * gi.NUM_COLLECTIBLE_TILE_TYPES
+    disasters: Dict[int, int] = {}
+    for tile in auction_tiles:
+        if gi.index_is_collectible(tile):
+            new[tile] += 1
+        elif gi.index_is_disaster(tile):
+            disasters[tile] = disasters.get(tile, 0) + 1
+    current = context.collection
+    after = [num + num_new for num, num_new in zip(current, new)]
+    opponent_pharaohs = {
+        f"P{idx}": pharaohs for idx, pharaohs in enumerate(context.opponent_pharaohs)
+    }
+    current_civs = gi.get_civs_from_collection(current)
+    values: List[Tuple[str, float]] = [
+        (
+            "civs",
+            value_civs(
+                sum(
+                    1
+                    for num, num_new in zip(
+                        current_civs, gi.get_civs_from_collection(new)
+                    )
+                    if num == 0 and num_new > 0
+                ),
+                sum(1 for num in current_civs if num > 0),
+                context.ra_tiles_left_in_round,
+                context.how_many_sun_left,
+            ),
+        ),
+        (
+            "monuments",
+            value_monuments(
+                gi.get_monuments_from_collection(new),
+                gi.get_monuments_from_collection(current),
+            ),
+        ),
+        (
+            "pharaohs",
+            value_pharaohs(
+                new[gi.INDEX_OF_PHAR],
+                current[gi.INDEX_OF_PHAR],
+                opponent_pharaohs,
+                context.num_rounds_left_inc_this_one,
+            ),
+        ),
+        (
+            "niles and floods",
+            value_niles_and_flood(
+                new[gi.INDEX_OF_NILE],
+                new[gi.INDEX_OF_FLOOD],
+                current[gi.INDEX_OF_NILE],
+                current[gi.INDEX_OF_FLOOD],
+                context.ra_tiles_left_in_round,
+                context.num_rounds_left_inc_this_one,
+                context.prob_flood_this_round,
+            ),
+        ),
+        (
+            "golden gods",
+            value_golden_god(
+                new[gi.INDEX_OF_GOD], current[gi.INDEX_OF_GOD], context.prob_god_target
+            ),
+        ),
+        ("3 gold", value_3_gold(new[gi.INDEX_OF_GOLD])),
+    ]
+    if disasters:
+        values.append(
+            (
+                "disasters",
+                -value_disasters(disasters, after, opponent_pharaohs, context),
+            )
+        )
+    return tuple(values)
 
 
 """ Helper Evaluation Functions """
 
 
+def value_monuments(
+    # For each monument, how many new copies the player collects.
+    new_monuments: Sequence[int],
+    # For each monument, how many copies the player currently has.
+    current_monuments: Sequence[int],
+) -> float:
+    """
+    Evaluate the worth of new monuments as the game-end points they add.
+    """
+    return _monument_points(
+        [num + num_new for num, num_new in zip(current_monuments, new_monuments)]
+    ) - _monument_points(current_monuments)
+
+
+def value_disasters(
+    # disaster tile index -> number of those disasters
+    disasters: Mapping[int, int],
+    # The player's collection after collecting the auction tiles.
+    collection: Sequence[int],
+    num_opponent_pharaohs: Mapping[str, Tuple[int, bool]],
+    context: AuctionContext,
+) -> float:
+    """
+    Evaluate how much the player loses by resolving the given disasters. Civs and
+    monuments are chosen by the player, so the cheapest tiles are discarded.
+    """
+    penalty = 0.0
+
+    num_phars = collection[gi.INDEX_OF_PHAR]
+    num_discards = gi.NUM_DISCARDS_PER_DISASTER * disasters.get(gi.INDEX_OF_DIS_PHAR, 0)
+    lost_phars = min(num_phars, num_discards)
+    if lost_phars > 0:
+        penalty += value_pharaohs(
+            lost_phars,
+            num_phars - lost_phars,
+            num_opponent_pharaohs,
+            context.num_rounds_left_inc_this_one,
+        )
+
+    # Floods are discarded before niles.
+    num_discards = gi.NUM_DISCARDS_PER_DISASTER * disasters.get(gi.INDEX_OF_DIS_NILE, 0)
+    num_niles, num_floods = collection[gi.INDEX_OF_NILE], collection[gi.INDEX_OF_FLOOD]
+    lost_floods = min(num_floods, num_discards)
+    lost_niles = min(num_niles, num_discards - lost_floods)
+    if lost_floods + lost_niles > 0:
+        penalty += value_niles_and_flood(
+            lost_niles,
+            lost_floods,
+            num_niles - lost_niles,
+            num_floods - lost_floods,
+            context.ra_tiles_left_in_round,
+            context.num_rounds_left_inc_this_one,
+        )
+
+    # Duplicate civs are discarded before distinct ones.
+    num_discards = gi.NUM_DISCARDS_PER_DISASTER * disasters.get(gi.INDEX_OF_DIS_CIV, 0)
+    civs = gi.get_civs_from_collection(collection)
+    num_distinct_civs = sum(1 for num in civs if num > 0)
+    num_duplicate_civs = sum(civs) - num_distinct_civs
+    lost_civs = min(num_distinct_civs, max(0, num_discards - num_duplicate_civs))
+    if lost_civs > 0:
+        penalty += value_civs(
+            lost_civs,
+            num_distinct_civs - lost_civs,
+            context.ra_tiles_left_in_round,
+            context.how_many_sun_left,
+        )
+
+    num_discards = gi.NUM_DISCARDS_PER_DISASTER * disasters.get(gi.INDEX_OF_DIS_MON, 0)
+    if num_discards > 0:
+        penalty += _cheapest_monument_discards(
+            gi.get_monuments_from_collection(collection), num_discards
+        )
+
+    return penalty
+
+
+def _monument_points(monuments: Sequence[int]) -> int:
+    """Game-end points for the given number of copies of each monument."""
+    return sum(gi.points_for_monument_depth(num) for num in monuments) + (
+        gi.POINTS_FOR_MON_BREADTH[sum(1 for num in monuments if num > 0)]
+    )
+
+
+def _cheapest_monument_discards(monuments: Sequence[int], num_discards: int) -> int:
+    """The fewest game-end points lost by discarding num_discards monuments."""
+    if sum(monuments) <= num_discards:
+        return _monument_points(monuments)
+    owned = [idx for idx, num in enumerate(monuments) if num > 0]
+    points_after = []
+    for discards in itertools.combinations_with_replacement(owned, num_discards):
+        remaining = list(monuments)
+        for idx in discards:
+            remaining[idx] -= 1
+        if min(remaining) >= 0:
+            points_after.append(_monument_points(remaining))
+    return _monument_points(monuments) - max(points_after)
+
+
 def value_civs(
     # The number of distinct civ tiles that the player does not have.
     num_distinct_new_civs: int,
@@ -79,11 +354,13 @@ def value_niles_and_flood(
     num_current_floods: int,
     num_ras_left_in_current_round: int,
     num_rounds_left_inc_this_one: int,
+    # Chance of collecting a flood this round, if known (see probability.py).
+    prob_flood_this_round: Optional[float] = None,
 ) -> float:
-    # TODO(albertz): should factor in the number of ras left in the current round
+    if num_new_floods + num_current_floods > 0:
+        prob_flood_this_round = 1.0
     nile_value = num_new_niles * (
-        num_rounds_left_inc_this_one * 0.5
-        + (0.5 if num_new_floods + num_current_floods > 0 else 0)
+        num_rounds_left_inc_this_one * 0.5 + 0.5 * (prob_flood_this_round or 0.0)
     )
     flood_value = num_new_floods + (num_current_niles if num_current_floods == 0 else 0)
     return nile_value + flood_value
@@ -93,18 +370,24 @@ def value_3_gold(num_3_gold: int) -> float:
     return num_3_gold * 3
 
 
-def value_golden_god(num_new_golden_gods: int, num_current_golden_gods: int) -> float:
+def value_golden_god(
+    num_new_golden_gods: int,
+    num_current_golden_gods: int,
+    # Chance a tile worth taking with the god is drawn before the round ends, if
+    # known (see probability.py and god_targets).
+    prob_god_target: Optional[float] = None,
+) -> float:
     # TODO(albertz): need to factor in a variety of things, including:
     # - Time left in round, eg. num ra tiles left
     # - Whether the player will have time to use the golden god, eg. num suns left
-    # - Number of "priority" tiles left, of which there are the following:
-    #     - +3rd Copy Monument
-    #     - +7th Distinct Monument
-    #     - Civs
     # - Number of golden gods total, since generally only the first is very valuable
 
     if num_current_golden_gods == 0:
-        first_god_value = 3 if num_new_golden_gods > 0 else 0
+        first_god_value = (
+            2 + (1 if prob_god_target is None else prob_god_target)
+            if num_new_golden_gods > 0
+            else 0
+        )
         additional_god_value = 2 * max(num_new_golden_gods - 1, 0)
         return first_god_value + additional_god_value
     else:
@@ -1,8 +1,10 @@
-from typing import Dict, Iterable, Mapping, Sequence
+import itertools
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
 
 from game import info as gi
 from game import scoring_utils as scoring
 from game import state as gs
+from game.decision_functions import evaluate_auction_tiles_utils as au
 
 STARTING_BASE_VALUE_OF_SUN = 6
 
@@ -62,6 +64,58 @@ SUN_MODIFIER_MAPPING: Mapping[int, Mapping[int, float]] = {
 }
 
 
+# Suns a player holds, in sorted order.
+TSunSet = Tuple[int, ...]
+
+# _USABLE_SUN_VALUES[num_players][suns][num_ras] is value_one_players_usable_sun of
+# the suns when num_ras Ras have been drawn this round.
+_USABLE_SUN_VALUES: Dict[int, Dict[TSunSet, List[float]]] = {}
+# _UNUSABLE_SUN_VALUES[num_players][suns] is value_one_players_unusable_sun.
+_UNUSABLE_SUN_VALUES: Dict[int, Dict[TSunSet, float]] = {}
+
+
+def _possible_sun_sets(num_players: int) -> Iterable[TSunSet]:
+    """Every set of suns a player can hold. Suns are exchanged one for one."""
+    suns = sorted(SUN_MODIFIER_MAPPING[num_players])
+    for num_suns in range(len(gi.STARTING_SUN[num_players][0]) + 1):
+        yield from itertools.combinations(suns, num_suns)
+
+
+def _build_sun_tables() -> None:
+    for num_players in SUN_MODIFIER_MAPPING:
+        _USABLE_SUN_VALUES[num_players] = {
+            sun_set: [
+                value_one_players_usable_sun(sun_set, num_players, num_ras)
+                for num_ras in range(gi.NUM_RAS_PER_ROUND[num_players] + 1)
+            ]
+            for sun_set in _possible_sun_sets(num_players)
+        }
+        _UNUSABLE_SUN_VALUES[num_players] = {
+            sun_set: value_one_players_unusable_sun(sun_set, num_players)
+            for sun_set in _possible_sun_sets(num_players)
+        }
+
+
+def lookup_usable_sun_value(
+    usable_sun: Sequence[int], num_players: int, num_ras_so_far: int
+) -> float:
+    """Same as value_one_players_usable_sun, read from a precomputed table."""
+    try:
+        return _USABLE_SUN_VALUES[num_players][tuple(usable_sun)][num_ras_so_far]
+    except (KeyError, IndexError):
+        # Not reachable in a real game.
+        return value_one_players_usable_sun(usable_sun, num_players, num_ras_so_far)
+
+
+def lookup_unusable_sun_value(unusable_sun: Sequence[int], num_players: int) -> float:
+    """Same as value_one_players_unusable_sun, read from a precomputed table."""
+    try:
+        return _UNUSABLE_SUN_VALUES[num_players][tuple(unusable_sun)]
+    except KeyError:
+        # Not reachable in a real game.
+        return value_one_players_unusable_sun(unusable_sun, num_players)
+
+
 def evaluate_game_state_no_auction_tiles(game_state: gs.GameState) -> Dict[int, float]:
     """
     Given a gamestate, provide a "valuation" for each player's state. Does NOT factor in
@@ -114,15 +168,73 @@ def evaluate_game_state_no_auction_tiles(game_state: gs.GameState) -> Dict[int,
     return player_state_valuations
 
 
+def likely_auction_winner(game_state: gs.GameState) -> Optional[int]:
+    """
+    Guesses who wins the current auction tiles: the active player with the highest
+    usable sun, unless a higher sun has already been bid. None if no one can bid.
+    """
+    auction_suns = game_state.get_auction_suns()
+    winner: Optional[int] = None
+    best_sun = max((sun for sun in auction_suns if sun is not None), default=0)
+    if best_sun > 0:
+        winner = auction_suns.index(best_sun)
+    for player_state in game_state.player_states:
+        player_idx = player_state.get_player_idx()
+        usable_sun = player_state.get_usable_sun()
+        if (
+            usable_sun
+            and game_state.is_player_active(player_idx)
+            and max(usable_sun) > best_sun
+        ):
+            winner, best_sun = player_idx, max(usable_sun)
+    return winner
+
+
+def value_of_auction_tiles(game_state: gs.GameState) -> Dict[int, float]:
+    """
+    Returns how much each player's valuation changes once the current auction tiles
+    are won, crediting the likely winner with the tiles and charging them the sun
+    they exchange for the center sun.
+    """
+    valuations = {idx: 0.0 for idx in range(game_state.get_num_players())}
+    if game_state.get_num_auction_tiles() == 0:
+        return valuations
+    winner = likely_auction_winner(game_state)
+    if winner is None:
+        return valuations
+
+    num_players = game_state.get_num_players()
+    num_ras = game_state.get_current_num_ras()
+    player_state = game_state.player_states[winner]
+    usable_sun = player_state.get_usable_sun()
+    bid_sun = game_state.get_auction_suns()[winner]
+    if bid_sun is None:
+        bid_sun = max(usable_sun)
+    remaining_sun = [sun for sun in usable_sun if sun != bid_sun]
+    sun_cost = lookup_usable_sun_value(usable_sun, num_players, num_ras)
+    sun_cost -= lookup_usable_sun_value(remaining_sun, num_players, num_ras)
+    if not game_state.is_final_round():
+        unusable_sun = player_state.get_unusable_sun()
+        received_sun = sorted([*unusable_sun, game_state.get_center_sun()])
+        sun_cost += lookup_unusable_sun_value(unusable_sun, num_players)
+        sun_cost -= lookup_unusable_sun_value(received_sun, num_players)
+
+    valuations[winner] = (
+        au.value_auction_tiles(
+            game_state.get_auction_tiles(), au.auction_context(game_state, winner)
+        )
+        - sun_cost
+    )
+    return valuations
+
+
 def value_of_usable_sun(game_state: gs.GameState) -> Dict[int, float]:
     """
     Returns the valuation of each player's remaining sun.
     """
     usable_sun_valuations: Dict[int, float] = {}
     for player_state in game_state.player_states:
-        usable_sun_valuations[
-            player_state.get_player_idx()
-        ] = value_one_players_usable_sun(
+        usable_sun_valuations[player_state.get_player_idx()] = lookup_usable_sun_value(
             player_state.get_usable_sun(),
             game_state.get_num_players(),
             game_state.get_current_num_ras(),
@@ -182,7 +294,7 @@ def value_of_unusable_sun(game_state: gs.GameState) -> Dict[int, float]:
     for player_state in game_state.player_states:
         unusable_sun_valuations[
             player_state.get_player_idx()
-        ] = value_one_players_unusable_sun(
+        ] = lookup_unusable_sun_value(
             player_state.get_unusable_sun(), game_state.get_num_players()
         )
     return unusable_sun_valuations
@@ -193,3 +305,6 @@ def value_one_players_unusable_sun(
 ) -> float:
     sun_modifiers = SUN_MODIFIER_MAPPING[num_players]
     return sum(sun_modifiers[sun] for sun in unusable_sun)
+
+
+_build_sun_tables()
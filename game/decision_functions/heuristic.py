@@ -0,0 +1,196 @@
+"""
+Greedy heuristic AI.
+
+Decides every move from the value of the auction tiles to the current player and
+the value of the suns they would give up, without searching. Both valuations are
+memoized on the auction tiles, suns and Ras left, so a move takes well under a
+millisecond.
+"""
+import functools
+from typing import List, Sequence, Tuple
+
+from game import info as gi
+from game import ra
+from game import state as gs
+from game.decision_functions import evaluate_auction_tiles_utils as au
+from game.decision_functions import evaluate_game_state as e
+
+# Start an auction once the tiles are worth this much more than the sun they cost.
+# The threshold shrinks as the Ras of the round run out.
+AUCTION_THRESHOLD: float = 2.0
+# Use a golden god on a tile worth this much more than keeping the god.
+GOD_THRESHOLD: float = 3.0
+
+_BIDS: List[int] = [gi.BID_1, gi.BID_2, gi.BID_3, gi.BID_4]
+_GODS: List[int] = [
+    gi.GOD_1,
+    gi.GOD_2,
+    gi.GOD_3,
+    gi.GOD_4,
+    gi.GOD_5,
+    gi.GOD_6,
+    gi.GOD_7,
+    gi.GOD_8,
+]
+_CIV_DISCARDS: List[int] = [
+    gi.DISCARD_ASTR,
+    gi.DISCARD_AGR,
+    gi.DISCARD_WRI,
+    gi.DISCARD_REL,
+    gi.DISCARD_ART,
+]
+_MON_DISCARDS: List[int] = [
+    gi.DISCARD_FORT,
+    gi.DISCARD_OBEL,
+    gi.DISCARD_PAL,
+    gi.DISCARD_PYR,
+    gi.DISCARD_TEM,
+    gi.DISCARD_STAT,
+    gi.DISCARD_STE,
+    gi.DISCARD_SPH,
+]
+
+
+@functools.lru_cache(maxsize=1 << 14)
+def sun_costs(
+    usable_sun: Tuple[int, ...],
+    unusable_sun: Tuple[int, ...],
+    center_sun: int,
+    num_players: int,
+    num_ras_so_far: int,
+    is_final_round: bool,
+) -> Tuple[float, ...]:
+    """
+    For each usable sun, how much the player's valuation drops by exchanging it for
+    the center sun.
+    """
+    value_before = e.lookup_usable_sun_value(usable_sun, num_players, num_ras_so_far)
+    center_value = 0.0
+    if not is_final_round:
+        center_value = e.lookup_unusable_sun_value(
+            sorted([*unusable_sun, center_sun]), num_players
+        ) - e.lookup_unusable_sun_value(unusable_sun, num_players)
+    return tuple(
+        value_before
+        - e.lookup_usable_sun_value(
+            [other for other in usable_sun if other != sun],
+            num_players,
+            num_ras_so_far,
+        )
+        - center_value
+        for sun in usable_sun
+    )
+
+
+def _current_sun_costs(game_state: gs.GameState) -> Tuple[float, ...]:
+    player_state = game_state.player_states[game_state.get_current_player()]
+    return sun_costs(
+        tuple(player_state.get_usable_sun()),
+        tuple(player_state.get_unusable_sun()),
+        game_state.get_center_sun(),
+        game_state.get_num_players(),
+        game_state.get_current_num_ras(),
+        game_state.is_final_round(),
+    )
+
+
+def _value_of_tiles(game_state: gs.GameState, tiles: Sequence[int]) -> float:
+    return au.value_auction_tiles(
+        tiles, au.auction_context(game_state, game_state.get_current_player())
+    )
+
+
+def heuristic_ai_player(game_state: gs.GameState) -> int:
+    legal_actions = ra.get_possible_actions(game_state)
+    assert legal_actions, "no legal actions"
+    if len(legal_actions) == 1:
+        return legal_actions[0]
+    if game_state.is_auction_started():
+        return _choose_bid(game_state, legal_actions)
+    if game_state.disasters_must_be_resolved():
+        return _choose_discard(game_state, legal_actions)
+    return _choose_draw_or_auction(game_state, legal_actions)
+
+
+def _choose_bid(game_state: gs.GameState, legal_actions: Sequence[int]) -> int:
+    """Bids the sun that gains the most, or nothing if no sun is worth it."""
+    tiles_value = _value_of_tiles(game_state, game_state.get_auction_tiles())
+    costs = _current_sun_costs(game_state)
+    best_action = gi.BID_NOTHING if gi.BID_NOTHING in legal_actions else None
+    best_gain = 0.0 if best_action is not None else float("-inf")
+    for i, action in enumerate(_BIDS[: len(costs)]):
+        if action in legal_actions and tiles_value - costs[i] > best_gain:
+            best_action, best_gain = action, tiles_value - costs[i]
+    assert best_action is not None, "no bid found"
+    return best_action
+
+
+def _choose_discard(game_state: gs.GameState, legal_actions: Sequence[int]) -> int:
+    """Discards the civ or monument whose loss costs the least."""
+    collection = game_state.get_player_collection(
+        game_state.get_auction_winning_player()
+    )
+    if game_state.get_num_civs_to_discard() > 0:
+        civs = gi.get_civs_from_collection(collection)
+        return max(
+            (action for action in _CIV_DISCARDS if action in legal_actions),
+            key=lambda action: civs[_CIV_DISCARDS.index(action)],
+        )
+
+    monuments = gi.get_monuments_from_collection(collection)
+
+    def loss(action: int) -> float:
+        idx = _MON_DISCARDS.index(action)
+        discarded = [0] * gi.NUM_MONUMENTS
+        discarded[idx] = 1
+        remaining = list(monuments)
+        remaining[idx] -= 1
+        return au.value_monuments(discarded, remaining)
+
+    return min(
+        (action for action in _MON_DISCARDS if action in legal_actions), key=loss
+    )
+
+
+def _choose_draw_or_auction(
+    game_state: gs.GameState, legal_actions: Sequence[int]
+) -> int:
+    auction_tiles = game_state.get_auction_tiles()
+    gods = [action for action in _GODS if action in legal_actions]
+    if gods:
+        best_god = max(
+            gods,
+            key=lambda action: _value_of_tiles(
+                game_state, [auction_tiles[_GODS.index(action)]]
+            ),
+        )
+        tile = auction_tiles[_GODS.index(best_god)]
+        if _value_of_tiles(game_state, [tile]) - gi.POINTS_PER_GOD >= GOD_THRESHOLD:
+            return best_god
+
+    if gi.DRAW not in legal_actions:
+        return gi.AUCTION
+    if not auction_tiles:
+        return gi.DRAW
+
+    # The sun needed to outbid every other active player, if any.
+    usable_sun = game_state.get_current_player_usable_sun()
+    opposing_sun = max(
+        (
+            max(player_state.get_usable_sun(), default=0)
+            for player_state in game_state.player_states
+            if player_state.get_player_idx() != game_state.get_current_player()
+            and game_state.is_player_active(player_state.get_player_idx())
+        ),
+        default=0,
+    )
+    winning_suns = [i for i, sun in enumerate(usable_sun) if sun > opposing_sun]
+    if not winning_suns:
+        return gi.DRAW
+    gain = (
+        _value_of_tiles(game_state, auction_tiles)
+        - _current_sun_costs(game_state)[winning_suns[0]]
+    )
+    ras_left = game_state.get_num_ras_per_round() - game_state.get_current_num_ras()
+    threshold = AUCTION_THRESHOLD * ras_left / game_state.get_num_ras_per_round()
+    return gi.AUCTION if gain >= threshold else gi.DRAW
@@ -0,0 +1,160 @@
+"""
+Memory accounting of the AI caches and live games.
+
+Estimates are cheap enough to compute on every request: transposition tables are
+flat arrays, so they use their slots times BYTES_PER_SLOT, and a game uses the
+size of a fresh game state of its player count (measured once with
+scoring_utils.get_size) plus a fixed size per logged move.
+
+For anything the estimates miss, start_tracing() turns on tracemalloc, after which
+top_allocations() reports where the memory of the process actually went. Tracing
+slows down every allocation, so it is off unless asked for.
+"""
+import functools
+import sys
+import tracemalloc
+from typing import Iterable, List, Optional, TypedDict
+
+from game import ra, scoring_utils
+from game import state as gs
+from game.decision_functions import endgame
+from game.decision_functions import opening_book as ob
+from game.decision_functions import oracle as o
+from game.decision_functions import session, transposition
+
+# A logged draw is a ("0", tile) tuple, other actions are small cached ints.
+_BYTES_PER_LOGGED_MOVE: int = sys.getsizeof(("0", 0)) + 8
+# Frames of the allocating stack kept by tracemalloc.
+_TRACE_FRAMES: int = 1
+
+
+class TableUsage(TypedDict):
+    numTables: int
+    entries: int
+    slots: int
+    bytes: int
+
+
+class Allocation(TypedDict):
+    # file:line of the allocation.
+    location: str
+    bytes: int
+    count: int
+
+
+class MemoryUsage(TypedDict):
+    # The table of searches outside any session.
+    globalTable: TableUsage
+    sessionTables: TableUsage
+    # The memo of the endgame solver.
+    endgameTable: TableUsage
+    # Mapped read-only and shared by every worker, so not part of totalBytes.
+    openingBookBytes: int
+    numGames: int
+    gameBytes: int
+    bytesPerGame: float
+    totalBytes: int
+    # Only set while tracing.
+    topAllocations: Optional[List[Allocation]]
+
+
+def table_usage(tables: Iterable[transposition.TranspositionTable]) -> TableUsage:
+    """Memory of the given tables, summed."""
+    usage = TableUsage(numTables=0, entries=0, slots=0, bytes=0)
+    for table in tables:
+        usage["numTables"] += 1
+        usage["entries"] += len(table)
+        usage["slots"] += table.num_slots()
+        usage["bytes"] += table.num_slots() * transposition.BYTES_PER_SLOT
+    return usage
+
+
+@functools.lru_cache(maxsize=None)
+def game_state_bytes(num_players: int) -> int:
+    """Size of a fresh game state with num_players players."""
+    return scoring_utils.get_size(
+        gs.GameState([f"P{idx + 1}" for idx in range(num_players)])
+    )
+
+
+def game_bytes(game: ra.RaGame) -> int:
+    """Estimated size of a game, including its log of moves."""
+    return (
+        game_state_bytes(game.num_players)
+        + len(game.logged_moves) * _BYTES_PER_LOGGED_MOVE
+    )
+
+
+def usage(games: Iterable[ra.RaGame] = ()) -> MemoryUsage:
+    """Memory used by the transposition tables and the given games."""
+    global_table = table_usage([o.value_state.cache])
+    session_tables = table_usage(session.tables())
+    endgame_table = table_usage([endgame.solver.table])
+    games = list(games)
+    total_game_bytes = sum(game_bytes(game) for game in games)
+    return MemoryUsage(
+        globalTable=global_table,
+        sessionTables=session_tables,
+        endgameTable=endgame_table,
+        openingBookBytes=ob.mapped_bytes(),
+        numGames=len(games),
+        gameBytes=total_game_bytes,
+        bytesPerGame=total_game_bytes / max(1, len(games)),
+        totalBytes=global_table["bytes"]
+        + session_tables["bytes"]
+        + endgame_table["bytes"]
+        + total_game_bytes,
+        topAllocations=top_allocations() if tracemalloc.is_tracing() else None,
+    )
+
+
+def start_tracing() -> None:
+    """Starts tracing allocations, see top_allocations."""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(_TRACE_FRAMES)
+
+
+def stop_tracing() -> None:
+    tracemalloc.stop()
+
+
+def top_allocations(limit: int = 10) -> List[Allocation]:
+    """The lines that allocated the most memory still alive since tracing started."""
+    assert tracemalloc.is_tracing(), "Call start_tracing first"
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__)]
+    )
+    return [
+        Allocation(
+            location=f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            bytes=stat.size,
+            count=stat.count,
+        )
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
+
+
+def format_usage(memory_usage: MemoryUsage) -> str:
+    lines = []
+    for name in ["globalTable", "sessionTables", "endgameTable"]:
+        table = memory_usage[name]
+        lines.append(
+            f"{name}: {table['numTables']} tables, {table['entries']} entries, "
+            f"{scoring_utils.sizeof_fmt(table['bytes'])}"
+        )
+    lines.append(
+        f"openingBook: {scoring_utils.sizeof_fmt(memory_usage['openingBookBytes'])}"
+    )
+    lines.append(
+        f"games: {memory_usage['numGames']}, "
+        f"{scoring_utils.sizeof_fmt(memory_usage['gameBytes'])} "
+        f"({scoring_utils.sizeof_fmt(memory_usage['bytesPerGame'])} per game)"
+    )
+    lines.append(f"total: {scoring_utils.sizeof_fmt(memory_usage['totalBytes'])}")
+    for allocation in memory_usage["topAllocations"] or []:
+        lines.append(
+            f"  {allocation['location']}: "
+            f"{scoring_utils.sizeof_fmt(allocation['bytes'])} "
+            f"in {allocation['count']} blocks"
+        )
+    return "\n".join(lines)
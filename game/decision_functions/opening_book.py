@@ -0,0 +1,232 @@
+"""
+Precomputed opening book.
+
+The first decisions of every game only depend on the player count and on how the
+starting suns were dealt, so their values can be computed offline. The book is a
+file holding an open-addressing table keyed by a canonical hash of the public game
+state. It is memory-mapped read-only, so lookups never parse the file and forked
+workers share the same pages. Values come from PIMC search, so only the PIMC player
+consults the book; the oracle sees the draw order and searches for itself.
+
+To build a book, run:
+
+    python -m game.decision_functions.build_opening_book -o opening_book.bin
+
+and point the OPENING_BOOK_PATH environment variable at the result.
+"""
+import hashlib
+import itertools
+import logging
+import math
+import mmap
+import os
+import struct
+from typing import Dict, Iterator, List, Mapping, Optional
+
+from game import info as gi
+from game import ra
+from game import state as gs
+from game.proxy import copy
+
+logger: logging.Logger = logging.getLogger("uvicorn.info")
+
+TAction = int
+
+_MAGIC: bytes = b"RAOB"
+_VERSION: int = 1
+# magic, version, number of actions per slot, number of slots.
+_HEADER: struct.Struct = struct.Struct("<4sHHI")
+_NUM_ACTIONS: int = len(gi.ACTION_MAPPING)
+# key, then the value of every action as a float16 (NaN when not an option).
+_SLOT: struct.Struct = struct.Struct(f"<Q{_NUM_ACTIONS}e")
+_EMPTY_KEY: int = 0
+
+_BOOK: Optional["OpeningBook"] = None
+_BOOK_LOADED: bool = False
+
+
+def canonical_key(game_state: gs.GameState) -> int:
+    """A stable 64-bit hash of everything public about the game state.
+
+    Unlike hash(game_state), the key ignores the draw order and does not depend on
+    the process it is computed in.
+    """
+    public_state = (
+        game_state.num_players,
+        game_state.current_round,
+        game_state.num_ras_this_round,
+        game_state.center_sun,
+        tuple(sorted(game_state.auction_tiles)),
+        tuple(game_state.auction_suns),
+        game_state.auction_started,
+        game_state.auction_forced,
+        game_state.auction_start_player,
+        game_state.current_player,
+        game_state.num_mons_to_discard,
+        game_state.num_civs_to_discard,
+        game_state.auction_winning_player,
+        tuple(game_state.active_players),
+        game_state.game_ended,
+        tuple(game_state.get_tile_bag_contents()),
+        tuple(
+            (
+                player_state.points,
+                tuple(player_state.collection),
+                tuple(player_state.usable_sun),
+                tuple(player_state.unusable_sun),
+            )
+            for player_state in game_state.player_states
+        ),
+    )
+    digest = hashlib.blake2b(repr(public_state).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, byteorder="little") or 1
+
+
+class OpeningBook:
+    """Read-only view over a memory-mapped book file."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self._mmap: mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError(f"{path} is not a compatible opening book.")
+        magic, version, num_actions, self.num_slots = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC or version != _VERSION or num_actions != _NUM_ACTIONS:
+            raise ValueError(f"{path} is not a compatible opening book.")
+
+    def __len__(self) -> int:
+        return sum(
+            1
+            for slot in range(self.num_slots)
+            if _SLOT.unpack_from(self._mmap, self._offset(slot))[0] != _EMPTY_KEY
+        )
+
+    def _offset(self, slot: int) -> int:
+        return _HEADER.size + slot * _SLOT.size
+
+    def action_values(self, game_state: gs.GameState) -> Optional[Dict[TAction, float]]:
+        """Returns the value of each action for the current player, if in the book."""
+        key = canonical_key(game_state)
+        slot = key % self.num_slots
+        for _ in range(self.num_slots):
+            entry = _SLOT.unpack_from(self._mmap, self._offset(slot))
+            if entry[0] == _EMPTY_KEY:
+                return None
+            if entry[0] == key:
+                return {
+                    action: value
+                    for action, value in enumerate(entry[1:])
+                    if not math.isnan(value)
+                }
+            slot = (slot + 1) % self.num_slots
+        return None
+
+    def best_action(self, game_state: gs.GameState) -> Optional[TAction]:
+        """Returns the best action for the current player, if in the book."""
+        if not (action_values := self.action_values(game_state)):
+            return None
+        return max(action_values, key=lambda action: action_values[action])
+
+    def nbytes(self) -> int:
+        """Size of the mapped file."""
+        return len(self._mmap)
+
+    def close(self) -> None:
+        self._mmap.close()
+
+
+def write_book(path: str, entries: Mapping[int, Mapping[TAction, float]]) -> None:
+    """Writes the action values for each canonical key to a book file."""
+    num_slots = 1
+    while num_slots < 2 * len(entries):
+        num_slots *= 2
+    slots: List[Optional[bytes]] = [None] * num_slots
+    for key, action_values in entries.items():
+        values = [math.nan] * _NUM_ACTIONS
+        for action, value in action_values.items():
+            values[action] = value
+        slot = key % num_slots
+        while slots[slot] is not None:
+            slot = (slot + 1) % num_slots
+        slots[slot] = _SLOT.pack(key, *values)
+
+    empty = _SLOT.pack(_EMPTY_KEY, *([math.nan] * _NUM_ACTIONS))
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, _NUM_ACTIONS, num_slots))
+        for packed in slots:
+            f.write(packed or empty)
+
+
+def load(path: Optional[str] = None) -> Optional[OpeningBook]:
+    """Loads the book used by lookup(), once.
+
+    Defaults to the OPENING_BOOK_PATH environment variable. A missing file means no
+    book, while an incompatible one raises ValueError and is loaded again by the next
+    call. Call this at startup, before forking workers so they all share the same
+    mapping.
+    """
+    global _BOOK, _BOOK_LOADED
+    if _BOOK_LOADED and path is None:
+        return _BOOK
+    path = path or os.environ.get("OPENING_BOOK_PATH")
+    book = None
+    if path and not os.path.exists(path):
+        logger.warning(f"No opening book at {path}, playing without one")
+    elif path:
+        book = OpeningBook(path)
+        logger.info(f"Loaded opening book with {book.num_slots} slots from {path}")
+    if _BOOK is not None:
+        _BOOK.close()
+    _BOOK, _BOOK_LOADED = book, True
+    return _BOOK
+
+
+def mapped_bytes() -> int:
+    """Size of the loaded book's mapping, 0 without a book."""
+    return 0 if _BOOK is None else _BOOK.nbytes()
+
+
+def lookup(game_state: gs.GameState) -> Optional[TAction]:
+    """Returns the book action for the game state, if a book was loaded."""
+    if _BOOK is None:
+        return None
+    return _BOOK.best_action(game_state)
+
+
+def _draw(game_state: gs.GameState, tile: int) -> None:
+    """Draws the given tile. The rest of the draw order does not matter for the book."""
+    draw_order = [tile] + [
+        other
+        for other, count in enumerate(game_state.get_tile_bag_contents())
+        for _ in range(count - (1 if other == tile else 0))
+    ]
+    game_state.tile_bag = gs.TileBag(draw_order=draw_order)
+    ra.execute_action_internal(game_state, gi.DRAW)
+
+
+def opening_positions(num_players: int, depth: int = 0) -> Iterator[gs.GameState]:
+    """Yields every position reachable by drawing `depth` tiles at the start.
+
+    The first player always gets the lowest sun set, while the remaining sets can be
+    dealt in any order.
+    """
+    # Sorted since GameState shuffles the starting sun sets in place.
+    first_set, *other_sets = sorted(gi.STARTING_SUN[num_players])
+    for permutation in itertools.permutations(other_sets):
+        game_state = gs.GameState([f"P{idx + 1}" for idx in range(num_players)])
+        for player_state, sun_set in zip(
+            game_state.player_states, [first_set, *permutation]
+        ):
+            player_state.set_usable_sun(sun_set)
+        yield from _drawn_positions(game_state, depth)
+
+
+def _drawn_positions(game_state: gs.GameState, depth: int) -> Iterator[gs.GameState]:
+    yield game_state
+    if depth == 0 or ra.get_possible_actions(game_state) != [gi.DRAW, gi.AUCTION]:
+        return
+    for tile, count in enumerate(game_state.get_tile_bag_contents()):
+        if count > 0:
+            game_state_copy = copy.deepcopy(game_state)
+            _draw(game_state_copy, tile)
+            yield from _drawn_positions(game_state_copy, depth - 1)
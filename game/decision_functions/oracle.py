@@ -1,14 +1,14 @@
 import logging
+import os
 import pprint
 import time
 from typing import (
     Callable,
     Dict,
     Generic,
-    Iterable,
-    Iterator,
     Mapping,
     Optional,
+    Sequence,
     TypedDict,
     TypeVar,
     cast,
@@ -16,27 +16,138 @@ from typing import (
 
 from typing_extensions import ParamSpec
 
-from game import encoding
 from game import info as gi
 from game import ra
 from game import state as gs
+from game.decision_functions import endgame
 from game.decision_functions import evaluate_game_state as e
+from game.decision_functions import profiling
 from game.decision_functions import search as s
+from game.decision_functions import session, transposition
+from game.decision_functions import value_model as vm
 from game.proxy import copy
 
 logger: logging.Logger = logging.getLogger("uvicorn.info")
 
 _MAX_RAS: int = max(gi.NUM_RAS_PER_ROUND.values())
 
-
-def oracle_ai_player(game_state: gs.GameState) -> int:
-    return oracle_search(game_state)
-
-
 TAction = int
 TPlayer = int
 TScore = float
 
+TEvaluator = Callable[[gs.GameState], Mapping[int, float]]
+TBatchEvaluator = Callable[[Sequence[gs.GameState]], Sequence[Mapping[int, float]]]
+
+_EVALUATOR: Optional[TEvaluator] = None
+_BATCH_EVALUATOR: Optional[TBatchEvaluator] = None
+
+
+def get_evaluator() -> TEvaluator:
+    """Returns the function valuing search leaves without auction tiles.
+
+    Defaults to the model at VALUE_MODEL_PATH if set, or the hand-tuned evaluator.
+    """
+    if _EVALUATOR is None:
+        if model_path := os.environ.get("VALUE_MODEL_PATH"):
+            model = vm.LinearValueModel.load(model_path)
+            set_evaluator(model.evaluate, batch_evaluator=model.evaluate_batch)
+            logger.info(f"Loaded value model from {model_path}")
+        else:
+            set_evaluator(e.evaluate_game_state_no_auction_tiles)
+    assert _EVALUATOR is not None
+    return _EVALUATOR
+
+
+def get_batch_evaluator() -> TBatchEvaluator:
+    """Returns the function valuing many states at once, eg. to label a dataset.
+
+    Falls back to calling the leaf evaluator on each state.
+    """
+    evaluator = get_evaluator()
+    if _BATCH_EVALUATOR is not None:
+        return _BATCH_EVALUATOR
+    return lambda game_states: [evaluator(game_state) for game_state in game_states]
+
+
+def set_evaluator(
+    evaluator: Optional[TEvaluator], batch_evaluator: Optional[TBatchEvaluator] = None
+) -> None:
+    """Overrides the leaf evaluator of this process. None restores the default.
+
+    batch_evaluator, if given, must agree with evaluator. Cached values computed
+    with the previous evaluator are not cleared.
+    """
+    global _EVALUATOR, _BATCH_EVALUATOR
+    _EVALUATOR, _BATCH_EVALUATOR = evaluator, batch_evaluator
+
+
+_ESTIMATE_AUCTIONS: bool = False
+
+
+def set_estimate_auctions(enabled: bool) -> None:
+    """Whether searches may stop at states with pending auction tiles.
+
+    When enabled, once no auctions are left to search, states whose auction tiles
+    are not yet won are valued by crediting the likely winner with the tiles
+    instead of searching the rest of the auction. Like set_evaluator, cached
+    values are not cleared.
+    """
+    global _ESTIMATE_AUCTIONS
+    _ESTIMATE_AUCTIONS = enabled
+
+
+def _is_leaf(game_state: gs.GameState, max_auctions: int) -> bool:
+    """Whether a search with max_auctions left stops at the (unended) state."""
+    if max_auctions > 0:
+        return False
+    if game_state.get_num_auction_tiles() == 0:
+        return True
+    return _ESTIMATE_AUCTIONS and not game_state.disasters_must_be_resolved()
+
+
+# The hot path of a search, timed while profiling is enabled.
+_copy_state = copy.deepcopy
+_execute = ra.execute_action_internal
+_legal_actions = ra.get_possible_actions
+_hash_state = hash
+_probe = transposition.TranspositionTable.probe
+_store = transposition.TranspositionTable.store
+
+
+def _to_scores(
+    game_state: gs.GameState, ret: Mapping[int, float]
+) -> tuple[TScore, ...]:
+    scores = [0.0] * len(ret)
+    for idx, score in ret.items():
+        scores[idx] = score
+    if game_state.get_num_auction_tiles() > 0:
+        for idx, value in e.value_of_auction_tiles(game_state).items():
+            scores[idx] += value
+    return tuple(scores)
+
+
+def _estimate(game_state: gs.GameState) -> tuple[TScore, ...]:
+    """Values a leaf of the search for each player."""
+    return _to_scores(game_state, get_evaluator()(game_state))
+
+
+profiling.register(
+    globals(),
+    {
+        "_copy_state": "copy",
+        "_execute": "execute",
+        "_legal_actions": "actions",
+        "_hash_state": "hash",
+        "_probe": "cache",
+        "_store": "cache",
+        "_estimate": "evaluate",
+    },
+)
+
+
+def oracle_ai_player(game_state: gs.GameState) -> int:
+    return oracle_search(game_state)
+
 
 class Metrics(TypedDict):
     __slots__ = (
@@ -58,6 +169,8 @@ class Metrics(TypedDict):
         "numCalls",
         "numRas",
         "percentRas",
+        "tableEntries",
+        "tableBytes",
     )
     # Tracks the maximum search depth.
     maxDepth: int
@@ -99,6 +212,10 @@ class Metrics(TypedDict):
     # The number of times the function is called.
     numCalls: int
 
+    # Size of the transposition table once the search ended.
+    tableEntries: int
+    tableBytes: int
+
 
 def finalizeMetrics(metrics: Metrics) -> Metrics:
     """Finalizes the metrics object by updating any rate values."""
@@ -145,6 +262,8 @@ def default_metrics() -> Metrics:
         percentInRound=[0.0] * gi.NUM_ROUNDS,
         numRas=[0] * _MAX_RAS,
         percentRas=[0.0] * _MAX_RAS,
+        tableEntries=0,
+        tableBytes=0,
     )
 
 
@@ -153,32 +272,114 @@ def oracle_search(
     num_auctions_allowed: Optional[int] = None,
     optimize: bool = False,
     debug: bool = False,
+    metrics: Optional[Metrics] = None,
 ) -> TAction:
     """
     Given the current game state, return an action to take and the valuation associated
     with it. Sees future tiles that will be drawn.
     """
-    if debug:
-        logger.info("Beginning oracle search...")
-    start_time = time.time()
-    metrics = default_metrics()
-    internal_search_fn = oracle_search_stack if optimize else oracle_search_internal
-    action_values = internal_search_fn(
+    action_values = oracle_action_values(
         game_state,
-        metrics,
-        num_auctions_allowed or max(2, 4 - game_state.num_players),
-        depth=0,
+        num_auctions_allowed,
+        optimize=optimize,
+        debug=debug,
+        metrics=metrics,
     )
-    action = _get_best_action(game_state.get_current_player(), action_values)
-    logger.info(f"Total unique states explored: {len(value_state.cache)}")
-    logger.info(f"Collected metrics: {pprint.pformat(finalizeMetrics(metrics))}")
-    logger.info(f"Search ended. Time elapsed: {(time.time() - start_time)} s")
-    if len(value_state.cache) > 1e6:
-        value_state.cache = {}
-    return action
+    return get_best_action(game_state.get_current_player(), action_values)
+
+
+def oracle_action_values(
+    game_state: gs.GameState,
+    num_auctions_allowed: Optional[int] = None,
+    optimize: bool = False,
+    debug: bool = False,
+    metrics: Optional[Metrics] = None,
+) -> Dict[TAction, tuple[TScore]]:
+    """
+    Given the current game state, return the value of each searchable action for
+    every player. Sees future tiles that will be drawn.
+
+    Small enough positions in the final round are solved exactly to the end of the
+    game instead. If metrics is given, the counters of the search are collected into
+    it.
+    """
+    with profiling.search():
+        if endgame.is_solvable(game_state):
+            if (solved_values := endgame.solver.solve(game_state)) is not None:
+                return solved_values
+        if debug:
+            logger.info("Beginning oracle search...")
+        start_time = time.time()
+        if metrics is None:
+            metrics = default_metrics()
+        max_auctions = get_max_auctions(game_state, num_auctions_allowed)
+        table = value_state.table()
+        table.new_search()
+        internal_search_fn = oracle_search_stack if optimize else oracle_search_internal
+        action_values = internal_search_fn(game_state, metrics, max_auctions, depth=0)
+        metrics["tableEntries"] = len(table)
+        metrics["tableBytes"] = table.nbytes()
+        logger.info(f"Total unique states explored: {len(table)}")
+        logger.info(f"Collected metrics: {pprint.pformat(finalizeMetrics(metrics))}")
+        logger.info(f"Search ended. Time elapsed: {(time.time() - start_time)} s")
+        search_session = session.current()
+        # Background searches keep their own lines. See ponder.py.
+        if search_session is not None and not session.in_background():
+            search_session.principal_variation = principal_variation(
+                game_state, action_values, max_auctions
+            )
+            logger.info(f"Principal variation: {search_session.principal_variation}")
+        return action_values
+
+
+def get_max_auctions(
+    game_state: gs.GameState, num_auctions_allowed: Optional[int] = None
+) -> int:
+    """The number of auctions searched ahead, if not given explicitly."""
+    return num_auctions_allowed or max(2, 4 - game_state.num_players)
+
+
+def _child_max_auctions(
+    action: TAction, tile_drawn: Optional[int], max_auctions: int
+) -> int:
+    auctionStarted = tile_drawn == gi.INDEX_OF_RA or action == gi.AUCTION
+    return max_auctions - (1 if auctionStarted else 0)
 
 
-def _get_best_action(
+def principal_variation(
+    game_state: gs.GameState,
+    action_values: Mapping[TAction, tuple[TScore]],
+    max_auctions: int,
+) -> list[TAction]:
+    """Reconstructs the best line of play from the transposition table.
+
+    The line starts with the best root action and stops at the first state whose
+    children were not all searched by value_state.
+    """
+    line = [get_best_action(game_state.get_current_player(), action_values)]
+    table = value_state.table()
+    game_state = _copy_state(game_state)
+    while True:
+        tile_drawn = _execute(game_state, line[-1])
+        max_auctions = _child_max_auctions(line[-1], tile_drawn, max_auctions)
+        if game_state.is_game_ended() or _is_leaf(game_state, max_auctions):
+            return line
+        legal_actions = _legal_actions(game_state)
+        assert legal_actions, "Cannot follow principal variation without actions"
+        child_values: Dict[TAction, tuple[TScore]] = {}
+        for action in filter_actions(legal_actions):
+            game_state_copy = _copy_state(game_state)
+            tile_drawn = _execute(game_state_copy, action, legal_actions)
+            key = value_state.key(
+                game_state_copy, _child_max_auctions(action, tile_drawn, max_auctions)
+            )
+            if (values := _probe(table, key)) is None:
+                return line
+            child_values[action] = cast(tuple[TScore], values)
+        line.append(get_best_action(game_state.get_current_player(), child_values))
+
+
+def get_best_action(
     current_player: int, action_values: Mapping[TAction, tuple[TScore]]
 ) -> TAction:
     """Returns the best action
@@ -212,10 +413,22 @@ P = ParamSpec("P")
 
 class CacheGames(Generic[T]):
     def __init__(self, func: Callable[[gs.GameState, Metrics, int, ...], T]) -> None:
-        # We store data in cache across requests?
-        self.cache: Dict[int, int] = {}
+        # Shared by every search not running within a session.
+        self.cache: transposition.TranspositionTable = (
+            transposition.TranspositionTable()
+        )
         self.func: Callable[[gs.GameState, Metrics, int, ...], T] = func
 
+    def table(self) -> transposition.TranspositionTable:
+        """Returns the table of the active search session, or the global one."""
+        if (search_session := session.current()) is not None:
+            return search_session.table
+        return self.cache
+
+    @staticmethod
+    def key(gameState: gs.GameState, max_auctions: int) -> int:
+        return hash((_hash_state(gameState), max_auctions))
+
     def __call__(
         self,
         gameState: gs.GameState,
@@ -224,42 +437,24 @@ class CacheGames(Generic[T]):
         *args: P.args,
         **kwargs: P.kwargs,
     ) -> T:
+        session.raise_if_cancelled()
         metrics["numCalls"] += 1
-        gameHash = hash((hash(gameState), max_auctions))
-        if gameHash not in self.cache:
+        gameHash = self.key(gameState, max_auctions)
+        cache = self.table()
+        if (val := _probe(cache, gameHash)) is None:
             metrics["cacheMiss"] += 1
             val = self.func(gameState, metrics, max_auctions, *args, **kwargs)
-            self.cache[gameHash] = encoding.compress(val)
-        else:
-            metrics["cacheHit"] += 1
-        val = cast(T, encoding.decompress(self.cache[gameHash]))
-        return val
-
-
-def _is_unsearchable(action: TAction) -> bool:
-    # TODO(albertz): Allow golden god actions
-    return action in [
-        gi.GOD_1,
-        gi.GOD_2,
-        gi.GOD_3,
-        gi.GOD_4,
-        gi.GOD_5,
-        gi.GOD_6,
-        gi.GOD_7,
-        gi.GOD_8,
-    ]
+            return cast(T, _store(cache, gameHash, val, max_auctions))
+        metrics["cacheHit"] += 1
+        return cast(T, val)
 
 
 def _is_bid(action: int) -> bool:
     return action in [gi.BID_1, gi.BID_2, gi.BID_3, gi.BID_4]
 
 
-def filter_actions(actions: Iterable[int]) -> Iterator[int]:
-    # Only ever return two actions.
-    for action in actions:
-        if _is_unsearchable(action):
-            continue
-        yield action
+# The endgame solver searches the same actions.
+filter_actions = s.filter_actions
 
 
 def oracle_search_stack(
@@ -278,7 +473,7 @@ def oracle_search_stack(
     while stack:
         game_state, depth, auctionsLeft = stack[-1]
         metrics["maxDepth"] = max(depth, metrics["maxDepth"])
-        gameHash = hash(game_state)
+        gameHash = _hash_state(game_state)
         # These are the terminal states.
         if game_state.is_game_ended():
             metrics["numCalls"] += 1
@@ -291,21 +486,17 @@ def oracle_search_stack(
             )
             stack.pop()
             continue
-        elif auctionsLeft <= 0 and game_state.get_num_auction_tiles() == 0:
+        elif _is_leaf(game_state, auctionsLeft):
             metrics["numCalls"] += 1
             metrics["cacheMiss"] += 1
             metrics["numInRound"][game_state.current_round - 1] += 1
             metrics["numEstimated"] += 1
-            ret = e.evaluate_game_state_no_auction_tiles(game_state)
-            result = [0.0] * len(ret)
-            for idx, score in ret.items():
-                result[idx] = score
-            cache[gameHash] = tuple(result)
+            cache[gameHash] = _estimate(game_state)
             stack.pop()
             continue
 
         # We're in a non-terminal state, so continue the search.
-        legal_actions = ra.get_possible_actions(game_state)
+        legal_actions = _legal_actions(game_state)
         assert (
             legal_actions is not None and len(legal_actions) > 0
         ), "Cannot perform oracle_search_stack because no legal actions"
@@ -313,11 +504,9 @@ def oracle_search_stack(
         childValues = {}
         allChildrenProcessed = True
         for action in filter_actions(legal_actions):
-            game_state_copy = copy.deepcopy(game_state)
-            tile_drawn = ra.execute_action_internal(
-                game_state_copy, action, legal_actions
-            )
-            nextStateHash = hash(game_state_copy)
+            game_state_copy = _copy_state(game_state)
+            tile_drawn = _execute(game_state_copy, action, legal_actions)
+            nextStateHash = _hash_state(game_state_copy)
             if nextStateHash in cache:
                 childValues[action] = cache[nextStateHash]
                 metrics["cacheHit"] += 1
@@ -344,7 +533,7 @@ def oracle_search_stack(
             if game_state.is_auction_started():
                 metrics["numAuctionStarted"] += 1
             cache[gameHash] = childValues[
-                _get_best_action(game_state.get_current_player(), childValues)
+                get_best_action(game_state.get_current_player(), childValues)
             ]
             stack.pop()
             continue
@@ -376,7 +565,7 @@ def oracle_search_internal(
         For each legal action in the current state, the value of the resulting
             state for each player.
     """
-    legal_actions = ra.get_possible_actions(game_state)
+    legal_actions = _legal_actions(game_state)
     assert (
         legal_actions is not None and len(legal_actions) > 0
     ), "Cannot perform oracle_search_internal because no legal actions"
@@ -386,15 +575,14 @@ def oracle_search_internal(
 
     # Simulate each legal action and find their resulting valuations
     for action in filter_actions(legal_actions):
-        game_state_copy = copy.deepcopy(game_state)
-        tile_drawn = ra.execute_action_internal(game_state_copy, action, legal_actions)
+        game_state_copy = _copy_state(game_state)
+        tile_drawn = _execute(game_state_copy, action, legal_actions)
         if action == gi.DRAW:
             assert tile_drawn is not None, "Oracle_search could not draw tile"
-        auctionStarted = tile_drawn == gi.INDEX_OF_RA or action == gi.AUCTION
         action_results[action] = value_state(
             game_state_copy,
             metrics,
-            max_auctions - (1 if auctionStarted else 0),
+            _child_max_auctions(action, tile_drawn, max_auctions),
             depth + 1,
         )
 
@@ -434,7 +622,6 @@ def value_state(
     if game_state.is_auction_started():
         metrics["numAuctionStarted"] += 1
 
-    auction_tiles_are_empty = game_state.get_num_auction_tiles() == 0
     if game_state.is_game_ended():
         metrics["numEnded"] += 1
         final_scores = [0.0] * len(game_state.player_states)
@@ -443,13 +630,9 @@ def value_state(
                 player_state.get_player_points()
             )
         return tuple(final_scores)
-    elif max_auctions <= 0 and auction_tiles_are_empty:
+    elif _is_leaf(game_state, max_auctions):
         metrics["numEstimated"] += 1
-        ret = e.evaluate_game_state_no_auction_tiles(game_state)
-        scores = [0.0] * len(ret)
-        for idx, score in ret.items():
-            scores[idx] = score
-        return tuple(scores)
+        return _estimate(game_state)
     else:
         metrics["numIntermediate"] += 1
         resulting_player_state_valuations = oracle_search_internal(
@@ -459,7 +642,7 @@ def value_state(
             depth,
         )
         return resulting_player_state_valuations[
-            _get_best_action(
+            get_best_action(
                 game_state.get_current_player(), resulting_player_state_valuations
             )
         ]
@@ -0,0 +1,259 @@
+"""
+Perfect Information Monte Carlo (PIMC) search.
+
+The oracle sees the real draw order, so it cheats. PIMC instead samples several
+shuffles ("determinizations") of the tiles remaining in the bag, runs the oracle on
+each of them and aggregates the results. Only public information is used, so the
+resulting player is fair.
+"""
+import enum
+import logging
+import os
+import random
+import time
+from concurrent import futures
+from typing import Dict, List, Optional
+
+from game import state as gs
+from game.decision_functions import opening_book
+from game.decision_functions import oracle as o
+from game.decision_functions import session
+from game.proxy import copy
+
+logger: logging.Logger = logging.getLogger("uvicorn.info")
+
+# Number of determinizations sampled per move.
+DEFAULT_NUM_SAMPLES: int = 8
+# Seconds to wait for determinizations before answering with what we have.
+DEFAULT_DEADLINE: float = 20.0
+# Seconds to wait past the deadline for the workers to stop their searches.
+DEADLINE_GRACE: float = 1.0
+# Auctions searched in-process when no determinization finished in time.
+FALLBACK_AUCTIONS: int = 1
+
+_POOL: Optional[futures.ProcessPoolExecutor] = None
+
+
+@enum.unique
+class Aggregation(enum.Enum):
+    # Average the value of each action across all determinizations.
+    AVERAGE = 1
+    # Each determinization votes for its best action.
+    VOTE = 2
+
+
+def pimc_ai_player(game_state: gs.GameState) -> int:
+    if (book_action := opening_book.lookup(game_state)) is not None:
+        return book_action
+    return pimc_search(game_state)
+
+
+def default_max_workers() -> int:
+    """Size of the shared pool: PIMC_WORKERS if set, or else half the cores.
+
+    The server runs in a single process, so the rest is left to serve requests.
+    """
+    if workers := os.environ.get("PIMC_WORKERS"):
+        return int(workers)
+    return max(1, (os.cpu_count() or 1) // 2)
+
+
+def get_pool(max_workers: Optional[int] = None) -> futures.ProcessPoolExecutor:
+    """Returns the process pool shared by all PIMC searches in this process.
+
+    The pool is created on first use, so max_workers only applies to that call.
+    """
+    global _POOL
+    if _POOL is None:
+        _POOL = futures.ProcessPoolExecutor(
+            max_workers=max_workers or default_max_workers()
+        )
+    return _POOL
+
+
+def shutdown_pool() -> None:
+    """Shuts down the shared process pool, if any."""
+    global _POOL
+    if _POOL is not None:
+        _POOL.shutdown(cancel_futures=True)
+        _POOL = None
+
+
+def determinize(game_state: gs.GameState, rng: random.Random) -> gs.GameState:
+    """Returns a copy of the game state where the unseen tiles are reshuffled.
+
+    The contents of the bag are public, so the new draw order is built from the
+    remaining bag contents and not from the (hidden) draw order.
+    """
+    sample = copy.deepcopy(game_state)
+    draw_order = [
+        tile
+        for tile, count in enumerate(game_state.get_tile_bag_contents())
+        for _ in range(count)
+    ]
+    rng.shuffle(draw_order)
+    sample.tile_bag = gs.TileBag(draw_order=draw_order)
+    return sample
+
+
+def _search_determinization(
+    game_state: gs.GameState,
+    num_auctions_allowed: Optional[int],
+    deadline: Optional[float] = None,
+) -> Optional[Dict[o.TAction, tuple[o.TScore]]]:
+    """Runs in the worker processes.
+
+    Returns None if the search is still running once time.time() passes deadline.
+    """
+    if deadline is None:
+        return o.oracle_action_values(game_state, num_auctions_allowed)
+    try:
+        with session.time_limit(deadline):
+            return o.oracle_action_values(game_state, num_auctions_allowed)
+    except session.SearchCancelled:
+        return None
+
+
+def _collect_samples(
+    samples: List[gs.GameState],
+    deadline: float,
+    max_workers: Optional[int],
+    num_auctions_allowed: Optional[int],
+) -> List[Dict[o.TAction, tuple[o.TScore]]]:
+    """Searches every sample, returning the results finished before the deadline.
+
+    Searches stop by themselves at the deadline. If none finished, the first sample
+    is searched in-process only FALLBACK_AUCTIONS ahead instead.
+    """
+    end_time = time.time() + deadline
+    results = []
+    if max_workers == 0:
+        # Search in-process.
+        for sample in samples:
+            result = _search_determinization(sample, num_auctions_allowed, end_time)
+            if result is None:
+                break
+            results.append(result)
+    else:
+        pool = get_pool(max_workers)
+        pending = [
+            pool.submit(_search_determinization, sample, num_auctions_allowed, end_time)
+            for sample in samples
+        ]
+        done, not_done = futures.wait(pending, timeout=deadline + DEADLINE_GRACE)
+        for future in not_done:
+            future.cancel()
+        results = [result for future in done if (result := future.result()) is not None]
+    if not results:
+        logger.warning("No PIMC determinization finished before the deadline")
+        result = _search_determinization(samples[0], FALLBACK_AUCTIONS)
+        assert result is not None
+        results.append(result)
+    return results
+
+
+def average_action_values(
+    results: List[Dict[o.TAction, tuple[o.TScore]]],
+) -> Dict[o.TAction, tuple[o.TScore]]:
+    """Averages the action values of several determinizations."""
+    assert results, "Cannot average without results"
+    averages: Dict[o.TAction, tuple[o.TScore]] = {}
+    for action in results[0]:
+        totals = [0.0] * len(results[0][action])
+        for result in results:
+            for idx, score in enumerate(result[action]):
+                totals[idx] += score
+        averages[action] = tuple(total / len(results) for total in totals)
+    return averages
+
+
+def choose_action(
+    current_player: int,
+    results: List[Dict[o.TAction, tuple[o.TScore]]],
+    aggregation: Aggregation = Aggregation.AVERAGE,
+) -> o.TAction:
+    """Picks the action to take given the results of each determinization.
+
+    With Aggregation.VOTE, the averaged values only break ties between the actions
+    with the most votes.
+    """
+    averages = average_action_values(results)
+    if aggregation == Aggregation.AVERAGE:
+        return o.get_best_action(current_player, averages)
+
+    votes = {action: 0 for action in averages}
+    for result in results:
+        votes[o.get_best_action(current_player, result)] += 1
+    most_votes = max(votes.values())
+    return o.get_best_action(
+        current_player,
+        {
+            action: values
+            for action, values in averages.items()
+            if votes[action] == most_votes
+        },
+    )
+
+
+def _search_samples(
+    game_state: gs.GameState,
+    num_samples: int,
+    deadline: float,
+    max_workers: Optional[int],
+    num_auctions_allowed: Optional[int],
+    seed: Optional[int],
+) -> List[Dict[o.TAction, tuple[o.TScore]]]:
+    start_time = time.time()
+    rng = random.Random(seed)
+    samples = [determinize(game_state, rng) for _ in range(num_samples)]
+    results = _collect_samples(samples, deadline, max_workers, num_auctions_allowed)
+    logger.info(
+        f"PIMC searched {len(results)}/{num_samples} determinizations in "
+        f"{(time.time() - start_time)} s"
+    )
+    return results
+
+
+def pimc_action_values(
+    game_state: gs.GameState,
+    num_samples: int = DEFAULT_NUM_SAMPLES,
+    deadline: float = DEFAULT_DEADLINE,
+    max_workers: Optional[int] = None,
+    num_auctions_allowed: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> Dict[o.TAction, tuple[o.TScore]]:
+    """Returns the value of each action averaged across sampled determinizations.
+
+    Args:
+        game_state: The state from which to search. Its draw order is never used.
+        num_samples: How many shuffles of the remaining tiles to search.
+        deadline: Seconds after which unfinished determinizations are dropped.
+        max_workers: Size of the process pool, see default_max_workers. When 0,
+            searches in-process.
+        num_auctions_allowed: Passed through to the oracle search.
+        seed: Seeds the shuffles, for reproducible searches.
+    """
+    return average_action_values(
+        _search_samples(
+            game_state, num_samples, deadline, max_workers, num_auctions_allowed, seed
+        )
+    )
+
+
+def pimc_search(
+    game_state: gs.GameState,
+    num_samples: int = DEFAULT_NUM_SAMPLES,
+    deadline: float = DEFAULT_DEADLINE,
+    aggregation: Aggregation = Aggregation.AVERAGE,
+    max_workers: Optional[int] = None,
+    num_auctions_allowed: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> o.TAction:
+    """
+    Given the current game state, return an action to take. Does not see the future
+    tiles that will be drawn. See pimc_action_values for the arguments.
+    """
+    results = _search_samples(
+        game_state, num_samples, deadline, max_workers, num_auctions_allowed, seed
+    )
+    return choose_action(game_state.get_current_player(), results, aggregation)
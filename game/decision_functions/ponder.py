@@ -0,0 +1,103 @@
+"""
+Background pondering.
+
+While a human thinks about their move, the server would otherwise sit idle. Pondering
+searches the positions reached by the human's likely replies in a background
+thread, filling the transposition table of the game's search session. Once the
+human acts, pondering is cancelled and the AI's search finds most of the subtree
+it needs already in the table. The best line after each reply is kept in the
+session's ponder_variations, leaving the principal variation of the AI's last
+search untouched.
+"""
+import logging
+import threading
+from typing import List, Optional
+
+from game import ra
+from game import state as gs
+from game.decision_functions import endgame
+from game.decision_functions import oracle as o
+from game.decision_functions import session
+from game.proxy import copy
+
+logger: logging.Logger = logging.getLogger("uvicorn.info")
+
+
+def likely_replies(
+    game_state: gs.GameState, search_session: session.SearchSession
+) -> List[o.TAction]:
+    """The searchable actions of the current player, most likely first.
+
+    The reply predicted by the principal variation of the last search comes first.
+    """
+    legal_actions = ra.get_possible_actions(game_state) or []
+    replies = list(o.filter_actions(legal_actions))
+    pv = search_session.principal_variation
+    if len(pv) > 1 and pv[1] in replies:
+        replies.remove(pv[1])
+        replies.insert(0, pv[1])
+    return replies
+
+
+def _ponder(
+    game_state: gs.GameState,
+    search_session: session.SearchSession,
+    num_auctions_allowed: Optional[int],
+) -> None:
+    """Runs in the background thread."""
+    replies = likely_replies(game_state, search_session)
+    cancel = search_session.ponder_cancel
+    # Searches through the table the session had when pondering started. If the
+    # session gives up waiting on us, it moves on to a new table.
+    background = session.SearchSession(search_session.session_id, search_session.table)
+    num_searched = 0
+    with session.activate(background), session.cancellable(cancel):
+        try:
+            for action in replies:
+                game_state_copy = copy.deepcopy(game_state)
+                ra.execute_action_internal(game_state_copy, action)
+                # Endgames are solved exactly on demand, which is fast anyway.
+                if game_state_copy.is_game_ended() or endgame.is_solvable(
+                    game_state_copy
+                ):
+                    continue
+                action_values = o.oracle_action_values(
+                    game_state_copy, num_auctions_allowed
+                )
+                variation = o.principal_variation(
+                    game_state_copy,
+                    action_values,
+                    o.get_max_auctions(game_state_copy, num_auctions_allowed),
+                )
+                session.raise_if_cancelled()
+                search_session.ponder_variations[action] = variation
+                num_searched += 1
+        except session.SearchCancelled:
+            pass
+    logger.info(
+        f"Pondered {num_searched}/{len(replies)} replies for session "
+        f"{search_session.session_id}"
+    )
+
+
+def start(
+    game_state: gs.GameState,
+    search_session: session.SearchSession,
+    num_auctions_allowed: Optional[int] = None,
+) -> None:
+    """Starts pondering the replies to the given state in the background.
+
+    Any previous pondering of the session is stopped first, without waiting on it.
+    """
+    search_session.stop_pondering(timeout=0)
+    if game_state.is_game_ended():
+        return
+    search_session.ponder_cancel = threading.Event()
+    search_session.ponder_variations = {}
+    search_session.ponder_thread = threading.Thread(
+        target=_ponder,
+        args=(copy.deepcopy(game_state), search_session, num_auctions_allowed),
+        name=f"ponder-{search_session.session_id}",
+        daemon=True,
+    )
+    search_session.ponder_thread.start()
@@ -0,0 +1,128 @@
+"""
+Draw probabilities over the contents of the tile bag.
+
+The tiles left in the bag are in a uniformly random order, so the tiles drawn
+before the round ends (when the remaining Ras of the round are drawn) follow
+negative hypergeometric distributions. Everything here is computed in closed form
+and memoized on the bag contents and the Ras left in the round.
+"""
+import functools
+import math
+from typing import Iterable, NamedTuple, Tuple
+
+from game import info as gi
+from game import state as gs
+
+# Number of tiles of each type left in the bag, indexed by tile index.
+TBag = Tuple[int, ...]
+
+
+def ras_left_in_round(game_state: gs.GameState) -> int:
+    """Number of Ras that still have to be drawn for the round to end."""
+    return max(0, game_state.get_num_ras_per_round() - game_state.get_current_num_ras())
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def hypergeometric_pmf(population: int, successes: int, draws: int, k: int) -> float:
+    """Chance of exactly k successes when drawing without replacement."""
+    if not 0 <= k <= min(successes, draws) or draws - k > population - successes:
+        return 0.0
+    return (
+        math.comb(successes, k)
+        * math.comb(population - successes, draws - k)
+        / math.comb(population, draws)
+    )
+
+
+def prob_at_least_one(population: int, successes: int, draws: int) -> float:
+    """Chance of drawing at least one success without replacement."""
+    return 1.0 - hypergeometric_pmf(population, successes, min(draws, population), 0)
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def prob_before_round_end(num_ras: int, num_copies: int, ras_left: int) -> float:
+    """
+    Chance that at least one of num_copies tiles is drawn before the ras_left-th
+    Ra, with num_ras Ras in the bag. Other tiles do not affect the order of these.
+
+    None of the copies is drawn iff the first ras_left of the copies and Ras are all
+    Ras. If the bag runs out of Ras, every tile is drawn.
+    """
+    if ras_left <= 0 or num_copies <= 0:
+        return 0.0
+    if ras_left > num_ras:
+        return 1.0
+    prob_none = math.comb(num_ras, ras_left) / math.comb(num_ras + num_copies, ras_left)
+    return 1.0 - prob_none
+
+
+def _fraction_drawn(bag: TBag, ras_left: int) -> float:
+    """The expected fraction of each non-Ra tile type drawn this round."""
+    if ras_left <= 0:
+        return 0.0
+    num_ras = bag[gi.INDEX_OF_RA]
+    if ras_left > num_ras:
+        return 1.0
+    return ras_left / (num_ras + 1)
+
+
+class DrawOutlook(NamedTuple):
+    """What the rest of the round's draws hold."""
+
+    # Expected number of draws until the round ends, including the last Ra.
+    expected_draws: float
+    # For each tile index, the expected number of copies drawn this round.
+    expected_tiles: Tuple[float, ...]
+    # For each tile index, the chance at least one copy is drawn this round.
+    prob_tiles: Tuple[float, ...]
+    # Expected number of disasters drawn this round.
+    expected_disasters: float
+
+
+@functools.lru_cache(maxsize=1 << 14)
+def draw_outlook(
+    bag: TBag, num_ras_this_round: int, num_ras_per_round: int
+) -> DrawOutlook:
+    """Computes the outlook of every tile type at once."""
+    ras_left = max(0, num_ras_per_round - num_ras_this_round)
+    num_ras = bag[gi.INDEX_OF_RA]
+    fraction = _fraction_drawn(bag, ras_left)
+    expected_tiles = tuple(
+        float(min(ras_left, num_ras)) if idx == gi.INDEX_OF_RA else num * fraction
+        for idx, num in enumerate(bag)
+    )
+    prob_tiles = tuple(
+        (1.0 if 0 < ras_left <= num_ras else 0.0)
+        if idx == gi.INDEX_OF_RA
+        else prob_before_round_end(num_ras, num, ras_left)
+        for idx, num in enumerate(bag)
+    )
+    return DrawOutlook(
+        expected_draws=sum(expected_tiles),
+        expected_tiles=expected_tiles,
+        prob_tiles=prob_tiles,
+        expected_disasters=sum(
+            expected_tiles[
+                gi.STARTING_INDEX_OF_DISASTERS : gi.STARTING_INDEX_OF_DISASTERS
+                + gi.NUM_DISASTERS
+            ]
+        ),
+    )
+
+
+def outlook(game_state: gs.GameState) -> DrawOutlook:
+    return draw_outlook(
+        tuple(game_state.get_tile_bag_contents()),
+        game_state.get_current_num_ras(),
+        game_state.get_num_ras_per_round(),
+    )
+
+
+def prob_any_before_round_end(game_state: gs.GameState, tiles: Iterable[int]) -> float:
+    """Chance at least one tile of the given types is drawn before the round ends."""
+    bag = game_state.get_tile_bag_contents()
+    return prob_before_round_end(
+        bag[gi.INDEX_OF_RA],
+        sum(bag[tile] for tile in set(tiles)),
+        ras_left_in_round(game_state),
+    )
@@ -0,0 +1,205 @@
+"""
+Per-phase profiling of oracle search.
+
+Metrics counts the states a search visits, but not where its time goes. While
+profiling is enabled, the functions oracle registers for its hot path (copying
+states, executing actions, hashing, the transposition table and leaf evaluation)
+are replaced with timed variants, and every search adds to the enabled
+SearchProfile:
+
+    with profiling.profile() as search_profile:
+        oracle.oracle_search(game_state)
+    print(search_profile.to_json())
+
+While profiling is disabled, the registered names are bound to the plain functions
+again, so searches run exactly the unprofiled code. Profiling is process wide, but
+background searches (see ponder.py) are never profiled.
+"""
+import contextlib
+import contextvars
+import functools
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    TypedDict,
+    TypeVar,
+)
+
+from game.decision_functions import session
+
+# The phases of a search that are timed separately. Time spent anywhere else, eg.
+# in search bookkeeping, is the difference between the search time and their sum.
+PHASES: List[str] = ["copy", "execute", "actions", "hash", "cache", "evaluate"]
+
+T = TypeVar("T")
+
+
+class SerializedPhase(TypedDict):
+    seconds: float
+    calls: int
+    # Of the total search time.
+    percent: float
+
+
+class SerializedProfile(TypedDict):
+    numSearches: int
+    # States reached by executing an action.
+    nodes: int
+    seconds: float
+    nodesPerSecond: float
+    phases: Dict[str, SerializedPhase]
+
+
+class SearchProfile:
+    """Time spent in each phase of the searches run while profiling."""
+
+    __slots__ = ("seconds", "calls", "total_seconds", "num_searches")
+
+    def __init__(self) -> None:
+        self.seconds: Dict[str, float] = {phase: 0.0 for phase in PHASES}
+        self.calls: Dict[str, int] = {phase: 0 for phase in PHASES}
+        self.total_seconds: float = 0.0
+        self.num_searches: int = 0
+
+    @property
+    def nodes(self) -> int:
+        return self.calls["execute"]
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / max(self.total_seconds, 1e-9)
+
+    def merge(self, other: "SearchProfile") -> "SearchProfile":
+        """Adds the other profile to this one, eg. to aggregate many runs."""
+        for phase in PHASES:
+            self.seconds[phase] += other.seconds[phase]
+            self.calls[phase] += other.calls[phase]
+        self.total_seconds += other.total_seconds
+        self.num_searches += other.num_searches
+        return self
+
+    def to_json(self) -> SerializedProfile:
+        return SerializedProfile(
+            numSearches=self.num_searches,
+            nodes=self.nodes,
+            seconds=self.total_seconds,
+            nodesPerSecond=self.nodes_per_second,
+            phases={
+                phase: SerializedPhase(
+                    seconds=self.seconds[phase],
+                    calls=self.calls[phase],
+                    percent=100 * self.seconds[phase] / max(self.total_seconds, 1e-9),
+                )
+                for phase in PHASES
+            },
+        )
+
+    def format(self) -> str:
+        lines = [
+            f"{self.num_searches} searches, {self.nodes} nodes in "
+            f"{self.total_seconds:.3f}s ({self.nodes_per_second:.0f} nodes/s)"
+        ]
+        for phase, data in self.to_json()["phases"].items():
+            lines.append(
+                f"  {phase:<10}{data['seconds']:>10.3f}s{data['percent']:>7.1f}%"
+                f"{data['calls']:>12} calls"
+            )
+        return "\n".join(lines)
+
+
+_ENABLED: Optional[SearchProfile] = None
+# The profile of the search running in this context, if it is profiled.
+_ACTIVE: contextvars.ContextVar[Optional[SearchProfile]] = contextvars.ContextVar(
+    "active_search_profile", default=None
+)
+# The namespace, name, phase and plain function of every registered function.
+_REGISTERED: List[Tuple[Dict[str, Any], str, str, Callable[..., Any]]] = []
+
+
+def _timed(function: Callable[..., T], phase: str) -> Callable[..., T]:
+    """Times the calls to the function as a phase of the profiled search running in
+    this context, if any."""
+
+    @functools.wraps(function)
+    def timed(*args: Any, **kwargs: Any) -> T:
+        if (search_profile := _ACTIVE.get()) is None:
+            return function(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            search_profile.seconds[phase] += time.perf_counter() - start
+            search_profile.calls[phase] += 1
+
+    return timed
+
+
+def register(namespace: Dict[str, Any], phases: Mapping[str, str]) -> None:
+    """Times namespace[name] as phases[name] for each name while profiling.
+
+    The namespace (eg. the globals() of a module) must look the names up on every
+    call for the timed functions to take effect.
+    """
+    for name, phase in phases.items():
+        assert phase in PHASES, f"Unknown phase {phase}"
+        _REGISTERED.append((namespace, name, phase, namespace[name]))
+        if _ENABLED is not None:
+            namespace[name] = _timed(namespace[name], phase)
+
+
+@contextlib.contextmanager
+def search() -> Iterator[None]:
+    """Profiles the search run within the context, if profiling is enabled."""
+    search_profile = _ENABLED
+    if search_profile is None or session.in_background() or _ACTIVE.get() is not None:
+        yield
+        return
+    token = _ACTIVE.set(search_profile)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        search_profile.total_seconds += time.perf_counter() - start
+        search_profile.num_searches += 1
+        _ACTIVE.reset(token)
+
+
+def enable() -> SearchProfile:
+    """Starts profiling every oracle search into a new profile."""
+    global _ENABLED
+    assert _ENABLED is None, "Search profiling is already enabled"
+    for namespace, name, phase, function in _REGISTERED:
+        namespace[name] = _timed(function, phase)
+    _ENABLED = SearchProfile()
+    return _ENABLED
+
+
+def disable() -> Optional[SearchProfile]:
+    """Stops profiling and returns the profile collected, if any."""
+    global _ENABLED
+    search_profile, _ENABLED = _ENABLED, None
+    for namespace, name, _, function in _REGISTERED:
+        namespace[name] = function
+    return search_profile
+
+
+def current() -> Optional[SearchProfile]:
+    """Returns the profile searches are being added to, if profiling is enabled."""
+    return _ENABLED
+
+
+@contextlib.contextmanager
+def profile() -> Iterator[SearchProfile]:
+    """Profiles the oracle searches within the context."""
+    search_profile = enable()
+    try:
+        yield search_profile
+    finally:
+        disable()
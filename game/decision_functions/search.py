@@ -1,6 +1,6 @@
 import copy
 import time
-from typing import Dict, Mapping, Tuple
+from typing import Dict, Iterable, Iterator, Mapping, Tuple
 
 from game import info as gi
 from game import ra
@@ -168,3 +168,25 @@ def calculate_state_score_for_player(
         ]
     )
     return player_valuation - max_other_player_valuation
+
+
+def _is_unsearchable(action: int) -> bool:
+    # TODO(albertz): Allow golden god actions
+    return action in [
+        gi.GOD_1,
+        gi.GOD_2,
+        gi.GOD_3,
+        gi.GOD_4,
+        gi.GOD_5,
+        gi.GOD_6,
+        gi.GOD_7,
+        gi.GOD_8,
+    ]
+
+
+def filter_actions(actions: Iterable[int]) -> Iterator[int]:
+    """The actions searched by the oracle and the endgame solver."""
+    for action in actions:
+        if _is_unsearchable(action):
+            continue
+        yield action
@@ -0,0 +1,286 @@
+"""
+Regression corpus for the cost of oracle_search.
+
+test_oracle.py checks which action the search picks, but not what it costs to
+pick it. Every position of the corpus is a move-history file, in the format
+written by RaGame, replayed through RaGame.load_actions_from_infile. The expected
+best action and search metrics of every position are recorded in expected.json,
+so a change that makes the HARD AI explore twice the states is caught:
+
+    python -m game.decision_functions.search_regression
+    # After an intended change to the search, re-record the expectations.
+    python -m game.decision_functions.search_regression --record
+
+Node counts and actions are deterministic. Wall times are only comparable on the
+machine they were recorded on, so their tolerance is loose.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional, TypedDict
+
+from game import info as gi
+from game import ra
+from game import state as gs
+from game.decision_functions import oracle as o
+from game.decision_functions import profiling, session
+
+CORPUS_DIR: str = os.path.join(os.path.dirname(__file__), "search_corpus")
+EXPECTED_FILENAME: str = "expected.json"
+
+
+class Expected(TypedDict):
+    __slots__ = (
+        "numAuctions",
+        "bestAction",
+        "numCalls",
+        "cacheHit",
+        "maxDepth",
+        "seconds",
+    )
+    # Passed to oracle_search as num_auctions_allowed.
+    numAuctions: int
+    bestAction: int
+    numCalls: int
+    cacheHit: int
+    maxDepth: int
+    seconds: float
+
+
+class Tolerances(NamedTuple):
+    # Relative growth allowed before a position counts as regressed.
+    nodes: float = 0.05
+    seconds: float = 0.5
+    # Searches faster than this are never flagged for wall time, they are noise.
+    min_seconds: float = 0.05
+
+
+def load_position(path: str) -> gs.GameState:
+    """Replays a move-history file of the corpus.
+
+    Move histories do not record the starting suns, so the corpus is dealt the
+    sorted starting sun sets (see perft.reference_position).
+    """
+    with open(path, "r") as f:
+        player_names = [name.rstrip() for name in f.readline().split(" ")]
+    game = ra.RaGame(player_names, move_history_file=path)
+    for player_state, sun_set in zip(
+        game.game_state.player_states, sorted(gi.STARTING_SUN[game.num_players])
+    ):
+        player_state.set_usable_sun(sun_set)
+    game.load_actions_from_infile(path)
+    return game.game_state
+
+
+def write_position(path: str, num_players: int, seed: int, num_moves: int) -> None:
+    """Writes the move history of num_moves seeded random moves."""
+    rng = random.Random(seed)
+    player_names = [f"P{idx + 1}" for idx in range(num_players)]
+    game_state = gs.GameState(player_names)
+    draw_order = sorted(game_state.get_tile_bag().get_draw_order())
+    rng.shuffle(draw_order)
+    game_state.get_tile_bag()._set_draw_order(list(draw_order))
+    for player_state, sun_set in zip(
+        game_state.player_states, sorted(gi.STARTING_SUN[num_players])
+    ):
+        player_state.set_usable_sun(sun_set)
+
+    lines = [" ".join(player_names), " ".join(str(tile) for tile in draw_order)]
+    for _ in range(num_moves):
+        legal_actions = ra.get_possible_actions(game_state)
+        assert legal_actions is not None, "Game ended before num_moves moves"
+        action = rng.choice(legal_actions)
+        tile = ra.execute_action_internal(game_state, action, legal_actions)
+        lines.append(
+            f"{gi.DRAW_OPTIONS[0]} {tile}" if action == gi.DRAW else f"{action}"
+        )
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def measure(game_state: gs.GameState, num_auctions: int) -> Expected:
+    """Searches the position with an empty transposition table."""
+    metrics = o.default_metrics()
+    with session.activate(session.SearchSession("search_regression")):
+        start_time = time.perf_counter()
+        action = o.oracle_search(game_state, num_auctions, metrics=metrics)
+        seconds = time.perf_counter() - start_time
+    return Expected(
+        numAuctions=num_auctions,
+        bestAction=action,
+        numCalls=metrics["numCalls"],
+        cacheHit=metrics["cacheHit"],
+        maxDepth=metrics["maxDepth"],
+        seconds=round(seconds, 4),
+    )
+
+
+def load_expected(corpus_dir: str = CORPUS_DIR) -> Dict[str, Expected]:
+    path = os.path.join(corpus_dir, EXPECTED_FILENAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def write_expected(expected: Dict[str, Expected], corpus_dir: str = CORPUS_DIR) -> None:
+    with open(os.path.join(corpus_dir, EXPECTED_FILENAME), "w") as f:
+        json.dump(expected, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def record(corpus_dir: str = CORPUS_DIR) -> Dict[str, Expected]:
+    """Re-measures every position of the corpus and overwrites the expectations."""
+    expected = {
+        name: measure(
+            load_position(os.path.join(corpus_dir, name)), position["numAuctions"]
+        )
+        for name, position in load_expected(corpus_dir).items()
+    }
+    write_expected(expected, corpus_dir)
+    return expected
+
+
+def add(
+    name: str,
+    num_players: int,
+    seed: int,
+    num_moves: int,
+    num_auctions: int,
+    corpus_dir: str = CORPUS_DIR,
+) -> Expected:
+    """Adds a position reached by seeded random play to the corpus."""
+    path = os.path.join(corpus_dir, name)
+    write_position(path, num_players, seed, num_moves)
+    expected = load_expected(corpus_dir)
+    expected[name] = measure(load_position(path), num_auctions)
+    write_expected(expected, corpus_dir)
+    return expected[name]
+
+
+def compare(
+    expected: Expected, actual: Expected, tolerances: Tolerances = Tolerances()
+) -> List[str]:
+    """Describes how the actual search regressed from the expected one, if at all."""
+    problems = []
+    if actual["bestAction"] != expected["bestAction"]:
+        problems.append(
+            f"action {gi.ACTION_MAPPING[expected['bestAction']]} -> "
+            f"{gi.ACTION_MAPPING[actual['bestAction']]}"
+        )
+    if actual["numCalls"] > expected["numCalls"] * (1 + tolerances.nodes):
+        problems.append(f"numCalls {expected['numCalls']} -> {actual['numCalls']}")
+    if actual["seconds"] > max(expected["seconds"], tolerances.min_seconds) * (
+        1 + tolerances.seconds
+    ):
+        problems.append(f"seconds {expected['seconds']:.3f} -> {actual['seconds']:.3f}")
+    return problems
+
+
+def check(
+    corpus_dir: str = CORPUS_DIR,
+    tolerances: Tolerances = Tolerances(),
+    names: Optional[List[str]] = None,
+) -> List[str]:
+    """Searches every position of the corpus and describes the result of each.
+
+    Positions beyond the tolerances are marked REGRESSED.
+    """
+    lines = []
+    for name, expected in load_expected(corpus_dir).items():
+        if names is not None and name not in names:
+            continue
+        game_state = load_position(os.path.join(corpus_dir, name))
+        actual = measure(game_state, expected["numAuctions"])
+        summary = (
+            f"{name}: {actual['numCalls']} calls, {actual['cacheHit']} hits, "
+            f"depth {actual['maxDepth']}, {actual['seconds']:.3f}s"
+        )
+        if problems := compare(expected, actual, tolerances):
+            summary += f"  REGRESSED ({', '.join(problems)})"
+        lines.append(summary)
+    return lines
+
+
+def get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Checks the cost of oracle_search on the regression corpus."
+    )
+    parser.add_argument(
+        "--corpus", default=CORPUS_DIR, help="Folder with the move histories."
+    )
+    parser.add_argument(
+        "--positions", nargs="+", default=None, help="Only check these positions."
+    )
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="Overwrite the expectations with the current results.",
+    )
+    parser.add_argument(
+        "--add",
+        default=None,
+        help="Add a position reached by seeded random play under this name.",
+    )
+    parser.add_argument(
+        "--num_players", "-n", type=int, default=2, help="Players of the added game."
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seeds the added game.")
+    parser.add_argument(
+        "--moves", type=int, default=10, help="Random moves into the added game."
+    )
+    parser.add_argument(
+        "--auctions", type=int, default=2, help="Auctions searched in the added game."
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print where the searches of the corpus spent their time.",
+    )
+    parser.add_argument(
+        "--node_tolerance",
+        type=float,
+        default=Tolerances().nodes,
+        help="Relative growth of numCalls allowed.",
+    )
+    parser.add_argument(
+        "--time_tolerance",
+        type=float,
+        default=Tolerances().seconds,
+        help="Relative growth of wall time allowed.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args: argparse.Namespace = get_args()
+    if args.add:
+        print(
+            add(
+                args.add,
+                args.num_players,
+                args.seed,
+                args.moves,
+                args.auctions,
+                args.corpus,
+            )
+        )
+        sys.exit(0)
+    if args.record:
+        for name, expected in record(args.corpus).items():
+            print(f"{name}: {expected}")
+        sys.exit(0)
+    if args.profile:
+        profiling.enable()
+    lines = check(
+        args.corpus,
+        Tolerances(nodes=args.node_tolerance, seconds=args.time_tolerance),
+        args.positions,
+    )
+    print("\n".join(lines))
+    if (search_profile := profiling.disable()) is not None:
+        print(search_profile.format())
+    sys.exit(1 if any("REGRESSED" in line for line in lines) else 0)
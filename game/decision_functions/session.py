@@ -0,0 +1,199 @@
+"""
+Per-game search sessions.
+
+A session holds the transposition table and principal variation of a single game,
+so every AI seat and every consecutive AI move in that game reuses earlier work
+without sharing a table with every other game on the server. Searches use the
+session activated around them and fall back to the global table otherwise.
+"""
+import collections
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+from game.decision_functions import transposition
+
+logger: logging.Logger = logging.getLogger("uvicorn.info")
+
+TAction = int
+
+# Maximum number of sessions kept alive. The least recently used is evicted first.
+MAX_SESSIONS: int = 64
+# Slots of the table of each session. A search fills a few thousand, and entries of
+# earlier moves are replaced first once it is full.
+SESSION_MAX_SLOTS: int = 1 << 16
+# Bytes the tables of all sessions may use before the least recently used sessions
+# are evicted, on top of MAX_SESSIONS.
+MAX_SESSION_BYTES: int = 32 << 20
+# Seconds to wait for a cancelled background search to finish.
+PONDER_JOIN_TIMEOUT: float = 1.0
+
+_ACTIVE: contextvars.ContextVar[Optional["SearchSession"]] = contextvars.ContextVar(
+    "active_search_session", default=None
+)
+# Set in background searches, which stop once the event is set.
+_CANCEL: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "search_cancel_event", default=None
+)
+# Set in searches that must finish by a time.time(), eg. in PIMC workers.
+_DEADLINE: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "search_deadline", default=None
+)
+_SESSIONS: "collections.OrderedDict[str, SearchSession]" = collections.OrderedDict()
+
+
+class SearchCancelled(Exception):
+    """Raised within a search once it is cancelled or past its deadline."""
+
+
+class SearchSession:
+    """The search state of a single game."""
+
+    __slots__ = (
+        "session_id",
+        "table",
+        "principal_variation",
+        "ponder_variations",
+        "ponder_thread",
+        "ponder_cancel",
+    )
+
+    def __init__(
+        self,
+        session_id: str,
+        table: Optional[transposition.TranspositionTable] = None,
+    ) -> None:
+        self.session_id: str = session_id
+        if table is None:
+            table = transposition.TranspositionTable(SESSION_MAX_SLOTS)
+        # Same layout as the global table of oracle.value_state, but smaller.
+        self.table: transposition.TranspositionTable = table
+        # The best line of play found by the last search, starting at its root.
+        self.principal_variation: List[TAction] = []
+        # The best lines found by pondering, keyed by the reply they follow.
+        self.ponder_variations: Dict[TAction, List[TAction]] = {}
+        # The background search warming the table, if any. See ponder.py.
+        self.ponder_thread: Optional[threading.Thread] = None
+        self.ponder_cancel: threading.Event = threading.Event()
+
+    def is_pondering(self) -> bool:
+        return self.ponder_thread is not None and self.ponder_thread.is_alive()
+
+    def stop_pondering(self, timeout: Optional[float] = PONDER_JOIN_TIMEOUT) -> None:
+        """Cancels the background search and waits up to timeout for it to finish.
+
+        Entries it completed stay in the table. If it is still running, the table is
+        left to it and the session starts over with an empty one, since tables must
+        not be written by two threads at once. Pass timeout=0 to never block.
+        """
+        if self.ponder_thread is None:
+            return
+        self.ponder_cancel.set()
+        if timeout != 0:
+            self.ponder_thread.join(timeout)
+        if self.ponder_thread.is_alive():
+            logger.warning(
+                f"Pondering of session {self.session_id} is still stopping, "
+                "dropping its table"
+            )
+            self.table = transposition.TranspositionTable(SESSION_MAX_SLOTS)
+        self.ponder_thread = None
+
+    def __repr__(self) -> str:
+        return (
+            f"SearchSession({self.session_id}, entries={len(self.table)}, "
+            f"pv={self.principal_variation})"
+        )
+
+
+def current() -> Optional[SearchSession]:
+    """Returns the session searches should use, if any."""
+    return _ACTIVE.get()
+
+
+@contextlib.contextmanager
+def activate(search_session: SearchSession) -> Iterator[SearchSession]:
+    """Makes searches within the context use the given session."""
+    token = _ACTIVE.set(search_session)
+    try:
+        yield search_session
+    finally:
+        _ACTIVE.reset(token)
+
+
+@contextlib.contextmanager
+def cancellable(cancel: threading.Event) -> Iterator[threading.Event]:
+    """Makes searches within the context stop once the event is set."""
+    token = _CANCEL.set(cancel)
+    try:
+        yield cancel
+    finally:
+        _CANCEL.reset(token)
+
+
+@contextlib.contextmanager
+def time_limit(deadline: float) -> Iterator[float]:
+    """Makes searches within the context stop once time.time() passes deadline."""
+    token = _DEADLINE.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _DEADLINE.reset(token)
+
+
+def in_background() -> bool:
+    """Returns if the search running in this context is a background search."""
+    return _CANCEL.get() is not None
+
+
+def raise_if_cancelled() -> None:
+    """Raises SearchCancelled if the search running in this context was cancelled or
+    ran past its deadline."""
+    if (cancel := _CANCEL.get()) is not None and cancel.is_set():
+        raise SearchCancelled()
+    if (deadline := _DEADLINE.get()) is not None and time.time() > deadline:
+        raise SearchCancelled()
+
+
+def find(session_id: str) -> Optional[SearchSession]:
+    """Returns the session with the given id, without creating it."""
+    return _SESSIONS.get(session_id)
+
+
+def get(session_id: str) -> SearchSession:
+    """Returns the session with the given id, creating it if needed."""
+    if (search_session := _SESSIONS.get(session_id)) is not None:
+        _SESSIONS.move_to_end(session_id)
+        return search_session
+    search_session = _SESSIONS[session_id] = SearchSession(session_id)
+    while len(_SESSIONS) > 1 and (
+        len(_SESSIONS) > MAX_SESSIONS or table_bytes() > MAX_SESSION_BYTES
+    ):
+        evicted_id, evicted = _SESSIONS.popitem(last=False)
+        evicted.stop_pondering(timeout=0)
+        logger.info(f"Evicted search session {evicted_id}")
+    return search_session
+
+
+def release(session_id: str) -> None:
+    """Frees the session with the given id, if any."""
+    if (search_session := _SESSIONS.pop(session_id, None)) is not None:
+        search_session.stop_pondering(timeout=0)
+        logger.info(f"Released search session {session_id}")
+
+
+def num_sessions() -> int:
+    return len(_SESSIONS)
+
+
+def table_bytes() -> int:
+    """Memory used by the tables of every live session."""
+    return sum(search_session.table.nbytes() for search_session in _SESSIONS.values())
+
+
+def tables() -> List[transposition.TranspositionTable]:
+    """Returns the transposition tables of every live session."""
+    return [search_session.table for search_session in _SESSIONS.values()]
@@ -0,0 +1,95 @@
+import random
+import unittest
+
+from game import info as gi
+from game import ra
+from game import state as gs
+from game.decision_functions import endgame
+from game.decision_functions import oracle as o
+from game.proxy import copy
+
+
+def final_round_state(draw_order: list[int]) -> gs.GameState:
+    """Creates a two player game with a single Ra left to draw.
+
+    Each player has already used their two lowest suns.
+    """
+    game_state = gs.GameState(["P1", "P2"])
+    game_state.current_round = game_state.get_total_rounds()
+    game_state.num_ras_this_round = game_state.get_num_ras_per_round() - 1
+    game_state.get_tile_bag()._set_draw_order(draw_order)
+    for player_state in game_state.player_states:
+        player_state.set_usable_sun(player_state.usable_sun[2:])
+    return game_state
+
+
+class EndgameTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # Required since tile bags are randomly ordered is used.
+        random.seed(10)
+
+    def test_estimate_tree_size(self) -> None:
+        self.assertEqual(endgame.estimate_tree_size(gs.GameState(["P1", "P2"])), -1)
+        game_state = final_round_state([gi.INDEX_OF_GOLD, gi.INDEX_OF_RA])
+        self.assertEqual(endgame.draws_until_game_end(game_state), 2)
+        self.assertEqual(endgame.estimate_tree_size(game_state), 2**2 * 3**4)
+        self.assertTrue(endgame.is_solvable(game_state))
+        self.assertFalse(endgame.is_solvable(game_state, threshold=10))
+
+    def test_solve_matches_final_scores(self) -> None:
+        game_state = final_round_state(
+            [gi.INDEX_OF_PHAR, gi.INDEX_OF_PHAR, gi.INDEX_OF_RA, gi.INDEX_OF_GOLD]
+        )
+        ra.execute_action_internal(game_state, gi.DRAW)
+        ra.execute_action_internal(game_state, gi.DRAW)
+
+        action_values = endgame.EndgameSolver().solve(game_state)
+        assert action_values is not None
+        self.assertEqual(set(action_values.keys()), {gi.DRAW, gi.AUCTION})
+
+        # Drawing the last Ra ends the game.
+        game_state_copy = copy.deepcopy(game_state)
+        ra.execute_action_internal(game_state_copy, gi.DRAW)
+        self.assertTrue(game_state_copy.is_game_ended())
+        self.assertEqual(
+            action_values[gi.DRAW],
+            tuple(
+                float(player_state.get_player_points())
+                for player_state in game_state_copy.player_states
+            ),
+        )
+        # The oracle switches over to the solver.
+        self.assertEqual(
+            o.oracle_search(game_state),
+            o.get_best_action(game_state.get_current_player(), action_values),
+        )
+
+    def test_skips_golden_gods(self) -> None:
+        game_state = final_round_state([gi.INDEX_OF_PHAR, gi.INDEX_OF_RA])
+        game_state.give_tiles_to_player(
+            game_state.get_current_player(), [gi.INDEX_OF_GOD]
+        )
+        ra.execute_action_internal(game_state, gi.DRAW)
+        game_state.give_tiles_to_player(
+            game_state.get_current_player(), [gi.INDEX_OF_GOD]
+        )
+        self.assertIn(gi.GOD_1, ra.get_possible_actions(game_state) or [])
+
+        solver = endgame.EndgameSolver()
+        action_values = solver.solve(game_state)
+        assert action_values is not None
+        self.assertEqual(set(action_values.keys()), {gi.DRAW, gi.AUCTION})
+        self.assertGreater(len(solver.table), 0)
+        # Later solves are answered from the table.
+        self.assertEqual(solver.solve(game_state), action_values)
+        self.assertEqual(solver.num_nodes, 0)
+
+    def test_node_limit(self) -> None:
+        game_state = final_round_state([gi.INDEX_OF_GOLD, gi.INDEX_OF_RA])
+        solver = endgame.EndgameSolver(node_limit=5)
+        self.assertIsNone(solver.solve(game_state))
+        self.assertIsNotNone(endgame.EndgameSolver().solve(game_state))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,103 @@
 import unittest
 
+from game import info as gi
 from game.decision_functions import evaluate_auction_tiles_utils as e
 
 
+def _context(collection: dict[int, int]) -> e.AuctionContext:
+    counts = [0] * gi.NUM_COLLECTIBLE_TILE_TYPES
+    for idx, num in collection.items():
+        counts[idx] = num
+    return e.AuctionContext(
+        collection=tuple(counts),
+        opponent_pharaohs=((0, True),),
+        ra_tiles_left_in_round=5,
+        num_rounds_left_inc_this_one=2,
+        how_many_sun_left=3,
+    )
+
+
 class RaTest(unittest.TestCase):
+    def test_value_auction_tiles(self) -> None:
+        context = _context({})
+        self.assertEqual(e.value_auction_tiles([], context), 0)
+        self.assertEqual(e.value_auction_tiles([gi.INDEX_OF_GOLD], context), 3)
+        self.assertEqual(
+            e.value_auction_tiles([gi.INDEX_OF_GOLD, gi.INDEX_OF_GOD], context), 6
+        )
+        # Ra tiles are worth nothing.
+        self.assertEqual(e.value_auction_tiles([gi.INDEX_OF_RA], context), 0)
+        # A pharaoh is worth more when tied for the lead.
+        self.assertGreater(
+            e.value_auction_tiles([gi.INDEX_OF_PHAR], context),
+            e.value_auction_tiles([gi.INDEX_OF_PHAR], _context({gi.INDEX_OF_PHAR: 3})),
+        )
+
+    def test_value_auction_tiles_is_memoized(self) -> None:
+        context = _context({gi.INDEX_OF_FORT: 2})
+        tiles = [gi.INDEX_OF_FORT, gi.INDEX_OF_ASTR, gi.INDEX_OF_NILE]
+        value = e.value_auction_tiles(tiles, context)
+        hits = e._value_auction_tiles.cache_info().hits
+        # The order of the tiles does not matter.
+        self.assertEqual(e.value_auction_tiles(list(reversed(tiles)), context), value)
+        self.assertEqual(e._value_auction_tiles.cache_info().hits, hits + 1)
+
+    def test_value_auction_tiles_disasters(self) -> None:
+        context = _context(
+            {gi.INDEX_OF_PHAR: 2, gi.INDEX_OF_FORT: 1, gi.INDEX_OF_OBEL: 3}
+        )
+        self.assertLess(
+            e.value_auction_tiles([gi.INDEX_OF_DIS_PHAR], context),
+            e.value_auction_tiles([gi.INDEX_OF_DIS_PHAR], _context({})),
+        )
+        self.assertEqual(e.value_auction_tiles([gi.INDEX_OF_DIS_PHAR], _context({})), 0)
+        # The disaster is resolved after collecting the other tiles.
+        self.assertLess(
+            e.value_auction_tiles([gi.INDEX_OF_PHAR, gi.INDEX_OF_DIS_PHAR], context),
+            e.value_auction_tiles([gi.INDEX_OF_PHAR], context),
+        )
+        # Losing two obelisks costs less than losing the lone fortress.
+        self.assertEqual(e.value_auction_tiles([gi.INDEX_OF_DIS_MON], context), -5)
+
+    def test_value_monuments(self) -> None:
+        no_monuments = [0] * gi.NUM_MONUMENTS
+        self.assertEqual(e.value_monuments(no_monuments, no_monuments), 0)
+        self.assertEqual(e.value_monuments([1] + no_monuments[1:], no_monuments), 1)
+        # 3rd copy of a monument
+        self.assertEqual(
+            e.value_monuments([1] + no_monuments[1:], [2] + no_monuments[1:]), 5
+        )
+        # 7th distinct monument
+        self.assertEqual(
+            e.value_monuments([0, 0, 0, 0, 0, 0, 1, 0], [1, 1, 1, 1, 1, 1, 0, 0]),
+            4,
+        )
+
+    def test_value_disasters(self) -> None:
+        context = _context({})
+        collection = [0] * gi.NUM_COLLECTIBLE_TILE_TYPES
+        self.assertEqual(
+            e.value_disasters({gi.INDEX_OF_DIS_CIV: 1}, collection, {}, context), 0
+        )
+        # Duplicate civs are discarded first.
+        collection[gi.INDEX_OF_ASTR] = 3
+        self.assertEqual(
+            e.value_disasters({gi.INDEX_OF_DIS_CIV: 1}, collection, {}, context), 0
+        )
+        collection[gi.INDEX_OF_ASTR] = 1
+        collection[gi.INDEX_OF_AGR] = 1
+        self.assertEqual(
+            e.value_disasters({gi.INDEX_OF_DIS_CIV: 1}, collection, {}, context),
+            e.value_civs(2, 0, 5, 3),
+        )
+        # Floods are discarded before niles.
+        collection[gi.INDEX_OF_NILE] = 3
+        collection[gi.INDEX_OF_FLOOD] = 1
+        self.assertEqual(
+            e.value_disasters({gi.INDEX_OF_DIS_NILE: 1}, collection, {}, context),
+            e.value_niles_and_flood(1, 1, 2, 0, 5, 2),
+        )
+
     def test_value_civs_not_second_civ(self) -> None:
         self.assertEqual(e.value_civs(0, 0, 10, 4), 0.0)  # 0 new civs
         self.assertEqual(e.value_civs(0, 0, 10, 4), 0.0)  # no civs
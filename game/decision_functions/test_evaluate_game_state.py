@@ -134,6 +134,40 @@ class EvaluateGameStateTest(unittest.TestCase):
         self.assert_close_enough(usable_suns_valuations_3[0], 20.83)  # [2,5,6,9]
         self.assert_close_enough(usable_suns_valuations_3[1], 12.5)  # [4,7]
 
+    def test_sun_tables(self) -> None:
+        for num_players in gi.STARTING_SUN:
+            for sun_set in e._possible_sun_sets(num_players):
+                self.assertEqual(
+                    e.lookup_unusable_sun_value(sun_set, num_players),
+                    e.value_one_players_unusable_sun(sun_set, num_players),
+                )
+                for num_ras in range(gi.NUM_RAS_PER_ROUND[num_players] + 1):
+                    self.assertEqual(
+                        e.lookup_usable_sun_value(sun_set, num_players, num_ras),
+                        e.value_one_players_usable_sun(sun_set, num_players, num_ras),
+                    )
+
+        # Suns a player can never hold are computed directly.
+        self.assertEqual(
+            e.lookup_usable_sun_value([1, 2, 3, 4, 5], 2, 0),
+            e.value_one_players_usable_sun([1, 2, 3, 4, 5], 2, 0),
+        )
+        self.assertEqual(e.lookup_unusable_sun_value([1, 2, 3, 4, 5], 2), -5.0)
+
+    def test_value_of_auction_tiles(self) -> None:
+        game_state = gs.GameState(["P1", "P2"])
+        game_state.player_states[0].set_usable_sun([3, 4, 7, 8])
+        game_state.player_states[1].set_usable_sun([2, 5, 6, 9])
+        self.assertEqual(e.value_of_auction_tiles(game_state), {0: 0.0, 1: 0.0})
+
+        ra.execute_action_internal(game_state, gi.DRAW, None, gi.INDEX_OF_GOLD)  # P1
+        self.assertEqual(e.likely_auction_winner(game_state), 1)
+        valuations = e.value_of_auction_tiles(game_state)
+        self.assertEqual(valuations[0], 0.0)
+        # P2 wins 3 points of gold, but exchanges their 9 (worth 25 - 17) for the
+        # center 1 (worth -2).
+        self.assert_close_enough(valuations[1], 3 - (25 - 17) - 2)
+
     def assert_close_enough(self, n: float, m: float, epsilon: float = 0.1) -> None:
         """
         Asserts that n and m are within epsilon of each other.
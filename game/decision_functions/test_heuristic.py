@@ -0,0 +1,61 @@
+import random
+import time
+import unittest
+
+from game import info as gi
+from game import ra
+from game import state as gs
+from game.decision_functions import ai_base
+from game.decision_functions import heuristic as h
+
+
+class HeuristicTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # Required since tile bags are randomly ordered is used.
+        random.seed(10)
+
+    def test_draws_without_tiles(self) -> None:
+        game_state = gs.GameState(["P1", "P2"])
+        self.assertEqual(h.heuristic_ai_player(game_state), gi.DRAW)
+
+    def test_auctions_valuable_tiles(self) -> None:
+        game_state = gs.GameState(["P1", "P2"])
+        game_state.player_states[0].set_usable_sun([2, 5, 6, 9])
+        game_state.player_states[1].set_usable_sun([3, 4, 7, 8])
+        ra.execute_action_internal(game_state, gi.DRAW, None, gi.INDEX_OF_ASTR)  # P1
+        ra.execute_action_internal(game_state, gi.DRAW, None, gi.INDEX_OF_AGR)  # P2
+        ra.execute_action_internal(game_state, gi.DRAW, None, gi.INDEX_OF_WRI)  # P1
+        ra.execute_action_internal(game_state, gi.DRAW, None, gi.INDEX_OF_GOLD)  # P2
+        # P1 outbids P2 with their 9.
+        self.assertEqual(h.heuristic_ai_player(game_state), gi.AUCTION)
+
+        ra.execute_action_internal(game_state, gi.AUCTION)  # P1
+        # P2 bids rather than letting P1 take the tiles for free.
+        self.assertIn(h.heuristic_ai_player(game_state), [gi.BID_1, gi.BID_2])
+
+    def test_discards_duplicate_civs(self) -> None:
+        game_state = gs.GameState(["P1", "P2"])
+        game_state.player_states[0].add_tiles(
+            [gi.INDEX_OF_ASTR, gi.INDEX_OF_ASTR, gi.INDEX_OF_AGR, gi.INDEX_OF_WRI]
+        )
+        game_state.set_auction_winning_player(0)
+        game_state.set_num_civs_to_discard(2)
+        self.assertEqual(h.heuristic_ai_player(game_state), gi.DISCARD_ASTR)
+
+    def test_legal_and_fast(self) -> None:
+        for num_players in range(gi.MIN_NUM_PLAYERS, gi.MAX_NUM_PLAYERS + 1):
+            game_state = gs.GameState([f"P{i + 1}" for i in range(num_players)])
+            num_moves, elapsed = 0, 0.0
+            while not game_state.is_game_ended():
+                start = time.perf_counter()
+                action = h.heuristic_ai_player(game_state)
+                elapsed += time.perf_counter() - start
+                num_moves += 1
+                self.assertIn(action, ra.get_possible_actions(game_state) or [])
+                ra.execute_action_internal(game_state, ai_base.random_ai(game_state))
+            # Generous bound; a move typically takes tens of microseconds.
+            self.assertLess(elapsed / num_moves, 0.01)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import random
+import tempfile
+import unittest
+
+from game import info as gi
+from game import ra
+from game import state as gs
+from game.decision_functions import endgame, memory
+from game.decision_functions import opening_book as ob
+from game.decision_functions import oracle as o
+from game.decision_functions import session, transposition
+
+
+class MemoryTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # Required since tile bags are randomly ordered is used.
+        random.seed(10)
+        o.value_state.cache.clear()
+
+    def test_table_usage(self) -> None:
+        table = transposition.TranspositionTable()
+        for key in range(1, 2000):
+            table.store(key, (1.0, 2.0))
+        usage = memory.table_usage([table, transposition.TranspositionTable()])
+        self.assertEqual(usage["numTables"], 2)
+        self.assertEqual(usage["entries"], 1999)
+        self.assertEqual(usage["bytes"], usage["slots"] * transposition.BYTES_PER_SLOT)
+        self.assertEqual(
+            usage["bytes"],
+            table.nbytes() + transposition.TranspositionTable().nbytes(),
+        )
+
+    def test_search_metrics(self) -> None:
+        metrics = o.default_metrics()
+        o.oracle_search(gs.GameState(["P1", "P2", "P3"]), 1, metrics=metrics)
+        self.assertEqual(metrics["tableEntries"], len(o.value_state.cache))
+        self.assertEqual(metrics["tableBytes"], o.value_state.cache.nbytes())
+
+    def test_usage(self) -> None:
+        game = ra.RaGame(["P1", "P2", "P3"])
+        empty = memory.usage([game])
+        self.assertEqual(empty["numGames"], 1)
+        self.assertEqual(empty["gameBytes"], memory.game_state_bytes(3))
+        self.assertIsNone(empty["topAllocations"])
+
+        legal_actions = ra.get_possible_actions(game.game_state)
+        assert legal_actions is not None
+        game.execute_action(gi.DRAW, legal_actions)
+        with session.activate(session.get("test_memory")):
+            o.oracle_search(game.game_state, 1)
+        try:
+            usage = memory.usage([game])
+        finally:
+            session.release("test_memory")
+        self.assertGreater(usage["gameBytes"], empty["gameBytes"])
+        self.assertGreater(usage["sessionTables"]["entries"], 0)
+        self.assertEqual(
+            usage["totalBytes"],
+            usage["globalTable"]["bytes"]
+            + usage["sessionTables"]["bytes"]
+            + usage["endgameTable"]["bytes"]
+            + usage["gameBytes"],
+        )
+        self.assertIn("per game", memory.format_usage(usage))
+
+    def test_endgame_and_opening_book(self) -> None:
+        self.assertEqual(memory.usage()["openingBookBytes"], 0)
+        endgame.solver.table.clear()
+        endgame.solver.table.store(1, (1.0, 2.0))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "book.bin")
+            ob.write_book(path, {1: {gi.DRAW: 1.0}})
+            book = ob.load(path)
+            assert book is not None
+            try:
+                usage = memory.usage()
+                self.assertEqual(usage["openingBookBytes"], os.path.getsize(path))
+                self.assertEqual(
+                    usage["endgameTable"]["bytes"], endgame.solver.table.nbytes()
+                )
+            finally:
+                book.close()
+                ob._BOOK, ob._BOOK_LOADED = None, False
+                endgame.solver.table.clear()
+        self.assertEqual(usage["endgameTable"]["entries"], 1)
+        self.assertIn("openingBook", memory.format_usage(usage))
+
+    def test_tracing(self) -> None:
+        memory.start_tracing()
+        try:
+            tables = [transposition.TranspositionTable() for _ in range(10)]
+            usage = memory.usage()
+        finally:
+            memory.stop_tracing()
+        self.assertEqual(len(tables), 10)
+        allocations = usage["topAllocations"]
+        assert allocations is not None
+        self.assertTrue(allocations)
+        self.assertTrue(
+            any("transposition.py" in entry["location"] for entry in allocations)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from game import info as gi
+from game import ra
+from game import state as gs
+from game.decision_functions import build_opening_book as bob
+from game.decision_functions import opening_book as ob
+from game.decision_functions import oracle as o
+from game.decision_functions import pimc
+
+
+class OpeningBookTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # Required since tile bags are randomly ordered is used.
+        random.seed(10)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "book.bin")
+
+    def tearDown(self) -> None:
+        if ob._BOOK is not None:
+            ob._BOOK.close()
+        ob._BOOK = None
+        ob._BOOK_LOADED = False
+        self.tmpdir.cleanup()
+
+    def test_canonical_key_ignores_draw_order(self) -> None:
+        game_state = gs.GameState(["P1", "P2"])
+        other_state = gs.GameState(["P1", "P2"])
+        other_state.player_states = game_state.player_states
+        self.assertNotEqual(
+            game_state.get_tile_bag().get_draw_order(),
+            other_state.get_tile_bag().get_draw_order(),
+        )
+        self.assertEqual(ob.canonical_key(game_state), ob.canonical_key(other_state))
+
+        ra.execute_action_internal(other_state, gi.DRAW)
+        self.assertNotEqual(ob.canonical_key(game_state), ob.canonical_key(other_state))
+
+    def test_opening_positions(self) -> None:
+        positions = list(ob.opening_positions(3))
+        self.assertEqual(len(positions), 2)
+        self.assertEqual(positions[0].player_states[0].get_usable_sun(), [2, 5, 8, 13])
+        self.assertEqual(
+            [position.player_states[1].get_usable_sun() for position in positions],
+            [[3, 6, 9, 12], [4, 7, 10, 11]],
+        )
+
+        positions = list(ob.opening_positions(2, depth=1))
+        self.assertEqual(len(positions), 1 + len(gi.TILE_INFO))
+        for position in positions[1:]:
+            self.assertEqual(position.get_num_tiles_left(), gi.STARTING_NUM_TILES - 1)
+            self.assertEqual(
+                sum(position.get_tile_bag_contents()), position.get_num_tiles_left()
+            )
+
+    def test_lookup(self) -> None:
+        game_state, other_state = ob.opening_positions(3)
+        ob.write_book(
+            self.path,
+            {ob.canonical_key(game_state): {gi.DRAW: 1.5, gi.AUCTION: 2.5}},
+        )
+
+        self.assertIsNone(ob.lookup(game_state))
+        book = ob.load(self.path)
+        assert book is not None
+        self.assertEqual(len(book), 1)
+        self.assertEqual(
+            book.action_values(game_state), {gi.DRAW: 1.5, gi.AUCTION: 2.5}
+        )
+        self.assertEqual(ob.lookup(game_state), gi.AUCTION)
+        self.assertEqual(pimc.pimc_ai_player(game_state), gi.AUCTION)
+        self.assertIsNone(ob.lookup(other_state))
+
+    def test_load(self) -> None:
+        (game_state,) = ob.opening_positions(2)
+        # Books are only loaded by load(), never by a lookup.
+        with patch.dict(os.environ, {"OPENING_BOOK_PATH": self.path}):
+            self.assertIsNone(ob.lookup(game_state))
+            self.assertFalse(ob._BOOK_LOADED)
+
+            # A missing book means playing without one.
+            self.assertIsNone(ob.load())
+            self.assertTrue(ob._BOOK_LOADED)
+            self.assertIsNone(ob.lookup(game_state))
+
+        with open(self.path, "wb") as f:
+            f.write(b"not a book")
+        ob._BOOK_LOADED = False
+        with self.assertRaises(ValueError):
+            ob.load(self.path)
+        self.assertFalse(ob._BOOK_LOADED)
+
+        # Bad books are retried.
+        ob.write_book(self.path, {ob.canonical_key(game_state): {gi.DRAW: 1.5}})
+        self.assertIsNotNone(ob.load(self.path))
+        self.assertEqual(ob.lookup(game_state), gi.DRAW)
+        self.assertIs(ob.load(), ob._BOOK)
+
+    def test_oracle_ignores_book(self) -> None:
+        (game_state,) = ob.opening_positions(2)
+        ob.write_book(
+            self.path,
+            {ob.canonical_key(game_state): {gi.DRAW: 1.5, gi.AUCTION: 2.5}},
+        )
+        assert ob.load(self.path) is not None
+        # The book holds PIMC values, which the oracle sees past.
+        with patch.object(o, "oracle_search", return_value=gi.DRAW) as search:
+            self.assertEqual(o.oracle_ai_player(game_state), gi.DRAW)
+        search.assert_called_once_with(game_state)
+
+    def test_build_book(self) -> None:
+        num_positions = bob.build_book(
+            self.path, [2], num_samples=1, max_workers=0, num_auctions_allowed=1
+        )
+        self.assertEqual(num_positions, 1)
+
+        book = ob.OpeningBook(self.path)
+        (game_state,) = ob.opening_positions(2)
+        action_values = book.action_values(game_state)
+        assert action_values is not None
+        self.assertEqual(set(action_values), {gi.DRAW, gi.AUCTION})
+        book.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -141,6 +141,25 @@ class OracleSearchTest(unittest.TestCase):
             best_move = o.oracle_search(game_state)
             self.assertEqual(best_move, gi.DRAW)
 
+    def test_estimate_auctions(self) -> None:
+        game_state = gs.GameState(["P1", "P2", "P3"])
+        ra.execute_action_internal(game_state, gi.DRAW, None, gi.INDEX_OF_GOLD)  # P1
+        ra.execute_action_internal(game_state, gi.DRAW, None, gi.INDEX_OF_PHAR)  # P2
+
+        num_explored = {}
+        for enabled in [False, True]:
+            o.set_estimate_auctions(enabled)
+            o.value_state.cache.clear()
+            metrics = o.default_metrics()
+            try:
+                action_values = o.oracle_search_internal(game_state, metrics, 1, 0)
+            finally:
+                o.set_estimate_auctions(False)
+                o.value_state.cache.clear()
+            self.assertEqual(set(action_values), {gi.DRAW, gi.AUCTION})
+            num_explored[enabled] = metrics["cacheMiss"]
+        self.assertLess(num_explored[True], num_explored[False])
+
 
 if __name__ == "__main__":
     # import cProfile
@@ -0,0 +1,78 @@
+import random
+import time
+import unittest
+
+from game import info as gi
+from game import ra
+from game import state as gs
+from game.decision_functions import pimc
+
+
+class PIMCTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # Required since tile bags are randomly ordered is used.
+        random.seed(10)
+
+    def test_determinize_keeps_public_information(self) -> None:
+        game_state = gs.GameState(["P1", "P2"])
+        ra.execute_action_internal(game_state, gi.DRAW, None, gi.INDEX_OF_GOLD)
+        ra.execute_action_internal(game_state, gi.DRAW, None, gi.INDEX_OF_PHAR)
+
+        sample = pimc.determinize(game_state, random.Random(0))
+        self.assertEqual(
+            list(sample.get_tile_bag_contents()),
+            list(game_state.get_tile_bag_contents()),
+        )
+        self.assertEqual(sample.get_num_tiles_left(), game_state.get_num_tiles_left())
+        self.assertEqual(sample.player_states, game_state.player_states)
+        self.assertEqual(sample.get_auction_tiles(), game_state.get_auction_tiles())
+        self.assertIsNot(sample.get_tile_bag(), game_state.get_tile_bag())
+
+    def test_choose_action(self) -> None:
+        results = [
+            {gi.DRAW: (10.0, 0.0), gi.AUCTION: (9.0, 0.0)},
+            {gi.DRAW: (10.0, 0.0), gi.AUCTION: (9.0, 0.0)},
+            {gi.DRAW: (0.0, 0.0), gi.AUCTION: (9.0, 0.0)},
+        ]
+        self.assertEqual(
+            pimc.average_action_values(results),
+            {gi.DRAW: (20.0 / 3, 0.0), gi.AUCTION: (9.0, 0.0)},
+        )
+        self.assertEqual(
+            pimc.choose_action(0, results, pimc.Aggregation.AVERAGE), gi.AUCTION
+        )
+        self.assertEqual(pimc.choose_action(0, results, pimc.Aggregation.VOTE), gi.DRAW)
+
+    def test_pimc_search_in_process(self) -> None:
+        game_state = gs.GameState(["P1", "P2"])
+        best_move = pimc.pimc_search(
+            game_state, num_samples=2, max_workers=0, num_auctions_allowed=1, seed=0
+        )
+        self.assertEqual(best_move, gi.DRAW)
+
+    def test_deadline(self) -> None:
+        game_state = gs.GameState(["P1", "P2"])
+        self.assertIsNone(
+            pimc._search_determinization(game_state, None, time.time() - 1)
+        )
+        # Nothing finishes in time, so a shallow search answers instead.
+        best_move = pimc.pimc_search(
+            game_state, num_samples=2, deadline=0, max_workers=0, seed=0
+        )
+        self.assertIn(best_move, [gi.DRAW, gi.AUCTION])
+
+    def test_pimc_search_process_pool(self) -> None:
+        game_state = gs.GameState(["P1", "P2"])
+        for _ in range(4):
+            ra.execute_action_internal(game_state, gi.DRAW, None, gi.INDEX_OF_GOLD)
+        try:
+            best_move = pimc.pimc_search(
+                game_state, num_samples=2, max_workers=2, num_auctions_allowed=1, seed=0
+            )
+        finally:
+            pimc.shutdown_pool()
+        self.assertIn(best_move, ra.get_possible_actions(game_state) or [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import random
+import threading
+import unittest
+
+from game import info as gi
+from game import ra
+from game import state as gs
+from game.decision_functions import oracle as o
+from game.decision_functions import ponder, session
+
+
+class PonderTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # Required since tile bags are randomly ordered is used.
+        random.seed(10)
+
+    def test_likely_replies(self) -> None:
+        game_state = gs.GameState(["P1", "P2"])
+        search_session = session.SearchSession("game")
+        self.assertEqual(
+            ponder.likely_replies(game_state, search_session), [gi.DRAW, gi.AUCTION]
+        )
+        search_session.principal_variation = [gi.DRAW, gi.AUCTION]
+        self.assertEqual(
+            ponder.likely_replies(game_state, search_session), [gi.AUCTION, gi.DRAW]
+        )
+
+    def test_ponder_warms_table(self) -> None:
+        game_state = gs.GameState(["P1", "P2"])
+        search_session = session.SearchSession("game")
+        search_session.principal_variation = [gi.DRAW, gi.AUCTION]
+        ponder.start(game_state, search_session, num_auctions_allowed=1)
+        self.assertTrue(search_session.is_pondering())
+        assert search_session.ponder_thread is not None
+        search_session.ponder_thread.join()
+        self.assertGreater(len(search_session.table), 0)
+        # Pondering keeps its lines apart from the last search's.
+        self.assertEqual(search_session.principal_variation, [gi.DRAW, gi.AUCTION])
+        self.assertEqual(set(search_session.ponder_variations), {gi.DRAW, gi.AUCTION})
+
+        # The search after the reply is answered from the table.
+        ra.execute_action_internal(game_state, gi.DRAW)
+        num_entries = len(search_session.table)
+        metrics = o.default_metrics()
+        with session.activate(search_session):
+            o.oracle_search_internal(game_state, metrics, 1, depth=0)
+        self.assertEqual(len(search_session.table), num_entries)
+        self.assertEqual(metrics["cacheMiss"], 0)
+        search_session.stop_pondering()
+
+    def test_stop_pondering(self) -> None:
+        game_state = gs.GameState(["P1", "P2"])
+        search_session = session.SearchSession("game")
+        ponder.start(game_state, search_session)
+        search_session.stop_pondering()
+        self.assertFalse(search_session.is_pondering())
+        self.assertIsNone(search_session.ponder_thread)
+
+        # Slow cancellations are not waited on past the timeout. The session moves
+        # on to a new table instead of sharing one with the background search.
+        table = search_session.table
+        release = threading.Event()
+        thread = search_session.ponder_thread = threading.Thread(target=release.wait)
+        thread.start()
+        search_session.stop_pondering(timeout=0.01)
+        self.assertTrue(thread.is_alive())
+        self.assertFalse(search_session.is_pondering())
+        self.assertIsNot(search_session.table, table)
+        self.assertEqual(search_session.table.max_slots, session.SESSION_MAX_SLOTS)
+        release.set()
+        thread.join()
+
+        # Threads that stop in time keep their table.
+        table = search_session.table
+        search_session.ponder_thread = threading.Thread(target=release.wait)
+        search_session.ponder_thread.start()
+        search_session.stop_pondering()
+        self.assertIsNone(search_session.ponder_thread)
+        self.assertIs(search_session.table, table)
+
+        # Cancelling does not affect searches in other threads.
+        with session.activate(search_session):
+            self.assertIn(
+                o.oracle_search(game_state, num_auctions_allowed=1),
+                [gi.DRAW, gi.AUCTION],
+            )
@@ -0,0 +1,104 @@
+import itertools
+import random
+import unittest
+
+from game import info as gi
+from game import state as gs
+from game.decision_functions import evaluate_auction_tiles_utils as au
+from game.decision_functions import probability as p
+
+
+def _small_bag(num_ras: int, num_gold: int, num_other: int) -> p.TBag:
+    bag = [0] * gi.NUM_TILE_TYPES
+    bag[gi.INDEX_OF_RA] = num_ras
+    bag[gi.INDEX_OF_GOLD] = num_gold
+    bag[gi.INDEX_OF_NILE] = num_other
+    return tuple(bag)
+
+
+def _brute_force(bag: p.TBag, ras_left: int) -> tuple[float, float, float]:
+    """(expected draws, expected gold, chance of any gold) over every draw order."""
+    tiles = [idx for idx, num in enumerate(bag) for _ in range(num)]
+    orders = list(itertools.permutations(tiles))
+    total_draws, total_gold, any_gold = 0, 0, 0
+    for order in orders:
+        ras_seen, drawn = 0, 0
+        for tile in order:
+            if ras_seen == ras_left:
+                break
+            drawn += 1
+            ras_seen += tile == gi.INDEX_OF_RA
+        total_draws += drawn
+        num_gold = order[:drawn].count(gi.INDEX_OF_GOLD)
+        total_gold += num_gold
+        any_gold += num_gold > 0
+    return (
+        total_draws / len(orders),
+        total_gold / len(orders),
+        any_gold / len(orders),
+    )
+
+
+class ProbabilityTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # Required since tile bags are randomly ordered is used.
+        random.seed(10)
+
+    def test_hypergeometric_pmf(self) -> None:
+        self.assertAlmostEqual(
+            sum(p.hypergeometric_pmf(20, 5, 6, k) for k in range(7)), 1.0
+        )
+        self.assertAlmostEqual(p.hypergeometric_pmf(4, 2, 2, 2), 1 / 6)
+        self.assertEqual(p.hypergeometric_pmf(4, 2, 2, 3), 0.0)
+        self.assertAlmostEqual(p.prob_at_least_one(4, 2, 2), 5 / 6)
+        self.assertEqual(p.prob_at_least_one(4, 2, 10), 1.0)
+
+    def test_matches_brute_force(self) -> None:
+        for num_ras, num_gold, num_other, ras_left in [
+            (2, 1, 2, 1),
+            (2, 2, 1, 2),
+            (3, 2, 1, 2),
+            (1, 2, 2, 2),
+            (2, 1, 1, 0),
+        ]:
+            bag = _small_bag(num_ras, num_gold, num_other)
+            outlook = p.draw_outlook(bag, 10 - ras_left, 10)
+            expected_draws, expected_gold, prob_gold = _brute_force(bag, ras_left)
+            self.assertAlmostEqual(outlook.expected_draws, expected_draws)
+            self.assertAlmostEqual(
+                outlook.expected_tiles[gi.INDEX_OF_GOLD], expected_gold
+            )
+            self.assertAlmostEqual(outlook.prob_tiles[gi.INDEX_OF_GOLD], prob_gold)
+
+    def test_outlook(self) -> None:
+        game_state = gs.GameState(["P1", "P2"])
+        outlook = p.outlook(game_state)
+        self.assertIs(p.outlook(game_state), outlook)
+        # 6 of the 30 Ras must be drawn, so 6/31 of every other tile is expected.
+        self.assertAlmostEqual(
+            outlook.expected_draws, 6 * (gi.STARTING_NUM_TILES + 1) / 31
+        )
+        self.assertAlmostEqual(outlook.expected_disasters, 6 * 10 / 31)
+        self.assertEqual(outlook.prob_tiles[gi.INDEX_OF_RA], 1.0)
+        self.assertAlmostEqual(
+            p.prob_any_before_round_end(game_state, [gi.INDEX_OF_GOLD]),
+            outlook.prob_tiles[gi.INDEX_OF_GOLD],
+        )
+
+    def test_helpers_use_probabilities(self) -> None:
+        self.assertEqual(au.value_niles_and_flood(1, 0, 0, 0, 10, 3, 0.5), 1.75)
+        # Owning a flood already makes the chance irrelevant.
+        self.assertEqual(au.value_niles_and_flood(1, 0, 0, 1, 10, 3, 0.5), 2)
+        self.assertEqual(au.value_golden_god(1, 0, 0.25), 2.25)
+        self.assertEqual(
+            au.god_targets(
+                [0] * gi.STARTING_INDEX_OF_CIVS
+                + [1, 1, 1, 1, 0]
+                + [2, 1, 0, 0, 0, 0, 0, 0]
+            ),
+            [gi.INDEX_OF_ART, gi.INDEX_OF_FORT],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
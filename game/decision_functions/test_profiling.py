@@ -0,0 +1,80 @@
+import random
+import threading
+import unittest
+
+from game import ra
+from game import state as gs
+from game.decision_functions import oracle as o
+from game.decision_functions import profiling, session
+from game.proxy import copy
+
+
+class ProfilingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # Required since tile bags are randomly ordered is used.
+        random.seed(10)
+        o.value_state.cache.clear()
+
+    def tearDown(self) -> None:
+        profiling.disable()
+
+    def test_profile_counts_phases(self) -> None:
+        game_state = gs.GameState(["P1", "P2", "P3"])
+        metrics = o.default_metrics()
+        with profiling.profile() as search_profile:
+            self.assertIs(profiling.current(), search_profile)
+            self.assertIsNot(o._copy_state, copy.deepcopy)
+            action = o.oracle_search(game_state, 1, metrics=metrics)
+        self.assertIsNone(profiling.current())
+        # Unprofiled searches run the plain functions.
+        self.assertIs(o._copy_state, copy.deepcopy)
+        self.assertIs(o._execute, ra.execute_action_internal)
+        self.assertIs(o._hash_state, hash)
+
+        self.assertEqual(search_profile.num_searches, 1)
+        self.assertGreater(search_profile.nodes, 0)
+        self.assertGreater(search_profile.nodes_per_second, 0)
+        for phase in ["copy", "execute", "actions", "hash", "cache", "evaluate"]:
+            self.assertGreater(search_profile.calls[phase], 0, phase)
+        self.assertLessEqual(
+            sum(search_profile.seconds.values()), search_profile.total_seconds
+        )
+
+        # Profiling does not change the search itself.
+        o.value_state.cache.clear()
+        unprofiled_metrics = o.default_metrics()
+        self.assertEqual(
+            o.oracle_search(game_state, 1, metrics=unprofiled_metrics), action
+        )
+        self.assertEqual(unprofiled_metrics["numCalls"], metrics["numCalls"])
+
+    def test_background_searches_not_profiled(self) -> None:
+        game_state = gs.GameState(["P1", "P2"])
+        with profiling.profile() as search_profile:
+            with session.cancellable(threading.Event()):
+                o.oracle_search(game_state, 1)
+        self.assertEqual(search_profile.num_searches, 0)
+        self.assertEqual(sum(search_profile.calls.values()), 0)
+        # oracle keeps its modules while profiling.
+        self.assertIs(o.copy, copy)
+        self.assertIs(o.ra, ra)
+        self.assertIsNone(profiling.disable())
+
+    def test_merge_and_json(self) -> None:
+        first, second = profiling.SearchProfile(), profiling.SearchProfile()
+        first.seconds["copy"], first.calls["execute"] = 1.0, 10
+        second.seconds["copy"], second.calls["execute"] = 2.0, 5
+        first.total_seconds, second.total_seconds = 2.0, 4.0
+        first.num_searches, second.num_searches = 1, 1
+
+        data = first.merge(second).to_json()
+        self.assertEqual(data["numSearches"], 2)
+        self.assertEqual(data["nodes"], 15)
+        self.assertAlmostEqual(data["nodesPerSecond"], 2.5)
+        self.assertAlmostEqual(data["phases"]["copy"]["percent"], 50.0)
+        self.assertEqual(list(data["phases"]), profiling.PHASES)
+        self.assertIn("nodes/s", first.format())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from game import info as gi
+from game.decision_functions import search_regression as sr
+
+# Wall times depend on the machine, so only node counts and actions are checked.
+_IGNORE_TIME = sr.Tolerances(seconds=float("inf"))
+
+
+class SearchRegressionTest(unittest.TestCase):
+    def test_corpus_has_not_regressed(self) -> None:
+        expected = sr.load_expected()
+        self.assertGreaterEqual(len(expected), 4)
+        for name in expected:
+            self.assertTrue(os.path.exists(os.path.join(sr.CORPUS_DIR, name)), name)
+        lines = sr.check(tolerances=_IGNORE_TIME)
+        self.assertEqual(len(lines), len(expected))
+        self.assertFalse([line for line in lines if "REGRESSED" in line])
+
+    def test_add_and_check(self) -> None:
+        with tempfile.TemporaryDirectory() as corpus_dir:
+            recorded = sr.add("game.txt", 3, 4, 6, 1, corpus_dir=corpus_dir)
+            game_state = sr.load_position(os.path.join(corpus_dir, "game.txt"))
+            self.assertEqual(game_state.get_num_players(), 3)
+            measured = sr.measure(game_state, 1)
+            self.assertEqual(measured["numCalls"], recorded["numCalls"])
+            self.assertNotIn("REGRESSED", sr.check(corpus_dir, _IGNORE_TIME)[0])
+
+            sr.write_expected(
+                {"game.txt": {**recorded, "numCalls": recorded["numCalls"] // 2}},
+                corpus_dir,
+            )
+            self.assertIn("REGRESSED", sr.check(corpus_dir, _IGNORE_TIME)[0])
+
+    def test_compare(self) -> None:
+        expected = sr.Expected(
+            numAuctions=1,
+            bestAction=gi.DRAW,
+            numCalls=1000,
+            cacheHit=100,
+            maxDepth=10,
+            seconds=1.0,
+        )
+        self.assertEqual(sr.compare(expected, expected), [])
+        self.assertEqual(sr.compare(expected, {**expected, "numCalls": 1040}), [])
+        self.assertEqual(len(sr.compare(expected, {**expected, "numCalls": 1100})), 1)
+        self.assertEqual(len(sr.compare(expected, {**expected, "seconds": 2.0})), 1)
+        self.assertEqual(
+            len(sr.compare(expected, {**expected, "bestAction": gi.AUCTION})), 1
+        )
+        # Tiny searches are never flagged for wall time.
+        fast = {**expected, "seconds": 0.001}
+        self.assertEqual(sr.compare(fast, {**fast, "seconds": 0.01}), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import random
+import unittest
+from unittest import mock
+
+from game import ra
+from game import state as gs
+from game.decision_functions import oracle as o
+from game.decision_functions import session
+from game.proxy import copy
+
+
+class SessionTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # Required since tile bags are randomly ordered is used.
+        random.seed(10)
+
+    def test_get_and_release(self) -> None:
+        first = session.get("first")
+        self.assertIs(session.get("first"), first)
+        session.release("first")
+        session.release("first")
+        self.assertIsNot(session.get("first"), first)
+        session.release("first")
+
+    def test_eviction(self) -> None:
+        with mock.patch.object(session, "MAX_SESSIONS", 2):
+            first = session.get("first")
+            session.get("second")
+            # Using the first session makes the second the least recently used.
+            self.assertIs(session.get("first"), first)
+            session.get("third")
+            self.assertEqual(session.num_sessions(), 2)
+            self.assertIs(session.get("first"), first)
+            for session_id in ["first", "second", "third"]:
+                session.release(session_id)
+
+    def test_eviction_by_memory(self) -> None:
+        first = session.get("first")
+        self.assertEqual(first.table.max_slots, session.SESSION_MAX_SLOTS)
+        with mock.patch.object(session, "MAX_SESSION_BYTES", 2 * first.table.nbytes()):
+            session.get("second")
+            self.assertEqual(session.num_sessions(), 2)
+            session.get("third")
+            self.assertEqual(session.num_sessions(), 2)
+            self.assertIsNone(session.find("first"))
+            self.assertLessEqual(session.table_bytes(), session.MAX_SESSION_BYTES)
+        for session_id in ["second", "third"]:
+            session.release(session_id)
+
+    def test_activate(self) -> None:
+        self.assertIsNone(session.current())
+        search_session = session.SearchSession("game")
+        with session.activate(search_session):
+            self.assertIs(session.current(), search_session)
+        self.assertIsNone(session.current())
+
+    def test_search_uses_session_table(self) -> None:
+        game_state = gs.GameState(["P1", "P2"])
+        o.value_state.cache.clear()
+        search_session = session.SearchSession("game")
+        with session.activate(search_session):
+            action = o.oracle_search(game_state, num_auctions_allowed=1)
+        self.assertEqual(len(o.value_state.cache), 0)
+        self.assertGreater(len(search_session.table), 0)
+        self.assertEqual(search_session.principal_variation[0], action)
+
+        # The principal variation is a line of legal actions.
+        pv_state = copy.deepcopy(game_state)
+        for pv_action in search_session.principal_variation:
+            legal_actions = ra.get_possible_actions(pv_state)
+            assert legal_actions is not None
+            self.assertIn(pv_action, legal_actions)
+            ra.execute_action_internal(pv_state, pv_action)
+
+        # A second search is answered by the session table.
+        with session.activate(search_session):
+            num_entries = len(search_session.table)
+            self.assertEqual(
+                o.oracle_search(game_state, num_auctions_allowed=1), action
+            )
+            self.assertEqual(len(search_session.table), num_entries)
@@ -0,0 +1,55 @@
+import unittest
+
+from game.decision_functions import tournament as t
+
+
+class TournamentTest(unittest.TestCase):
+    def test_schedule(self) -> None:
+        matches = t.schedule(["random", "first_move"], [2, 3], num_games=4, seed=1)
+        self.assertEqual(len(matches), 8)
+        self.assertEqual(matches[0].ais, ("random", "first_move"))
+        self.assertEqual(matches[1].ais, ("first_move", "random"))
+        self.assertEqual(matches[4].ais, ("random", "first_move", "random"))
+        self.assertEqual(len({match.seed for match in matches}), 8)
+        with self.assertRaises(ValueError):
+            t.schedule(["not_an_ai"], [2], num_games=1)
+
+    def test_play_match_is_deterministic(self) -> None:
+        match = t.Match(ais=("random", "heuristic_ai", "first_move"), seed=3)
+        result = t.play_match(match)
+        self.assertIsNone(result.error)
+        self.assertEqual(len(result.scores), 3)
+        self.assertEqual(
+            sum(len(times) for times in result.think_times), result.num_moves
+        )
+        self.assertEqual(t.play_match(match).scores, result.scores)
+
+    def test_run_tournament_and_summarize(self) -> None:
+        matches = t.schedule(["heuristic_ai", "random"], [2], num_games=6)
+        results = t.run_tournament(matches, max_workers=2)
+        self.assertEqual([result.match for result in results], matches)
+        self.assertEqual(
+            [result.scores for result in results],
+            [result.scores for result in t.run_tournament(matches, max_workers=1)],
+        )
+
+        stats = {stat.name: stat for stat in t.summarize(results)}
+        self.assertEqual(set(stats), {"heuristic_ai", "random"})
+        finished = sum(1 for result in results if result.error is None)
+        self.assertAlmostEqual(sum(stat.wins for stat in stats.values()), finished)
+        for stat in stats.values():
+            self.assertEqual(stat.num_games, finished)
+            self.assertEqual(len(stat.think_ms), len(t.PERCENTILES))
+            self.assertEqual(list(stat.think_ms), sorted(stat.think_ms))
+        self.assertIn("games/s", t.format_report(results, 1.0))
+
+    def test_percentile(self) -> None:
+        values = [float(value) for value in range(1, 101)]
+        self.assertEqual(t.percentile(values, 50), 50.0)
+        self.assertEqual(t.percentile(values, 99), 99.0)
+        self.assertEqual(t.percentile([3.0], 90), 3.0)
+        self.assertEqual(t.percentile([], 50), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import random
+import tempfile
+import unittest
+
+from game import replay
+from game.decision_functions import training_data as td
+from game.decision_functions import value_model as vm
+from game.test_replay import write_history
+
+
+class TrainingDataTest(unittest.TestCase):
+    def test_export_and_load(self) -> None:
+        records = list(td.self_play(6, player_counts=[2, 5], seed=3))
+        num_rows = sum(len(record.actions) for record in records)
+        for compress in [True, False]:
+            with tempfile.TemporaryDirectory() as outdir:
+                writer = td.export(records, outdir, shard_size=100, compress=compress)
+                self.assertEqual(writer.num_rows, num_rows)
+                self.assertEqual(writer.num_shards, (num_rows + 99) // 100)
+
+                shards = list(td.load_shards(outdir))
+                self.assertEqual(len(shards), writer.num_shards)
+                self.assertEqual(shards[0]["features"].shape, (100, 5, vm.NUM_FEATURES))
+                self.assertEqual(shards[0]["finalScores"].shape, (100, 5))
+                actions = [a for shard in shards for a in shard["action"].tolist()]
+                games = [g for shard in shards for g in shard["game"].tolist()]
+                self.assertEqual(
+                    actions, [action for record in records for action in record.actions]
+                )
+                self.assertEqual(games, sorted(games))
+
+                first = shards[0]
+                record = records[0]
+                self.assertEqual(first["numPlayers"][0], record.num_players)
+                self.assertEqual(first["currentPlayer"][0], record.current_players[0])
+                self.assertEqual(
+                    first["finalScores"].tolist()[0],
+                    record.final_scores + [0.0] * (5 - record.num_players),
+                )
+                features = first["features"].tolist()[0]
+                self.assertEqual(features[: record.num_players], record.features[0])
+                self.assertEqual(
+                    features[record.num_players :],
+                    [[0.0] * vm.NUM_FEATURES] * (5 - record.num_players),
+                )
+
+    def test_self_play_from_seed(self) -> None:
+        state = random.getstate()
+        records = list(td.self_play(2, seed=4))
+        self.assertEqual(random.getstate(), state)
+        self.assertEqual(
+            [record.actions for record in td.self_play(2, seed=4)],
+            [record.actions for record in records],
+        )
+
+    def test_history_games(self) -> None:
+        with tempfile.TemporaryDirectory() as histories:
+            actions = write_history(os.path.join(histories, "good.txt"), seed=5)
+            with open(os.path.join(histories, "bad.txt"), "w") as f:
+                f.write("P1 P2\n1 2 3\nsuns 2,5,6,9 3,4,7,8\n0 2\n99\n")
+            with open(os.path.join(histories, "unfinished.txt"), "w") as f:
+                f.write("P1 P2\n1 2 3\nsuns 2,5,6,9 3,4,7,8\n")
+            with open(os.path.join(histories, "good.txt")) as f:
+                lines = f.readlines()
+            with open(os.path.join(histories, "undealt.txt"), "w") as f:
+                f.writelines(lines[:2] + lines[3:])
+
+            paths = replay.find_histories([histories])
+            self.assertEqual(len(paths), 4)
+            with self.assertLogs("uvicorn.info", level="WARNING") as logs:
+                records = list(td.history_games(paths))
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn("undealt.txt: the starting suns are not recorded", logs.output[1])
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0].actions, actions)
+        self.assertEqual(records[0].num_players, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
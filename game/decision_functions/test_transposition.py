@@ -0,0 +1,84 @@
+import unittest
+
+from game.decision_functions import transposition as tt
+
+
+class TranspositionTableTest(unittest.TestCase):
+    def test_store_and_probe(self) -> None:
+        table = tt.TranspositionTable()
+        self.assertIsNone(table.probe(12345))
+        self.assertNotIn(12345, table)
+        stored = table.store(12345, [1.5, -2.0, 30.25])
+        self.assertEqual(stored, (1.5, -2.0, 30.25, 0.0, 0.0))
+        self.assertEqual(table.probe(12345), stored)
+        self.assertIn(12345, table)
+        self.assertEqual(len(table), 1)
+
+        # Overwriting does not add an entry.
+        table.store(12345, [4.0, 5.0])
+        self.assertEqual(table.probe(12345), (4.0, 5.0, 0.0, 0.0, 0.0))
+        self.assertEqual(len(table), 1)
+
+    def test_values_are_rounded_to_float16(self) -> None:
+        table = tt.TranspositionTable()
+        stored = table.store(1, [0.1, 1000.3])
+        self.assertAlmostEqual(stored[0], 0.1, places=3)
+        self.assertAlmostEqual(stored[1], 1000.3, delta=0.5)
+        self.assertEqual(table.probe(1), stored)
+
+    def test_negative_and_zero_keys(self) -> None:
+        table = tt.TranspositionTable()
+        for key in [0, -1, -(1 << 62), hash(("state", 3))]:
+            table.store(key, [float(len(table))])
+        self.assertEqual(len(table), 4)
+        self.assertEqual(table.probe(0), (0.0, 0.0, 0.0, 0.0, 0.0))
+        self.assertEqual(table.probe(-1), (1.0, 0.0, 0.0, 0.0, 0.0))
+
+    def test_grows_until_max_slots(self) -> None:
+        table = tt.TranspositionTable(max_slots=1 << 14)
+        initial_nbytes = table.nbytes()
+        for key in range(5000):
+            table.store(key * 7919, [float(key % 100)])
+        self.assertEqual(len(table), 5000)
+        self.assertGreater(table.nbytes(), initial_nbytes)
+        for key in range(5000):
+            self.assertEqual(table.probe(key * 7919)[0], float(key % 100))
+
+    def test_replaces_entries_once_full(self) -> None:
+        table = tt.TranspositionTable(max_slots=16)
+        nbytes = table.nbytes()
+        for key in range(100):
+            table.store(key, [float(key)])
+        self.assertLessEqual(len(table), 16)
+        self.assertEqual(table.nbytes(), nbytes)
+        # The latest entry always makes it in.
+        self.assertEqual(table.probe(99)[0], 99.0)
+
+    def test_replacement_prefers_old_and_shallow_entries(self) -> None:
+        table = tt.TranspositionTable(max_slots=tt.MAX_PROBES)
+        for key in range(1, tt.MAX_PROBES + 1):
+            table.store(key, [1.0], draft=0 if key == 3 else 2)
+        table.store(100, [2.0], draft=2)
+        self.assertNotIn(3, table)
+        self.assertIn(100, table)
+
+        table.new_search()
+        table.store(5, [3.0], draft=2)
+        table.store(200, [4.0], draft=0)
+        # Entries stored by the earlier search go first, whatever their draft.
+        self.assertIn(5, table)
+        self.assertIn(200, table)
+        self.assertEqual(len(table), tt.MAX_PROBES)
+
+    def test_clear(self) -> None:
+        table = tt.TranspositionTable()
+        for key in range(2000):
+            table.store(key, [1.0])
+        table.clear()
+        self.assertEqual(len(table), 0)
+        self.assertNotIn(5, table)
+        self.assertEqual(table.nbytes(), tt.TranspositionTable().nbytes())
+
+
+if __name__ == "__main__":
+    unittest.main()
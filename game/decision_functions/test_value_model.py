@@ -0,0 +1,116 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+from game import info as gi
+from game import state as gs
+from game.decision_functions import evaluate_game_state as e
+from game.decision_functions import oracle as o
+from game.decision_functions import value_model as vm
+
+
+class ValueModelTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # Required since tile bags are randomly ordered is used.
+        random.seed(10)
+
+    def test_extract_features(self) -> None:
+        game_state = gs.GameState(["P1", "P2", "P3"])
+        game_state.player_states[1].add_tiles([gi.INDEX_OF_GOLD])
+        features = vm.extract_features(game_state)
+        self.assertEqual(len(features), 3)
+        for player_features in features:
+            self.assertEqual(len(player_features), vm.NUM_FEATURES)
+        self.assertEqual(len(set(vm.FEATURE_NAMES)), vm.NUM_FEATURES)
+        gold_feature = vm.FEATURE_NAMES.index("count Gold")
+        self.assertEqual([f[gold_feature] for f in features], [0.0, 1.0, 0.0])
+
+    def test_solve(self) -> None:
+        self.assertEqual(
+            vm._solve([[0.0, 2.0], [4.0, 0.0]], [2.0, 8.0]),
+            [2.0, 1.0],
+        )
+        with self.assertRaises(ValueError):
+            vm._solve([[1.0, 2.0], [2.0, 4.0]], [1.0, 2.0])
+
+    def test_fit_recovers_linear_targets(self) -> None:
+        rng = random.Random(0)
+        true_weights = [rng.uniform(-2, 2) for _ in range(vm.NUM_FEATURES)]
+        samples = []
+        for _ in range(200):
+            features = [1.0] + [rng.uniform(0, 5) for _ in range(vm.NUM_FEATURES - 1)]
+            samples.append(
+                (features, sum(w * x for w, x in zip(true_weights, features)))
+            )
+        model = vm.fit(samples, l2=0.0)
+        for weight, true_weight in zip(model.weights, true_weights):
+            self.assertAlmostEqual(weight, true_weight, places=6)
+        self.assertAlmostEqual(vm.rmse(model, samples), 0.0, places=6)
+
+    def test_generate_samples_from_seed(self) -> None:
+        random_state = random.getstate()
+        samples = vm.generate_samples(2, player_counts=[2, 3], seed=5)
+        # The caller's random state is left alone.
+        self.assertEqual(random.getstate(), random_state)
+        random.seed(20)
+        self.assertEqual(vm.generate_samples(2, player_counts=[2, 3], seed=5), samples)
+
+    def test_train_save_and_load(self) -> None:
+        samples = vm.generate_samples(4, player_counts=[2, 3], seed=0)
+        self.assertGreater(len(samples), 0)
+        model = vm.fit(samples)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "model.json")
+            model.save(path)
+            self.assertEqual(vm.LinearValueModel.load(path).weights, model.weights)
+
+    def test_evaluate_batch(self) -> None:
+        model = vm.fit(vm.generate_samples(2, player_counts=[2, 3], seed=1))
+        game_states = [gs.GameState(["P1", "P2"]), gs.GameState(["P1", "P2", "P3"])]
+        game_states[1].player_states[2].add_tiles([gi.INDEX_OF_GOLD])
+        self.assertEqual(
+            model.evaluate_batch(game_states),
+            [model.evaluate(game_state) for game_state in game_states],
+        )
+        features = vm.extract_features(game_states[1])
+        self.assertEqual(
+            model.evaluate(game_states[1]),
+            {idx: model.predict(row) for idx, row in enumerate(features)},
+        )
+
+        # Loading VALUE_MODEL_PATH installs both paths in the oracle.
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "model.json")
+            model.save(path)
+            o.set_evaluator(None)
+            try:
+                with mock.patch.dict(os.environ, {"VALUE_MODEL_PATH": path}):
+                    evaluator = o.get_evaluator()
+                    batch_evaluator = o.get_batch_evaluator()
+            finally:
+                o.set_evaluator(None)
+        self.assertEqual(evaluator(game_states[0]), model.evaluate(game_states[0]))
+        self.assertEqual(
+            batch_evaluator(game_states), model.evaluate_batch(game_states)
+        )
+
+    def test_oracle_evaluator(self) -> None:
+        self.assertIs(o.get_evaluator(), e.evaluate_game_state_no_auction_tiles)
+        calls = []
+
+        def evaluator(game_state: gs.GameState) -> dict[int, float]:
+            calls.append(game_state)
+            return {idx: 0.0 for idx in range(game_state.get_num_players())}
+
+        o.set_evaluator(evaluator)
+        try:
+            o.value_state.cache.clear()
+            o.oracle_search(gs.GameState(["P1", "P2"]), num_auctions_allowed=1)
+        finally:
+            o.set_evaluator(None)
+            o.value_state.cache.clear()
+        self.assertGreater(len(calls), 0)
+        self.assertIs(o.get_evaluator(), e.evaluate_game_state_no_auction_tiles)
@@ -0,0 +1,238 @@
+"""
+Headless self-play tournaments between decision functions.
+
+Games are played without printing or move-history files, spread over a process
+pool, and summarized into win rates, score margins and think times. Use it to check
+that an AI got faster without getting weaker, eg.:
+
+    python -m game.decision_functions.tournament --ais heuristic_ai random -g 200
+"""
+import argparse
+import math
+import os
+import random
+import time
+from concurrent import futures
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from game import decision_functions as df
+from game import info as gi
+from game import ra
+from game import state as gs
+
+TDecisionFunction = Callable[[gs.GameState], int]
+
+# Think time percentiles reported for every decision function.
+PERCENTILES: Tuple[int, ...] = (50, 90, 99)
+
+
+class Match(NamedTuple):
+    """A single game to play."""
+
+    # The name of the decision function in each seat, in play order.
+    ais: Tuple[str, ...]
+    # Seeds the draw order, the starting suns and any randomness of the AIs.
+    seed: int
+
+
+class MatchResult(NamedTuple):
+    match: Match
+    # Final points of each seat. Empty if the game did not finish.
+    scores: Tuple[int, ...]
+    # Seconds each move took, by seat.
+    think_times: Tuple[Tuple[float, ...], ...]
+    num_moves: int
+    # Set if the game raised instead of finishing.
+    error: Optional[str]
+
+
+class AIStats(NamedTuple):
+    name: str
+    # Finished games, counted once per seat the AI held.
+    num_games: int
+    # Wins are shared between the players tied for the most points.
+    wins: float
+    win_rate: float
+    # Average points ahead of (or behind, if negative) the best other player.
+    mean_margin: float
+    # Milliseconds per move at each of PERCENTILES.
+    think_ms: Tuple[float, ...]
+    num_moves: int
+
+
+def decision_function(name: str) -> TDecisionFunction:
+    if name not in df.__all__:
+        raise ValueError(f"Unknown decision function '{name}'. Options: {df.__all__}")
+    return getattr(df, name)
+
+
+def schedule(
+    ais: Sequence[str], player_counts: Sequence[int], num_games: int, seed: int = 0
+) -> List[Match]:
+    """Schedules num_games games per player count.
+
+    Seats rotate through the AIs, so each of them plays every seat equally often
+    when num_games is a multiple of the number of AIs.
+    """
+    assert ais, "Cannot schedule a tournament without AIs"
+    for name in ais:
+        decision_function(name)
+    matches = []
+    for num_players in player_counts:
+        assert gi.MIN_NUM_PLAYERS <= num_players <= gi.MAX_NUM_PLAYERS
+        for game in range(num_games):
+            matches.append(
+                Match(
+                    ais=tuple(
+                        ais[(game + seat) % len(ais)] for seat in range(num_players)
+                    ),
+                    seed=seed * 1_000_003 + num_players * 100_003 + game,
+                )
+            )
+    return matches
+
+
+def play_match(match: Match) -> MatchResult:
+    """Plays a game to the end. Safe to run in a worker process."""
+    # GameState and some AIs draw from the global random module.
+    random.seed(match.seed)
+    functions = [decision_function(name) for name in match.ais]
+    game_state = gs.new_game(
+        [f"{name} ({seat})" for seat, name in enumerate(match.ais)]
+    )
+    think_times: List[List[float]] = [[] for _ in match.ais]
+    num_moves = 0
+    try:
+        while not game_state.is_game_ended():
+            legal_actions = ra.get_possible_actions(game_state)
+            assert legal_actions, "Game has not ended."
+            seat = game_state.get_current_player()
+            start_time = time.perf_counter()
+            action = functions[seat](game_state)
+            think_times[seat].append(time.perf_counter() - start_time)
+            ra.execute_action_internal(game_state, action, legal_actions)
+            num_moves += 1
+    except Exception as e:
+        return MatchResult(
+            match, (), tuple(map(tuple, think_times)), num_moves, repr(e)
+        )
+    return MatchResult(
+        match,
+        tuple(
+            player_state.get_player_points()
+            for player_state in game_state.player_states
+        ),
+        tuple(map(tuple, think_times)),
+        num_moves,
+        None,
+    )
+
+
+def run_tournament(
+    matches: Sequence[Match], max_workers: Optional[int] = None
+) -> List[MatchResult]:
+    """Plays every match, in worker processes unless max_workers is 1."""
+    if max_workers == 1:
+        return [play_match(match) for match in matches]
+    max_workers = max_workers or os.cpu_count() or 1
+    with futures.ProcessPoolExecutor(max_workers=max_workers) as pool:
+        chunksize = max(1, len(matches) // (4 * max_workers))
+        return list(pool.map(play_match, matches, chunksize=chunksize))
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile. Zero for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize(results: Sequence[MatchResult]) -> List[AIStats]:
+    """Aggregates the finished games by decision function, best win rate first."""
+    games: Dict[str, int] = {}
+    wins: Dict[str, float] = {}
+    margins: Dict[str, List[int]] = {}
+    think_times: Dict[str, List[float]] = {}
+    for result in results:
+        for seat, name in enumerate(result.match.ais):
+            think_times.setdefault(name, []).extend(result.think_times[seat])
+        if result.error is not None:
+            continue
+        best = max(result.scores)
+        winners = [seat for seat, score in enumerate(result.scores) if score == best]
+        for seat, name in enumerate(result.match.ais):
+            games[name] = games.get(name, 0) + 1
+            wins[name] = wins.get(name, 0.0) + (
+                1 / len(winners) if seat in winners else 0.0
+            )
+            others = result.scores[:seat] + result.scores[seat + 1 :]
+            margins.setdefault(name, []).append(result.scores[seat] - max(others))
+
+    stats = [
+        AIStats(
+            name=name,
+            num_games=games.get(name, 0),
+            wins=wins.get(name, 0.0),
+            win_rate=wins.get(name, 0.0) / max(1, games.get(name, 0)),
+            mean_margin=sum(margins.get(name, [])) / max(1, games.get(name, 0)),
+            think_ms=tuple(1000 * percentile(times, pct) for pct in PERCENTILES),
+            num_moves=len(times),
+        )
+        for name, times in think_times.items()
+    ]
+    return sorted(stats, key=lambda stat: stat.win_rate, reverse=True)
+
+
+def format_report(results: Sequence[MatchResult], elapsed: float) -> str:
+    num_errors = sum(1 for result in results if result.error is not None)
+    lines = [
+        f"{len(results)} games in {elapsed:.1f}s "
+        f"({len(results) / max(elapsed, 1e-9):.2f} games/s), {num_errors} errored.",
+        f"{'AI':<16}{'games':>7}{'wins':>8}{'win %':>8}{'margin':>9}"
+        + "".join(f"{f'p{pct} ms':>10}" for pct in PERCENTILES),
+    ]
+    for stat in summarize(results):
+        lines.append(
+            f"{stat.name:<16}{stat.num_games:>7}{stat.wins:>8.1f}"
+            f"{100 * stat.win_rate:>8.1f}{stat.mean_margin:>9.1f}"
+            + "".join(f"{ms:>10.2f}" for ms in stat.think_ms)
+        )
+    errors = sorted({result.error for result in results if result.error is not None})
+    lines += [f"Error: {error}" for error in errors]
+    return "\n".join(lines)
+
+
+def get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Runs a Ra self-play tournament.")
+    parser.add_argument(
+        "--ais",
+        nargs="+",
+        default=["heuristic_ai", "random"],
+        choices=df.__all__,
+        help="Decision functions to play, seated in rotation.",
+    )
+    parser.add_argument(
+        "--num_players",
+        "-n",
+        type=int,
+        nargs="+",
+        default=[2],
+        help="Player counts to play.",
+    )
+    parser.add_argument(
+        "--games", "-g", type=int, default=100, help="Games per player count."
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seeds every game.")
+    parser.add_argument(
+        "--workers", "-w", type=int, default=None, help="Number of worker processes."
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args: argparse.Namespace = get_args()
+    matches = schedule(args.ais, args.num_players, args.games, args.seed)
+    start_time = time.time()
+    results = run_tournament(matches, args.workers)
+    print(format_report(results, time.time() - start_time))
@@ -0,0 +1,45 @@
+"""
+Offline tool that trains the leaf value model from self-play games.
+
+See value_model.py for the model and how the oracle loads it.
+"""
+import argparse
+import random
+
+from game import info as gi
+from game.decision_functions import value_model as vm
+
+
+def get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Trains the Ra leaf value model.")
+    parser.add_argument(
+        "--outfile", "-o", default="value_model.json", help="Where to write the model."
+    )
+    parser.add_argument(
+        "--games", "-g", type=int, default=1000, help="Number of self-play games."
+    )
+    parser.add_argument(
+        "--num_players",
+        "-n",
+        type=int,
+        nargs="+",
+        default=sorted(gi.STARTING_SUN.keys()),
+        help="Player counts to play.",
+    )
+    parser.add_argument(
+        "--l2", type=float, default=1.0, help="Strength of the ridge penalty."
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Seeds self-play.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args: argparse.Namespace = get_args()
+    samples = vm.generate_samples(args.games, args.num_players, args.seed)
+    random.Random(args.seed).shuffle(samples)
+    num_validation = len(samples) // 10
+    model = vm.fit(samples[num_validation:], args.l2)
+    print(f"Trained on {len(samples) - num_validation} samples.")
+    print(f"Validation RMSE: {vm.rmse(model, samples[:num_validation]):.2f} points")
+    model.save(args.outfile)
+    print(f"Wrote model to {args.outfile}")
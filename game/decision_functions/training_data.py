@@ -0,0 +1,335 @@
+"""
+Exports training data for evaluators as sharded .npz files.
+
+Every move of a game becomes one row: the value_model features of every player in
+the state the move was taken from, the action taken and the final score of every
+player. Games are streamed either from self-play or from move histories, and rows
+are written a shard at a time, so memory stays bounded by the shard size whatever
+the size of the dataset:
+
+    python -m game.decision_functions.training_data -o data --games 100000
+    python -m game.decision_functions.training_data -o data --histories "dir/*.txt"
+
+NumPy is not a dependency of the game, so shards are written by hand in the
+standard .npy/.npz layout, which np.load reads as is. load_shard reads them
+without NumPy, memory-mapping the arrays of shards written with compress=False.
+"""
+import argparse
+import array
+import ast
+import glob
+import logging
+import mmap
+import os
+import random
+import struct
+import sys
+import zipfile
+from typing import (
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from game import info as gi
+from game import ra, replay
+from game import state as gs
+from game.decision_functions import value_model as vm
+
+logger: logging.Logger = logging.getLogger("uvicorn.info")
+
+DEFAULT_SHARD_SIZE: int = 1 << 16
+SHARD_PATTERN: str = "shard-{:05d}.npz"
+
+# The arrays of a shard: the typecode and shape of each row. Players beyond the
+# player count of a game are zero.
+COLUMNS: Dict[str, Tuple[str, Tuple[int, ...]]] = {
+    "features": ("f", (gi.MAX_NUM_PLAYERS, vm.NUM_FEATURES)),
+    "action": ("b", ()),
+    "currentPlayer": ("b", ()),
+    "numPlayers": ("b", ()),
+    "finalScores": ("f", (gi.MAX_NUM_PLAYERS,)),
+    # Rows of the same game share its index, counted over the whole export.
+    "game": ("i", ()),
+}
+_DTYPES: Dict[str, str] = {"f": "<f4", "b": "|i1", "i": "<i4"}
+_NPY_MAGIC: bytes = b"\x93NUMPY\x01\x00"
+# Headers are padded so that array data is aligned, like NumPy does.
+_NPY_ALIGNMENT: int = 64
+_ZIP_LOCAL_HEADER: struct.Struct = struct.Struct("<4s5H3I2H")
+
+
+class GameRecord(NamedTuple):
+    num_players: int
+    # For every move, the features of every player before the move.
+    features: List[List[List[float]]]
+    current_players: List[int]
+    actions: List[int]
+    final_scores: List[float]
+
+
+def record_game(moves: Iterable[replay.TMove]) -> Optional[GameRecord]:
+    """Records a game from its moves, or None if it did not end.
+
+    Every move is the game state before the action and the action, which must be
+    executed on that same state before the next move is produced.
+    """
+    features, current_players, actions = [], [], []
+    game_state = None
+    for game_state, action in moves:
+        features.append(vm.extract_features(game_state))
+        current_players.append(game_state.get_current_player())
+        actions.append(action)
+    if game_state is None or not game_state.is_game_ended():
+        return None
+    return GameRecord(
+        num_players=game_state.get_num_players(),
+        features=features,
+        current_players=current_players,
+        actions=actions,
+        final_scores=[
+            float(player_state.get_player_points())
+            for player_state in game_state.player_states
+        ],
+    )
+
+
+def _play(
+    game_state: gs.GameState, policy: vm.TPolicy, rng: random.Random
+) -> Iterator[replay.TMove]:
+    while not game_state.is_game_ended():
+        action = policy(game_state, rng)
+        yield game_state, action
+        ra.execute_action_internal(game_state, action)
+
+
+def self_play(
+    num_games: int,
+    player_counts: Sequence[int] = tuple(sorted(gi.STARTING_SUN)),
+    seed: Optional[int] = None,
+    policy: vm.TPolicy = vm.random_policy,
+) -> Iterator[GameRecord]:
+    """Plays games with the policy, cycling through the player counts."""
+    rng = random.Random(seed)
+    for game in range(num_games):
+        num_players = player_counts[game % len(player_counts)]
+        game_state = gs.new_game([f"P{idx + 1}" for idx in range(num_players)], rng)
+        try:
+            record = record_game(_play(game_state, policy, rng))
+        except AssertionError:
+            # Random play occasionally trips an engine assertion. Move on.
+            continue
+        if record is not None:
+            yield record
+
+
+def history_games(paths: Iterable[str]) -> Iterator[GameRecord]:
+    """Replays the finished games among the move-history files, skipping the
+    files that cannot be replayed.
+
+    Files that do not record the starting suns are skipped too, since their final
+    scores under an assumed deal would make wrong labels.
+    """
+    for path in paths:
+        try:
+            history = replay.load_history(path)
+            if history.starting_suns is None:
+                raise ValueError("the starting suns are not recorded")
+            record = record_game(replay.replay_history(history))
+        except (AssertionError, ValueError) as err:
+            logger.warning(f"Skipping {path}: {err}")
+            continue
+        if record is not None:
+            yield record
+
+
+def _npy_header(typecode: str, shape: Tuple[int, ...]) -> bytes:
+    header = (
+        f"{{'descr': '{_DTYPES[typecode]}', 'fortran_order': False, "
+        f"'shape': {shape}, }}"
+    )
+    padding = -(len(_NPY_MAGIC) + 2 + len(header) + 1) % _NPY_ALIGNMENT
+    header += " " * padding + "\n"
+    return _NPY_MAGIC + struct.pack("<H", len(header)) + header.encode("latin1")
+
+
+def _parse_npy_header(data: memoryview) -> Tuple[str, Tuple[int, ...], int]:
+    """Returns the typecode, shape and data offset of a .npy file written here."""
+    assert data[: len(_NPY_MAGIC)] == _NPY_MAGIC, "Not a version 1.0 .npy file"
+    (header_length,) = struct.unpack_from("<H", data, len(_NPY_MAGIC))
+    offset = len(_NPY_MAGIC) + 2
+    header = ast.literal_eval(
+        bytes(data[offset : offset + header_length]).decode("latin1")
+    )
+    typecodes = {dtype: typecode for typecode, dtype in _DTYPES.items()}
+    return typecodes[header["descr"]], header["shape"], offset + header_length
+
+
+class ShardWriter:
+    """Buffers rows and writes them out as shards of shard_size rows."""
+
+    __slots__ = ("outdir", "shard_size", "compress", "num_shards", "num_rows", "_rows")
+
+    def __init__(
+        self, outdir: str, shard_size: int = DEFAULT_SHARD_SIZE, compress: bool = True
+    ) -> None:
+        os.makedirs(outdir, exist_ok=True)
+        self.outdir: str = outdir
+        self.shard_size: int = shard_size
+        self.compress: bool = compress
+        self.num_shards: int = 0
+        # Rows written so far, in every shard.
+        self.num_rows: int = 0
+        self._rows: Dict[str, array.array] = {}
+        self._reset()
+
+    def _reset(self) -> None:
+        self._rows = {name: array.array(code) for name, (code, _) in COLUMNS.items()}
+
+    def _buffered(self) -> int:
+        return len(self._rows["action"])
+
+    def add_game(self, record: GameRecord, game_index: int) -> None:
+        padding = [0.0] * vm.NUM_FEATURES
+        final_scores = record.final_scores + [0.0] * (
+            gi.MAX_NUM_PLAYERS - record.num_players
+        )
+        for features, current_player, action in zip(
+            record.features, record.current_players, record.actions
+        ):
+            for player_features in features:
+                self._rows["features"].extend(player_features)
+            for _ in range(gi.MAX_NUM_PLAYERS - record.num_players):
+                self._rows["features"].extend(padding)
+            self._rows["action"].append(action)
+            self._rows["currentPlayer"].append(current_player)
+            self._rows["numPlayers"].append(record.num_players)
+            self._rows["finalScores"].extend(final_scores)
+            self._rows["game"].append(game_index)
+            if self._buffered() >= self.shard_size:
+                self.flush()
+
+    def flush(self) -> Optional[str]:
+        """Writes the buffered rows as a shard, returning its path."""
+        num_rows = self._buffered()
+        if num_rows == 0:
+            return None
+        path = os.path.join(self.outdir, SHARD_PATTERN.format(self.num_shards))
+        compression = zipfile.ZIP_DEFLATED if self.compress else zipfile.ZIP_STORED
+        with zipfile.ZipFile(path, "w", compression=compression) as shard:
+            for name, (typecode, row_shape) in COLUMNS.items():
+                rows = self._rows[name]
+                if sys.byteorder != "little":
+                    rows.byteswap()
+                with shard.open(f"{name}.npy", "w") as f:
+                    f.write(_npy_header(typecode, (num_rows, *row_shape)))
+                    f.write(rows.tobytes())
+        self.num_shards += 1
+        self.num_rows += num_rows
+        self._reset()
+        return path
+
+
+def export(
+    games: Iterable[GameRecord],
+    outdir: str,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    compress: bool = True,
+) -> ShardWriter:
+    """Writes the rows of every game to shards in outdir."""
+    writer = ShardWriter(outdir, shard_size, compress)
+    for game_index, record in enumerate(games):
+        writer.add_game(record, game_index)
+    writer.flush()
+    return writer
+
+
+def _stored_data_offset(f: BinaryIO, info: zipfile.ZipInfo) -> int:
+    """Where the data of an uncompressed zip member starts within the file."""
+    f.seek(info.header_offset)
+    header = _ZIP_LOCAL_HEADER.unpack(f.read(_ZIP_LOCAL_HEADER.size))
+    name_length, extra_length = header[-2:]
+    return info.header_offset + _ZIP_LOCAL_HEADER.size + name_length + extra_length
+
+
+def load_shard(path: str) -> Dict[str, memoryview]:
+    """Reads the arrays of a shard as memoryviews shaped like the arrays.
+
+    Arrays stored without compression are memory-mapped rather than read, so a
+    training loop only pages in the rows it touches.
+    """
+    arrays = {}
+    with open(path, "rb") as f, zipfile.ZipFile(f) as shard:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        for info in shard.infolist():
+            if info.compress_type == zipfile.ZIP_STORED:
+                offset = _stored_data_offset(f, info)
+                data = memoryview(mapped)[offset : offset + info.file_size]
+            else:
+                data = memoryview(shard.read(info))
+            typecode, shape, data_offset = _parse_npy_header(data)
+            assert sys.byteorder == "little", "Shards are little-endian"
+            arrays[info.filename[: -len(".npy")]] = (
+                data[data_offset:].cast("B").cast(typecode, shape)
+            )
+    return arrays
+
+
+def load_shards(outdir: str) -> Iterator[Dict[str, memoryview]]:
+    """Loads the shards of an export one at a time, in order."""
+    for path in sorted(glob.glob(os.path.join(outdir, "shard-*.npz"))):
+        yield load_shard(path)
+
+
+def get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Exports Ra positions as training data for evaluators."
+    )
+    parser.add_argument(
+        "--outdir", "-o", required=True, help="Folder to write the shards to."
+    )
+    parser.add_argument(
+        "--histories",
+        nargs="+",
+        default=None,
+        help="Folders or globs of move histories to export instead of self-play.",
+    )
+    parser.add_argument(
+        "--games", "-g", type=int, default=1000, help="Number of self-play games."
+    )
+    parser.add_argument(
+        "--num_players",
+        "-n",
+        type=int,
+        nargs="+",
+        default=sorted(gi.STARTING_SUN.keys()),
+        help="Player counts to self-play.",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Seeds self-play.")
+    parser.add_argument(
+        "--shard_size", type=int, default=DEFAULT_SHARD_SIZE, help="Rows per shard."
+    )
+    parser.add_argument(
+        "--no_compress",
+        action="store_true",
+        help="Store shards uncompressed, so they can be memory-mapped.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args: argparse.Namespace = get_args()
+    if args.histories:
+        games = history_games(replay.find_histories(args.histories))
+    else:
+        games = self_play(args.games, args.num_players, args.seed)
+    writer = export(games, args.outdir, args.shard_size, not args.no_compress)
+    print(
+        f"Wrote {writer.num_rows} rows to {writer.num_shards} shards in {args.outdir}"
+    )
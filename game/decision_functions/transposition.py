@@ -0,0 +1,163 @@
+"""
+Transposition table of the oracle search.
+
+Entries live in preallocated flat arrays instead of a dict of Python ints: 64-bit
+keys, one float16 value per player (the layout of encoding.compress), and a byte
+each for the draft and age of the entry. The table is open addressing with linear
+probing over a short window. It doubles while below max_slots; once full, new
+entries replace the stalest, shallowest entry of their window.
+
+The full 64-bit key is stored, so a colliding state is never mistaken for another
+unless their hashes are identical.
+"""
+import array
+import struct
+from typing import Optional, Sequence
+
+from game import info as gi
+
+# Values stored per entry, one per player.
+NUM_VALUES: int = gi.MAX_NUM_PLAYERS
+# Number of consecutive slots a key may occupy.
+MAX_PROBES: int = 8
+DEFAULT_MAX_SLOTS: int = 1 << 20
+_INITIAL_SLOTS: int = 1 << 10
+# The table doubles once this fraction of slots is used.
+_MAX_LOAD: float = 0.75
+
+_VALUES: struct.Struct = struct.Struct(f"<{NUM_VALUES}e")
+_KEY_MASK: int = (1 << 64) - 1
+# Keys of empty slots. A key hashing to it is stored as 1 instead.
+_EMPTY: int = 0
+_PADDING: list[tuple[float, ...]] = [(0.0,) * n for n in range(NUM_VALUES, -1, -1)]
+# The key, values, draft and age of a slot.
+BYTES_PER_SLOT: int = array.array("Q").itemsize + _VALUES.size + 2
+
+
+class TranspositionTable:
+    """Maps state hashes to the value of the state for each player."""
+
+    __slots__ = (
+        "max_slots",
+        "_keys",
+        "_values",
+        "_drafts",
+        "_ages",
+        "_mask",
+        "_num_entries",
+        "_age",
+    )
+
+    def __init__(self, max_slots: int = DEFAULT_MAX_SLOTS) -> None:
+        assert max_slots & (max_slots - 1) == 0, "max_slots must be a power of 2"
+        self.max_slots = max_slots
+        self._allocate(min(_INITIAL_SLOTS, max_slots))
+        self._age = 0
+
+    def _allocate(self, num_slots: int) -> None:
+        self._keys = array.array("Q", [_EMPTY]) * num_slots
+        self._values = bytearray(_VALUES.size * num_slots)
+        self._drafts = bytearray(num_slots)
+        self._ages = bytearray(num_slots)
+        self._mask = num_slots - 1
+        self._num_entries = 0
+
+    @staticmethod
+    def _table_key(key: int) -> int:
+        return (key & _KEY_MASK) or 1
+
+    def _find(self, key: int) -> int:
+        """The slot holding the key, or -1."""
+        keys, mask = self._keys, self._mask
+        for i in range(MAX_PROBES):
+            slot = (key + i) & mask
+            slot_key = keys[slot]
+            if slot_key == key:
+                return slot
+            if slot_key == _EMPTY:
+                return -1
+        return -1
+
+    def probe(self, key: int) -> Optional[tuple[float, ...]]:
+        """Returns the values stored for the key, padded to NUM_VALUES."""
+        slot = self._find(self._table_key(key))
+        if slot < 0:
+            return None
+        return _VALUES.unpack_from(self._values, slot * _VALUES.size)
+
+    def store(
+        self, key: int, values: Sequence[float], draft: int = 0
+    ) -> tuple[float, ...]:
+        """Stores the values of the key and returns them as probe would.
+
+        draft is how much search the values represent, eg. the number of auctions
+        searched. Deeper entries are kept over shallower ones once the table is full.
+        """
+        key = self._table_key(key)
+        slot = self._slot_for(key)
+        if self._keys[slot] == _EMPTY:
+            self._num_entries += 1
+        self._keys[slot] = key
+        self._drafts[slot] = min(max(draft, 0), 0xFF)
+        self._ages[slot] = self._age
+        offset = slot * _VALUES.size
+        _VALUES.pack_into(self._values, offset, *values, *_PADDING[len(values)])
+        return _VALUES.unpack_from(self._values, offset)
+
+    def _slot_for(self, key: int) -> int:
+        """The slot to store the key in, growing the table if needed."""
+        num_slots = self._mask + 1
+        if num_slots < self.max_slots and self._num_entries >= _MAX_LOAD * num_slots:
+            self._grow()
+        while True:
+            keys, mask = self._keys, self._mask
+            for i in range(MAX_PROBES):
+                slot = (key + i) & mask
+                if keys[slot] == key or keys[slot] == _EMPTY:
+                    return slot
+            if mask + 1 >= self.max_slots:
+                break
+            self._grow()
+
+        # Replace entries from earlier searches first, then the shallowest.
+        def cost(slot: int) -> tuple[bool, int]:
+            return self._ages[slot] == self._age, self._drafts[slot]
+
+        return min(((key + i) & self._mask for i in range(MAX_PROBES)), key=cost)
+
+    def _grow(self) -> None:
+        keys, values, drafts, ages = self._keys, self._values, self._drafts, self._ages
+        self._allocate(2 * len(keys))
+        age = self._age
+        for slot, key in enumerate(keys):
+            if key == _EMPTY:
+                continue
+            self._age = ages[slot]
+            offset = slot * _VALUES.size
+            self.store(key, _VALUES.unpack_from(values, offset), draft=drafts[slot])
+        self._age = age
+
+    def new_search(self) -> None:
+        """Marks the entries stored so far as older than those stored next."""
+        self._age = (self._age + 1) & 0xFF
+
+    def clear(self) -> None:
+        self._allocate(min(_INITIAL_SLOTS, self.max_slots))
+
+    def num_slots(self) -> int:
+        return self._mask + 1
+
+    def nbytes(self) -> int:
+        """Memory used by the arrays of the table."""
+        return (
+            self._keys.itemsize * len(self._keys)
+            + len(self._values)
+            + len(self._drafts)
+            + len(self._ages)
+        )
+
+    def __contains__(self, key: int) -> bool:
+        return self._find(self._table_key(key)) >= 0
+
+    def __len__(self) -> int:
+        return self._num_entries
@@ -0,0 +1,255 @@
+"""
+Learned value function for search leaves.
+
+The hand-tuned evaluate_game_state_no_auction_tiles is only meant to order states.
+This module fits a linear model predicting each player's final score from a fixed
+feature vector, using the outcomes of self-play games, and can stand in for the
+hand-tuned evaluator in the oracle (see oracle.set_evaluator).
+
+To train a model, run:
+
+    python -m game.decision_functions.train_value_model -o value_model.json
+
+and point the VALUE_MODEL_PATH environment variable at the result.
+"""
+import json
+import logging
+import math
+import operator
+import random
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from game import info as gi
+from game import ra
+from game import scoring_utils as scoring
+from game import state as gs
+from game.decision_functions import evaluate_game_state as e
+
+logger: logging.Logger = logging.getLogger("uvicorn.info")
+
+_VERSION: int = 1
+
+FEATURE_NAMES: List[str] = [
+    "bias",
+    "points",
+    "unrealizedPoints",
+    "roundEndPoints",
+    "gameEndPoints",
+    "usableSunValue",
+    "unusableSunValue",
+    "numUsableSun",
+    "sunTotal",
+    "isFinalRound",
+    "roundsLeft",
+    "raProgress",
+    "tilesLeft",
+] + [
+    f"count {gi.index_to_tile_name(idx)}"
+    for idx in range(gi.NUM_COLLECTIBLE_TILE_TYPES)
+]
+NUM_FEATURES: int = len(FEATURE_NAMES)
+
+# A feature vector and the final score the player reached.
+TSample = Tuple[List[float], float]
+TPolicy = Callable[[gs.GameState, random.Random], int]
+
+
+def extract_features(
+    game_state: gs.GameState, scores: Optional[scoring.PlayerScores] = None
+) -> List[List[float]]:
+    """Returns the feature vector of every player, ordered by player index.
+
+    scores, if given, must be the scores of the players of the game state.
+    """
+    num_players = game_state.get_num_players()
+    is_final_round = game_state.is_final_round()
+    if scores is None:
+        scores = scoring.score_players(game_state.player_states, is_final_round)
+    rounds_left = float(game_state.get_total_rounds() - game_state.get_current_round())
+    ra_progress = game_state.get_current_num_ras() / game_state.get_num_ras_per_round()
+    tiles_left = game_state.get_num_tiles_left() / gi.STARTING_NUM_TILES
+    features = []
+    for idx, player_state in enumerate(game_state.player_states):
+        features.append(
+            [
+                1.0,
+                float(player_state.get_player_points()),
+                float(scores["unrealized"][idx]),
+                float(scores["roundEnd"][idx]),
+                float(scores["gameEnd"][idx]),
+                e.lookup_usable_sun_value(
+                    player_state.get_usable_sun(),
+                    num_players,
+                    game_state.get_current_num_ras(),
+                ),
+                e.lookup_unusable_sun_value(
+                    player_state.get_unusable_sun(), num_players
+                ),
+                float(len(player_state.get_usable_sun())),
+                float(player_state.sun_total),
+                1.0 if is_final_round else 0.0,
+                rounds_left,
+                ra_progress,
+                tiles_left,
+            ]
+            + [float(count) for count in player_state.get_player_collection()]
+        )
+    return features
+
+
+class LinearValueModel:
+    """Predicts the final score of each player as a weighted sum of features."""
+
+    __slots__ = ("weights",)
+
+    def __init__(self, weights: Sequence[float]) -> None:
+        assert (
+            len(weights) == NUM_FEATURES
+        ), f"Expected {NUM_FEATURES} weights, got {len(weights)}"
+        self.weights: List[float] = list(weights)
+
+    def predict(self, features: Sequence[float]) -> float:
+        return math.fsum(map(operator.mul, self.weights, features))
+
+    def predict_batch(self, rows: Iterable[Sequence[float]]) -> List[float]:
+        """The product of the stacked feature rows with the weights."""
+        weights = self.weights
+        return [math.fsum(map(operator.mul, weights, row)) for row in rows]
+
+    def evaluate(self, game_state: gs.GameState) -> Dict[int, float]:
+        """Drop-in replacement for evaluate_game_state_no_auction_tiles."""
+        return dict(enumerate(self.predict_batch(extract_features(game_state))))
+
+    def evaluate_batch(
+        self, game_states: Sequence[gs.GameState]
+    ) -> List[Dict[int, float]]:
+        """Same as evaluate on each state, with a single product over the features
+        of every player of every state."""
+        rows: List[List[float]] = []
+        for game_state, scores in zip(
+            game_states, scoring.score_game_states(game_states)
+        ):
+            rows += extract_features(game_state, scores)
+        values = iter(self.predict_batch(rows))
+        return [
+            {idx: next(values) for idx in range(game_state.get_num_players())}
+            for game_state in game_states
+        ]
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            data = {
+                "version": _VERSION,
+                "features": FEATURE_NAMES,
+                "weights": self.weights,
+            }
+            json.dump(data, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "LinearValueModel":
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("version") != _VERSION or data.get("features") != FEATURE_NAMES:
+            raise ValueError(f"{path} was trained with different features.")
+        return cls(data["weights"])
+
+
+def _solve(matrix: List[List[float]], rhs: List[float]) -> List[float]:
+    """Solves matrix @ x = rhs with Gaussian elimination and partial pivoting."""
+    size = len(rhs)
+    augmented = [row[:] + [value] for row, value in zip(matrix, rhs)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda row: abs(augmented[row][col]))
+        if abs(augmented[pivot][col]) < 1e-12:
+            raise ValueError("Singular system")
+        augmented[col], augmented[pivot] = augmented[pivot], augmented[col]
+        for row in range(col + 1, size):
+            factor = augmented[row][col] / augmented[col][col]
+            if factor == 0.0:
+                continue
+            for k in range(col, size + 1):
+                augmented[row][k] -= factor * augmented[col][k]
+    solution = [0.0] * size
+    for row in reversed(range(size)):
+        total = augmented[row][size] - math.fsum(
+            augmented[row][k] * solution[k] for k in range(row + 1, size)
+        )
+        solution[row] = total / augmented[row][row]
+    return solution
+
+
+def fit(samples: Sequence[TSample], l2: float = 1.0) -> LinearValueModel:
+    """Fits a ridge regression of final scores on features.
+
+    The bias is not regularized.
+    """
+    assert samples, "Cannot fit a model without samples"
+    gram = [[0.0] * NUM_FEATURES for _ in range(NUM_FEATURES)]
+    moments = [0.0] * NUM_FEATURES
+    for features, target in samples:
+        for i, x_i in enumerate(features):
+            if x_i == 0.0:
+                continue
+            moments[i] += x_i * target
+            row = gram[i]
+            for j, x_j in enumerate(features):
+                row[j] += x_i * x_j
+    for i in range(1, NUM_FEATURES):
+        gram[i][i] += l2
+    return LinearValueModel(_solve(gram, moments))
+
+
+def random_policy(game_state: gs.GameState, rng: random.Random) -> int:
+    legal_actions = ra.get_possible_actions(game_state)
+    assert legal_actions, "no legal actions"
+    return rng.choice(legal_actions)
+
+
+def play_game(
+    num_players: int, rng: random.Random, policy: TPolicy = random_policy
+) -> List[TSample]:
+    """Plays a game, labelling the features of every leaf-like state with the
+    final score of each player.
+
+    Like the states the oracle evaluates, only states without auction tiles are
+    sampled. The game only depends on rng.
+    """
+    game_state = gs.new_game([f"P{idx + 1}" for idx in range(num_players)], rng)
+    visited: List[List[List[float]]] = []
+    while not game_state.is_game_ended():
+        if game_state.get_num_auction_tiles() == 0:
+            visited.append(extract_features(game_state))
+        ra.execute_action_internal(game_state, policy(game_state, rng))
+    final_scores = [
+        float(player_state.get_player_points())
+        for player_state in game_state.player_states
+    ]
+    return [
+        (features, final_scores[idx])
+        for player_features in visited
+        for idx, features in enumerate(player_features)
+    ]
+
+
+def generate_samples(
+    num_games: int,
+    player_counts: Sequence[int] = (2, 3, 4, 5),
+    seed: Optional[int] = None,
+    policy: TPolicy = random_policy,
+) -> List[TSample]:
+    """Plays self-play games, cycling through the player counts.
+
+    The samples only depend on the seed, if given.
+    """
+    rng = random.Random(seed)
+    samples: List[TSample] = []
+    for game in range(num_games):
+        samples += play_game(player_counts[game % len(player_counts)], rng, policy)
+    return samples
+
+
+def rmse(model: LinearValueModel, samples: Sequence[TSample]) -> float:
+    squared_errors = [
+        (model.predict(features) - target) ** 2 for features, target in samples
+    ]
+    return math.sqrt(math.fsum(squared_errors) / max(1, len(samples)))
@@ -552,3 +552,9 @@ POINTS_FOR_MON_DEPTH: List[int] = [0, 0, 0, 5, 10, 15]
 POINTS_FOR_MON_BREADTH: List[int] = [0, 1, 2, 3, 4, 5, 6, 10, 15]
 POINTS_FOR_LEAST_SUN: int = -5
 POINTS_FOR_MOST_SUN: int = 5
+
+
+def points_for_monument_depth(count: int) -> int:
+    """Points for holding `count` copies of the same monument."""
+    # Only tests collect more copies of a monument than exist in the bag.
+    return POINTS_FOR_MON_DEPTH[min(count, len(POINTS_FOR_MON_DEPTH) - 1)]
@@ -0,0 +1,142 @@
+"""
+Perft: counts every legal action sequence up to a fixed depth.
+
+Borrowed from chess engines, perft walks the full game tree from a position with a
+known draw order using get_possible_actions and execute_action_internal. The leaf
+counts of the reference positions are fixed, so any faster engine (eg.
+batch_engine) must reproduce them exactly, and nodes/s is the headline throughput
+of the engine:
+
+    python -m game.perft -n 3 -d 6
+"""
+import argparse
+import random
+import time
+from typing import Dict, NamedTuple
+
+from game import batch_engine as be
+from game import info as gi
+from game import ra
+from game import state as gs
+from game.proxy import copy
+
+
+class PerftResult(NamedTuple):
+    # Positions at exactly the requested depth.
+    leaves: int
+    # Actions executed to reach them, ie. all positions below the root.
+    nodes: int
+    seconds: float
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / max(self.seconds, 1e-9)
+
+
+def reference_position(num_players: int, seed: int = 0) -> gs.GameState:
+    """A starting position whose draw order and deal only depend on the seed."""
+    game_state = gs.GameState([f"P{idx + 1}" for idx in range(num_players)])
+    draw_order = [
+        idx
+        for idx, tile in enumerate(gi.TILE_INFO)
+        for _ in range(gi.tile_starting_num(tile))
+    ]
+    random.Random(seed).shuffle(draw_order)
+    game_state.tile_bag = gs.TileBag(draw_order=draw_order)
+    # Sorted since GameState shuffles the starting sun sets in place.
+    for player_state, sun_set in zip(
+        game_state.player_states, sorted(gi.STARTING_SUN[num_players])
+    ):
+        player_state.set_usable_sun(sun_set)
+    return game_state
+
+
+def _perft(game_state: gs.GameState, depth: int) -> tuple[int, int]:
+    """Returns the leaves and nodes below the game state."""
+    if depth == 0:
+        return 1, 0
+    legal_actions = ra.get_possible_actions(game_state)
+    if legal_actions is None:
+        return 0, 0
+    leaves, nodes = 0, 0
+    for action in legal_actions:
+        child = copy.deepcopy(game_state)
+        ra.execute_action_internal(child, action, legal_actions)
+        child_leaves, child_nodes = _perft(child, depth - 1)
+        leaves += child_leaves
+        nodes += child_nodes + 1
+    return leaves, nodes
+
+
+def perft(game_state: gs.GameState, depth: int) -> PerftResult:
+    """Counts the action sequences of length depth from the game state.
+
+    Games that end earlier contribute no leaves.
+    """
+    start_time = time.perf_counter()
+    leaves, nodes = _perft(game_state, depth)
+    return PerftResult(leaves, nodes, time.perf_counter() - start_time)
+
+
+def divide(game_state: gs.GameState, depth: int) -> Dict[int, int]:
+    """The leaves below each legal action, for tracking down mismatches."""
+    legal_actions = ra.get_possible_actions(game_state) or []
+    counts = {}
+    for action in legal_actions:
+        child = copy.deepcopy(game_state)
+        ra.execute_action_internal(child, action, legal_actions)
+        counts[action] = _perft(child, depth - 1)[0] if depth > 0 else 1
+    return counts
+
+
+def perft_batch(game_state: gs.GameState, depth: int) -> PerftResult:
+    """Same as perft, but expands a whole ply at a time with the batch engine."""
+    start_time = time.perf_counter()
+    frontier = be.BatchState.from_game_states([game_state])
+    nodes = 0
+    for _ in range(depth):
+        mask = be.legal_mask(frontier)
+        children = [
+            (game, action)
+            for game in range(frontier.num_games)
+            for action in range(be.NUM_ACTIONS)
+            if mask[game * be.NUM_ACTIONS + action]
+        ]
+        frontier = frontier.select([game for game, _ in children])
+        be.step(frontier, [action for _, action in children])
+        nodes += frontier.num_games
+    return PerftResult(frontier.num_games, nodes, time.perf_counter() - start_time)
+
+
+def get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Counts Ra action sequences.")
+    parser.add_argument(
+        "--num_players", "-n", type=int, default=2, help="Number of players."
+    )
+    parser.add_argument("--depth", "-d", type=int, default=5, help="Plies to search.")
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seeds the reference draw order."
+    )
+    parser.add_argument(
+        "--divide", action="store_true", help="Print the leaves below each action."
+    )
+    parser.add_argument(
+        "--batch", action="store_true", help="Also run perft on the batch engine."
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args: argparse.Namespace = get_args()
+    game_state = reference_position(args.num_players, args.seed)
+    if args.divide:
+        for action, count in divide(game_state, args.depth).items():
+            print(f"{gi.ACTION_MAPPING[action]}: {count}")
+    results = {"engine": perft(game_state, args.depth)}
+    if args.batch:
+        results["batch"] = perft_batch(game_state, args.depth)
+    for name, result in results.items():
+        print(
+            f"{name}: {result.leaves} leaves, {result.nodes} nodes in "
+            f"{result.seconds:.2f}s ({result.nodes_per_second:.0f} nodes/s)"
+        )
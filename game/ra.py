@@ -22,6 +22,8 @@ from game import state as gs
 
 OUTFILE_FOLDER_NAME: str = "move_histories"
 DEFAULT_OUTFILE_PREFIX: str = "move_history"
+# Starts the move-history line recording the suns dealt to each player.
+STARTING_SUNS_PREFIX: str = "suns"
 
 
 def parse_action(action: str) -> int:
@@ -50,6 +52,30 @@ class SerializedRaGame(TypedDict):
     auctionTileValues: Mapping[str, int]
 
 
+def format_starting_suns(starting_suns: Iterable[Iterable[int]]) -> str:
+    """The move-history line recording the suns dealt to each player."""
+    return " ".join(
+        [STARTING_SUNS_PREFIX] + [",".join(map(str, suns)) for suns in starting_suns]
+    )
+
+
+def parse_starting_suns(line: Sequence[str]) -> Optional[List[List[int]]]:
+    """The suns dealt to each player, if the split move-history line records them."""
+    if not line or line[0] != STARTING_SUNS_PREFIX:
+        return None
+    return [[int(sun) for sun in suns.split(",")] for suns in line[1:]]
+
+
+def deal_starting_suns(
+    game_state: gs.GameState, starting_suns: Sequence[Iterable[int]]
+) -> None:
+    """Deals the given suns to each player, eg. to replay a recorded game."""
+    if len(starting_suns) != game_state.get_num_players():
+        raise ValueError(f"Cannot deal {starting_suns} to every player")
+    for player_state, suns in zip(game_state.player_states, starting_suns):
+        player_state.set_usable_sun(suns)
+
+
 # Get the possible actions for a gamestate
 def get_possible_actions(game_state: gs.GameState) -> Optional[List[int]]:  # noqa: C901
     """Returns a list of legal actions."""
@@ -620,10 +646,23 @@ class RaGame:
             draw_order = self.game_state.get_tile_bag().get_draw_order()
             outfile.write(f"{' '.join([str(tile) for tile in draw_order])}\n")
 
+    def write_starting_suns_to_outfile(self) -> None:
+        """Write the suns dealt to each player to the outfile. Appends to file."""
+        if not self.outfile:
+            return
+
+        with open(self.outfile, "a+") as outfile:
+            starting_suns = [
+                player_state.get_usable_sun()
+                for player_state in self.game_state.player_states
+            ]
+            outfile.write(f"{format_starting_suns(starting_suns)}\n")
+
     def write_pregame_info_to_outfile(self) -> None:
-        """Writes player names and draw order to the outfile."""
+        """Writes player names, draw order and starting suns to the outfile."""
         self.write_player_names_to_outfile()
         self.write_tile_draw_order_to_outfile()
+        self.write_starting_suns_to_outfile()
 
     def get_action_prompt(self, legal_actions: List[int]) -> str:
         prompt = "User Action: "
@@ -794,6 +833,13 @@ class RaGame:
             )
 
             action_lst = file_lines[2:]
+            # Older move histories do not record the starting suns.
+            if (
+                action_lst
+                and (starting_suns := parse_starting_suns(action_lst[0])) is not None
+            ):
+                deal_starting_suns(self.game_state, starting_suns)
+                action_lst = action_lst[1:]
             self.load_actions(action_lst)
 
     def init_game(self) -> None:
@@ -0,0 +1,197 @@
+"""
+Bulk replay and validation of move histories.
+
+Replays every move-history file in the given folders or globs the way
+RaGame.load_actions_from_infile does, spread over a process pool, and reports the
+final scores, the files that could not be replayed and the throughput:
+
+    python -m game.replay move_histories "archive/**/*.txt" -w 8
+
+A file that cannot be replayed, eg. because of an illegal or truncated move, is
+reported with the move it failed on instead of aborting the whole run. Histories in
+the binary format of game.binary_history are replayed as well.
+
+Older histories do not record the suns dealt, so they are replayed with an assumed
+deal and reported as such: their scores may differ from the game actually played.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent import futures
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from game import binary_history as bh
+from game import info as gi
+from game import ra
+from game import state as gs
+
+TMove = Tuple[gs.GameState, int]
+
+
+class ReplayResult(NamedTuple):
+    path: str
+    player_names: Tuple[str, ...]
+    num_moves: int
+    ended: bool
+    # Points of each player once the moves were replayed.
+    scores: Tuple[int, ...]
+    seconds: float
+    # Set if the file could not be replayed to its last move.
+    error: Optional[str]
+    # Set if the history did not record the starting suns.
+    assumed_deal: bool
+
+
+def find_histories(patterns: Iterable[str]) -> List[str]:
+    """The move-history files in the given folders or matching the given globs."""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*")
+        paths += [
+            path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path)
+        ]
+    return sorted(set(paths))
+
+
+def load_history(path: str) -> bh.History:
+    """Reads a text or binary move history."""
+    if bh.is_binary(path):
+        return bh.load(path).history()
+    return bh.read_text(path)
+
+
+def replay_history(history: bh.History) -> Iterator[TMove]:
+    """Replays a move history like RaGame.load_actions_from_infile.
+
+    Yields the game state before each move and the move, and executes the move on
+    that same state once the next one is requested. Raises ValueError on the first
+    move that cannot be replayed.
+
+    Histories that do not record the starting suns are dealt the sorted starting sun
+    sets, to make their replays reproducible.
+    """
+    game = ra.RaGame(history.player_names, randomize_play_order=False)
+    ra.deal_starting_suns(
+        game.game_state,
+        history.starting_suns or sorted(gi.STARTING_SUN[game.num_players]),
+    )
+    game.game_state.get_tile_bag()._set_draw_order(history.draw_order)
+    for move_number, (action, tile) in enumerate(history.moves, 1):
+        legal_actions = ra.get_possible_actions(game.game_state)
+        if legal_actions is None or action not in legal_actions:
+            raise ValueError(f"move {move_number}: illegal action {action}")
+        yield game.game_state, action
+        drawn = game.execute_action(action, legal_actions)
+        if tile is not None and drawn != tile:
+            raise ValueError(f"move {move_number}: drew tile {drawn}, not {tile}")
+
+
+def replay_file(path: str) -> ReplayResult:
+    """Replays a move-history file. Safe to run in a worker process."""
+    start_time = time.perf_counter()
+    num_moves = 0
+    game_state: Optional[gs.GameState] = None
+    error, assumed_deal = None, False
+    try:
+        history = load_history(path)
+        assumed_deal = history.starting_suns is None
+        for game_state, _ in replay_history(history):
+            num_moves += 1
+    except Exception as e:
+        error = repr(e)
+    if game_state is None:
+        player_names: Tuple[str, ...] = ()
+        ended, scores = False, ()
+    else:
+        player_names = tuple(
+            player_state.player_name for player_state in game_state.player_states
+        )
+        ended = game_state.is_game_ended()
+        scores = tuple(
+            player_state.get_player_points()
+            for player_state in game_state.player_states
+        )
+    return ReplayResult(
+        path,
+        player_names,
+        num_moves,
+        ended,
+        scores,
+        time.perf_counter() - start_time,
+        error,
+        assumed_deal,
+    )
+
+
+def replay_all(
+    paths: Sequence[str], max_workers: Optional[int] = None
+) -> List[ReplayResult]:
+    """Replays every file, in worker processes unless max_workers is 1."""
+    if max_workers == 1:
+        return [replay_file(path) for path in paths]
+    max_workers = max_workers or os.cpu_count() or 1
+    with futures.ProcessPoolExecutor(max_workers=max_workers) as pool:
+        chunksize = max(1, len(paths) // (4 * max_workers))
+        return list(pool.map(replay_file, paths, chunksize=chunksize))
+
+
+def format_report(
+    results: Sequence[ReplayResult], elapsed: float, show_scores: bool = False
+) -> str:
+    failed = [result for result in results if result.error is not None]
+    num_ended = sum(1 for result in results if result.error is None and result.ended)
+    num_moves = sum(result.num_moves for result in results)
+    num_assumed = sum(
+        1 for result in results if result.error is None and result.assumed_deal
+    )
+    lines = [
+        f"{len(results)} files, {num_moves} moves in {elapsed:.2f}s "
+        f"({len(results) / max(elapsed, 1e-9):.1f} files/s, "
+        f"{num_moves / max(elapsed, 1e-9):.0f} moves/s).",
+        f"{num_ended} finished, {len(results) - num_ended - len(failed)} unfinished, "
+        f"{len(failed)} failed.",
+    ]
+    if num_assumed:
+        lines.append(
+            f"{num_assumed} did not record the starting suns and were replayed with "
+            "an assumed deal, so their scores may be wrong."
+        )
+    if show_scores:
+        for result in results:
+            if result.error is None:
+                scores = ", ".join(
+                    f"{name} {score}"
+                    for name, score in zip(result.player_names, result.scores)
+                )
+                status = "" if result.ended else " (unfinished)"
+                if result.assumed_deal:
+                    status += " (assumed deal)"
+                lines.append(f"{result.path}: {scores}{status}")
+    lines += [f"FAILED {result.path}: {result.error}" for result in failed]
+    return "\n".join(lines)
+
+
+def get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replays Ra move histories.")
+    parser.add_argument(
+        "histories", nargs="+", help="Folders or globs of move-history files."
+    )
+    parser.add_argument(
+        "--workers", "-w", type=int, default=None, help="Number of worker processes."
+    )
+    parser.add_argument(
+        "--scores", action="store_true", help="Print the final scores of every file."
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args: argparse.Namespace = get_args()
+    paths = find_histories(args.histories)
+    start_time = time.time()
+    results = replay_all(paths, args.workers)
+    print(format_report(results, time.time() - start_time, args.scores))
+    sys.exit(1 if any(result.error is not None for result in results) else 0)
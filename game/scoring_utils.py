@@ -1,9 +1,17 @@
 import sys
-from typing import Iterable, Mapping, Optional, Tuple, TypeVar
+from typing import (
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypedDict,
+    TypeVar,
+)
 
 from game import info as gi
 from game import state as gs
-from game.proxy import copy
 
 T = TypeVar("T")
 
@@ -32,76 +40,117 @@ def get_size(obj: T, seen: Optional[set[int]] = None) -> int:
         size += sum([get_size(k, seen) for k in obj.keys()])
     elif hasattr(obj, "__dict__"):
         size += get_size(obj.__dict__, seen)
+    elif hasattr(obj, "__slots__"):
+        size += sum(
+            get_size(getattr(obj, name), seen)
+            for cls in type(obj).__mro__
+            for name in getattr(cls, "__slots__", ())
+            if hasattr(obj, name)
+        )
     elif hasattr(obj, "__iter__") and not isinstance(obj, (str, bytes, bytearray)):
         size += sum([get_size(i, seen) for i in obj])  # pyre-ignore[16]
     return size
 
 
-def calculate_round_end_points_gained(
-    player_states: Iterable[gs.PlayerState], player_idx: Optional[int] = None
-) -> Mapping[int, int]:
+class PlayerScores(TypedDict):
+    """Scores of every player, ordered like the player states they came from."""
+
+    # Points each player would gain from base round-end scoring.
+    roundEnd: List[int]
+    # Points each player would gain from final round scoring.
+    gameEnd: List[int]
+    # Points each player would gain if the current round ended now.
+    unrealized: List[int]
+
+
+def round_end_points(player_states: Sequence[gs.PlayerState]) -> List[int]:
     """
-    Calculates how many base-round-end points should be added for each
-    player. Returns a mapping of player_idx -> points gained.
-    Optionally provide a player name, and only the points for that player
-    will be calced.
+    Calculates the base-round-end points of every player in a single pass over the
+    (players x tile types) collection matrix.
     """
-    player_states_to_calc = (
-        player_states
-        if player_idx is None
-        else [
-            player_state
-            for player_state in player_states
-            if player_state.get_player_idx() == player_idx
-        ]
-    )
-    assert (
-        len(list(player_states_to_calc)) > 0
-    ), f"Round points cannot \
-    be calced for player '{player_idx}' because it does \
-    not exist."
+    collections = [player_state.collection for player_state in player_states]
+    pharoahs = [collection[gi.INDEX_OF_PHAR] for collection in collections]
+    least_num_pharoahs, most_num_pharoahs = min(pharoahs), max(pharoahs)
+    return [
+        # golden gods and gold
+        collection[gi.INDEX_OF_GOD] * gi.POINTS_PER_GOD
+        + collection[gi.INDEX_OF_GOLD] * gi.POINTS_PER_GOLD
+        # pharoahs
+        + (gi.POINTS_FOR_LEAST_PHAR if num_pharoahs == least_num_pharoahs else 0)
+        + (gi.POINTS_FOR_MOST_PHAR if num_pharoahs == most_num_pharoahs else 0)
+        # niles and floods
+        + _nile_points(collection[gi.INDEX_OF_NILE], collection[gi.INDEX_OF_FLOOD])
+        # civilizations
+        + gi.POINTS_FOR_CIVS[player_state.num_distinct_civs]
+        for player_state, collection, num_pharoahs in zip(
+            player_states, collections, pharoahs
+        )
+    ]
 
-    points_gained = {
-        player_state.get_player_idx(): 0 for player_state in player_states_to_calc
-    }
 
-    for player_state in player_states_to_calc:
-        curret_player_idx = player_state.get_player_idx()
+def game_end_points(player_states: Sequence[gs.PlayerState]) -> List[int]:
+    """Calculates the game-end points of every player in a single pass."""
+    suns = [player_state.sun_total for player_state in player_states]
+    least_suns, most_suns = min(suns), max(suns)
+    return [
+        monument_points(player_state)
+        + (gi.POINTS_FOR_LEAST_SUN if num_suns == least_suns else 0)
+        + (gi.POINTS_FOR_MOST_SUN if num_suns == most_suns else 0)
+        for player_state, num_suns in zip(player_states, suns)
+    ]
 
-        # golden gods
-        points_gained[curret_player_idx] += (
-            player_state.collection[gi.INDEX_OF_GOD] * gi.POINTS_PER_GOD
-        )
 
-        # gold
-        points_gained[curret_player_idx] += (
-            player_state.collection[gi.INDEX_OF_GOLD] * gi.POINTS_PER_GOLD
-        )
+def score_players(
+    player_states: Sequence[gs.PlayerState], is_final_round: bool
+) -> PlayerScores:
+    """Calculates the round-end, game-end and unrealized points of every player."""
+    round_end = round_end_points(player_states)
+    game_end = game_end_points(player_states)
+    unrealized = (
+        [round_pts + game_pts for round_pts, game_pts in zip(round_end, game_end)]
+        if is_final_round
+        else round_end[:]
+    )
+    return PlayerScores(roundEnd=round_end, gameEnd=game_end, unrealized=unrealized)
 
-        # pharoahs
-        least_num_pharoahs, most_num_pharoahs = least_and_most_num_pharoahs(
-            player_states
-        )
-        if player_state.collection[gi.INDEX_OF_PHAR] == least_num_pharoahs:
-            points_gained[curret_player_idx] += gi.POINTS_FOR_LEAST_PHAR
-        if player_state.collection[gi.INDEX_OF_PHAR] == most_num_pharoahs:
-            points_gained[curret_player_idx] += gi.POINTS_FOR_MOST_PHAR
 
-        # niles and floods
-        if player_state.collection[gi.INDEX_OF_FLOOD] > 0:
-            points_gained[curret_player_idx] += (
-                player_state.collection[gi.INDEX_OF_NILE]
-                + player_state.collection[gi.INDEX_OF_FLOOD]
-            )
+def score_game_states(game_states: Iterable[gs.GameState]) -> List[PlayerScores]:
+    """Scores the players of many game states at once, eg. for batches of leaves."""
+    return [
+        score_players(game_state.player_states, game_state.is_final_round())
+        for game_state in game_states
+    ]
 
-        # civilizations
-        points_gained[curret_player_idx] += gi.POINTS_FOR_CIVS[
-            num_distinct_civs(player_state)
-        ]
 
+def _by_player_idx(
+    player_states: Sequence[gs.PlayerState],
+    points: Sequence[int],
+    player_idx: Optional[int],
+) -> Mapping[int, int]:
+    points_gained = {
+        player_state.get_player_idx(): player_points
+        for player_state, player_points in zip(player_states, points)
+        if player_idx is None or player_state.get_player_idx() == player_idx
+    }
+    assert (
+        len(points_gained) > 0
+    ), f"Points cannot be calced for player '{player_idx}' because it does not exist."
     return points_gained
 
 
+def calculate_round_end_points_gained(
+    player_states: Iterable[gs.PlayerState], player_idx: Optional[int] = None
+) -> Mapping[int, int]:
+    """
+    Calculates how many base-round-end points should be added for each
+    player. Returns a mapping of player_idx -> points gained.
+    Optionally provide a player name, and only the points for that player
+    will be calced.
+    """
+    player_states = list(player_states)
+    return _by_player_idx(player_states, round_end_points(player_states), player_idx)
+
+
 def base_round_scoring(player_states: Iterable[gs.PlayerState]) -> None:
     """Gives points to each player based on tiles at end of round."""
     points_gained = calculate_round_end_points_gained(player_states)
@@ -118,39 +167,8 @@ def calculate_game_end_points_gained(
     Optionally provide a player name, and only the points for that player
     will be calced.
     """
-    player_states_to_calc = (
-        player_states
-        if player_idx is None
-        else [
-            player_state
-            for player_state in player_states
-            if player_state.get_player_idx() == player_idx
-        ]
-    )
-    assert (
-        len(list(player_states_to_calc)) > 0
-    ), f"Round points cannot \
-    be calced for name '{player_idx}' because it \
-    does not exist."
-
-    points_gained = {
-        player_state.get_player_idx(): 0 for player_state in player_states_to_calc
-    }
-
-    for player_state in player_states_to_calc:
-        current_player_name = player_state.get_player_idx()
-
-        # monuments
-        points_gained[current_player_name] += monument_points(player_state)
-
-        # suns
-        least_suns, most_suns = least_and_most_suns(player_states)
-        if sum_suns(player_state) == least_suns:
-            points_gained[current_player_name] += gi.POINTS_FOR_LEAST_SUN
-        if sum_suns(player_state) == most_suns:
-            points_gained[current_player_name] += gi.POINTS_FOR_MOST_SUN
-
-    return points_gained
+    player_states = list(player_states)
+    return _by_player_idx(player_states, game_end_points(player_states), player_idx)
 
 
 def final_round_scoring(player_states: Iterable[gs.PlayerState]) -> None:
@@ -164,15 +182,10 @@ def calculate_unrealized_points(
     player_states: Iterable[gs.PlayerState],
     is_final_round: bool,
 ) -> Mapping[int, int]:
-    if is_final_round:
-        round_end_points = calculate_round_end_points_gained(player_states)
-        game_end_points = calculate_game_end_points_gained(player_states)
-        return {
-            playerIdx: round_end_points[playerIdx] + game_end_points[playerIdx]
-            for playerIdx in round_end_points.keys()
-        }
-    else:
-        return calculate_round_end_points_gained(player_states)
+    player_states = list(player_states)
+    return _by_player_idx(
+        player_states, score_players(player_states, is_final_round)["unrealized"], None
+    )
 
 
 def calculate_value_of_auction_tiles(
@@ -183,54 +196,108 @@ def calculate_value_of_auction_tiles(
     player. Return a mapping of player_idx -> points gained.
     """
     # TODO(albertz): Properly value disaster tiles
-    relevant_auction_tiles = [
-        tile
-        for tile in auction_tiles
-        if gi.TILE_INFO[tile]["tileType"] == gi.TileType.COLLECTIBLE
-    ]
+    added = [0] * gi.NUM_COLLECTIBLE_TILE_TYPES
+    for tile in auction_tiles:
+        if gi.TILE_INFO[tile]["tileType"] == gi.TileType.COLLECTIBLE:
+            added[tile] += 1
+
+    return {
+        p_state.get_player_idx(): marginal_points_of_tiles(added, p_state, p_states)
+        for p_state in p_states
+    }
 
-    # per player, calculate points gained if they had the auction tiles
-    sim_p_states = copy.deepcopy(p_states)
-    sim_p_gained = {p_state.get_player_idx(): 0 for p_state in p_states}
-    for p_state in sim_p_states:
-        cur_p_name = p_state.get_player_idx()
-        p_state.add_tiles(relevant_auction_tiles)
-        current_simulation_p_states = [
-            base_p_state
-            for base_p_state in p_states
-            if base_p_state.get_player_idx() != cur_p_name
-        ] + [p_state]
-
-        cur_p_name = p_state.get_player_idx()
-        sim_end_p_gained = calculate_round_end_points_gained(
-            current_simulation_p_states, cur_p_name
-        )
-        sim_g_end_gained = calculate_game_end_points_gained(
-            current_simulation_p_states, cur_p_name
-        )
-        sim_p_gained[cur_p_name] = (
-            sim_end_p_gained[cur_p_name] + sim_g_end_gained[cur_p_name]
-        )
 
-    # for each player, calculate points gained without auction tiles
-    def_p_gained = {p_state.get_player_idx(): 0 for p_state in p_states}
-    def_end_p_gained = calculate_round_end_points_gained(p_states)
-    default_game_end_points_gained = calculate_game_end_points_gained(p_states)
-    for player_name in def_p_gained.keys():
-        def_p_gained[player_name] += (
-            def_end_p_gained[player_name] + default_game_end_points_gained[player_name]
-        )
+def marginal_points_of_tiles(
+    added: Sequence[int],
+    player_state: gs.PlayerState,
+    player_states: Iterable[gs.PlayerState],
+) -> int:
+    """
+    Calculates how many round-end and game-end points the player would gain by
+    collecting the given tiles, without copying any state.
 
-    # subtract default points gained from simulated points gained
-    for player_name in sim_p_gained.keys():
-        sim_p_gained[player_name] -= def_p_gained[player_name]
+    Args:
+        added: For each collectible tile index, how many tiles are collected.
+        player_state: The player collecting the tiles.
+        player_states: All players, including the one collecting the tiles.
+    """
+    collection = player_state.collection
+    # golden gods and gold
+    gained = (
+        added[gi.INDEX_OF_GOD] * gi.POINTS_PER_GOD
+        + added[gi.INDEX_OF_GOLD] * gi.POINTS_PER_GOLD
+    )
 
-    return sim_p_gained
+    # pharoahs
+    if added[gi.INDEX_OF_PHAR] > 0:
+        other_pharoahs = [
+            other.collection[gi.INDEX_OF_PHAR]
+            for other in player_states
+            if other.get_player_idx() != player_state.get_player_idx()
+        ]
+        num_pharoahs = collection[gi.INDEX_OF_PHAR]
+        gained += _pharoah_points(
+            num_pharoahs + added[gi.INDEX_OF_PHAR], other_pharoahs
+        ) - _pharoah_points(num_pharoahs, other_pharoahs)
+
+    # niles and floods
+    num_niles, num_floods = collection[gi.INDEX_OF_NILE], collection[gi.INDEX_OF_FLOOD]
+    gained += _nile_points(
+        num_niles + added[gi.INDEX_OF_NILE], num_floods + added[gi.INDEX_OF_FLOOD]
+    ) - _nile_points(num_niles, num_floods)
+
+    # civilizations
+    new_civs = 0
+    for idx in range(
+        gi.STARTING_INDEX_OF_CIVS, gi.STARTING_INDEX_OF_CIVS + gi.NUM_CIVS
+    ):
+        if added[idx] > 0 and collection[idx] == 0:
+            new_civs += 1
+    if new_civs > 0:
+        num_civs = player_state.num_distinct_civs
+        gained += gi.POINTS_FOR_CIVS[num_civs + new_civs] - gi.POINTS_FOR_CIVS[num_civs]
+
+    # monuments
+    new_monuments = 0
+    for idx in range(
+        gi.STARTING_INDEX_OF_MONUMENTS,
+        gi.STARTING_INDEX_OF_MONUMENTS + gi.NUM_MONUMENTS,
+    ):
+        if added[idx] > 0:
+            if collection[idx] == 0:
+                new_monuments += 1
+            gained += gi.points_for_monument_depth(
+                collection[idx] + added[idx]
+            ) - gi.points_for_monument_depth(collection[idx])
+    if new_monuments > 0:
+        num_monuments = player_state.num_distinct_monuments
+        gained += (
+            gi.POINTS_FOR_MON_BREADTH[num_monuments + new_monuments]
+            - gi.POINTS_FOR_MON_BREADTH[num_monuments]
+        )
+
+    # Suns do not change hands with the tiles, so their points are unchanged.
+    return gained
 
 
 """ HELPER FUNCTIONS """
 
 
+def _pharoah_points(num_pharoahs: int, other_pharoahs: Iterable[int]) -> int:
+    """Round-end pharoah points for a player given everyone else's pharoahs."""
+    points = 0
+    if num_pharoahs <= min(other_pharoahs, default=num_pharoahs):
+        points += gi.POINTS_FOR_LEAST_PHAR
+    if num_pharoahs >= max(other_pharoahs, default=num_pharoahs):
+        points += gi.POINTS_FOR_MOST_PHAR
+    return points
+
+
+def _nile_points(num_niles: int, num_floods: int) -> int:
+    """Round-end points for niles and floods. Niles only count with a flood."""
+    return num_niles + num_floods if num_floods > 0 else 0
+
+
 def least_and_most_num_pharoahs(
     player_states: Iterable[gs.PlayerState],
 ) -> Tuple[float, float]:
@@ -243,12 +310,11 @@ def least_and_most_num_pharoahs(
 
 
 def num_distinct_civs(player_state: gs.PlayerState) -> int:
-    collection_of_civs = gi.get_civs_from_collection(player_state.collection)
-    return len([n for n in collection_of_civs if n > 0])
+    return player_state.num_distinct_civs
 
 
 def sum_suns(player_state: gs.PlayerState) -> int:
-    return sum(player_state.get_all_sun())
+    return player_state.sun_total
 
 
 def least_and_most_suns(player_states: Iterable[gs.PlayerState]) -> Tuple[float, float]:
@@ -261,14 +327,8 @@ def least_and_most_suns(player_states: Iterable[gs.PlayerState]) -> Tuple[float,
 
 
 def monument_points(player_state: gs.PlayerState) -> int:
-    monument_points = 0
-    # monument copies
-    monument_collection = gi.get_monuments_from_collection(player_state.collection)
-    for amount in monument_collection:
-        monument_points += gi.POINTS_FOR_MON_DEPTH[amount]
-
-    # distinct monuments
-    num_distinct = len([n for n in monument_collection if n > 0])
-    monument_points += gi.POINTS_FOR_MON_BREADTH[num_distinct]
-
-    return monument_points
+    # monument copies and distinct monuments
+    return (
+        player_state.monument_depth_points
+        + gi.POINTS_FOR_MON_BREADTH[player_state.num_distinct_monuments]
+    )
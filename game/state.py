@@ -192,6 +192,18 @@ class SerializedPlayerState(TypedDict):
     unusableSun: List[int]
 
 
+def _is_civ(index: int) -> bool:
+    return gi.STARTING_INDEX_OF_CIVS <= index < gi.STARTING_INDEX_OF_CIVS + gi.NUM_CIVS
+
+
+def _is_monument(index: int) -> bool:
+    return (
+        gi.STARTING_INDEX_OF_MONUMENTS
+        <= index
+        < gi.STARTING_INDEX_OF_MONUMENTS + gi.NUM_MONUMENTS
+    )
+
+
 class PlayerState:
     __slots__ = (
         "collection",
@@ -200,6 +212,10 @@ class PlayerState:
         "player_idx",
         "usable_sun",
         "unusable_sun",
+        "num_distinct_civs",
+        "num_distinct_monuments",
+        "monument_depth_points",
+        "sun_total",
     )
 
     collection: List[int]
@@ -209,6 +225,16 @@ class PlayerState:
     usable_sun: List[int]
     unusable_sun: List[int]
 
+    # Tallies used for scoring, kept current as tiles and suns change hands.
+    # The number of civilization types with at least one tile.
+    num_distinct_civs: int
+    # The number of monument types with at least one tile.
+    num_distinct_monuments: int
+    # The points for sets of identical monuments (excludes distinct monuments).
+    monument_depth_points: int
+    # The sum of all suns, usable or not.
+    sun_total: int
+
     def __init__(
         self,
         player_name: str,
@@ -223,11 +249,44 @@ class PlayerState:
         self.usable_sun = starting_sun[:]
         self.usable_sun.sort()
         self.unusable_sun = []
+        self._recompute_tallies()
 
     @classmethod
     def shallow(cls) -> "PlayerState":
         return cls.__new__(cls)
 
+    def __setstate__(
+        self, state: tuple[Optional[Dict[str, object]], Dict[str, object]]
+    ) -> None:
+        _, slots = state
+        for key, value in slots.items():
+            setattr(self, key, value)
+        # Pickles from before the tallies existed lack them.
+        self._recompute_tallies()
+
+    def _recompute_tallies(self) -> None:
+        """Recomputes all tallies from the collection and suns."""
+        civs = gi.get_civs_from_collection(self.collection)
+        self.num_distinct_civs = len([n for n in civs if n > 0])
+        monuments = gi.get_monuments_from_collection(self.collection)
+        self.num_distinct_monuments = len([n for n in monuments if n > 0])
+        self.monument_depth_points = sum(
+            gi.points_for_monument_depth(amount) for amount in monuments
+        )
+        self.sun_total = sum(self.usable_sun) + sum(self.unusable_sun)
+
+    def _set_count(self, index: int, count: int) -> None:
+        """Sets the number of tiles of the given index, updating the tallies."""
+        old_count = self.collection[index]
+        self.collection[index] = count
+        if _is_civ(index):
+            self.num_distinct_civs += (count > 0) - (old_count > 0)
+        elif _is_monument(index):
+            self.num_distinct_monuments += (count > 0) - (old_count > 0)
+            self.monument_depth_points += gi.points_for_monument_depth(
+                count
+            ) - gi.points_for_monument_depth(old_count)
+
     def __key(self) -> tuple[int, ...]:
         return (
             hash(tuple(self.collection)),
@@ -260,7 +319,7 @@ class PlayerState:
     def add_tiles(self, lst_of_indexes: Iterable[int]) -> None:
         """Add a list of tile indexes to the player's collection"""
         for index in lst_of_indexes:
-            self.collection[index] += 1
+            self._set_count(index, self.collection[index] + 1)
 
     def remove_single_tiles_by_index(
         self, lst_of_indexes: Iterable[int], log: bool = False
@@ -274,7 +333,7 @@ class PlayerState:
                         {gi.index_to_tile_name(index)} from player \
                         {self.player_name}"
                     )
-                self.collection[index] -= 1
+                self._set_count(index, self.collection[index] - 1)
             else:
                 if log:
                     logging.info(
@@ -292,13 +351,19 @@ class PlayerState:
                     f"Clearing all tile {gi.index_to_tile_name(index)} "
                     f"from player {self.player_name}"
                 )
-            self.collection[index] = 0
+            self._set_count(index, 0)
 
     def exchange_sun(self, sun_to_give: int, sun_to_receive: int) -> None:
         """Give away a sun and receive another sun back."""
         self.usable_sun.remove(sun_to_give)
         self.unusable_sun.append(sun_to_receive)
         self.unusable_sun.sort()
+        self.sun_total += sun_to_receive - sun_to_give
+
+    def set_usable_sun(self, usable_sun: Iterable[int]) -> None:
+        """Replaces the usable suns, eg. to deal a specific starting hand."""
+        self.usable_sun = sorted(usable_sun)
+        self.sun_total = sum(self.usable_sun) + sum(self.unusable_sun)
 
     def make_all_suns_usable(self) -> None:
         self.usable_sun += self.unusable_sun
@@ -931,6 +996,33 @@ class GameState:
         print(self)
 
 
+def new_game(
+    player_names: Sequence[str], rng: Optional[random.Random] = None
+) -> GameState:
+    """Deals a game that only depends on the state of the global random module.
+
+    If rng is given, the deal only depends on rng instead, and the state of the
+    global random module is left as it was.
+    """
+    if rng is not None:
+        saved_state = random.getstate()
+        random.seed(rng.random())
+        try:
+            return new_game(player_names)
+        finally:
+            random.setstate(saved_state)
+    game_state = GameState(list(player_names))
+    # Sorted since GameState shuffles the starting sun sets in place, which would
+    # make the deal depend on the games played before in the same process.
+    first_set, *other_sets = sorted(gi.STARTING_SUN[len(player_names)])
+    random.shuffle(other_sets)
+    for player_state, sun_set in zip(
+        game_state.player_states, [first_set, *other_sets]
+    ):
+        player_state.set_usable_sun(sun_set)
+    return game_state
+
+
 # gs = GameState(2)
 # for _i in range(5):
 #   tile_index = gs.draw_tile()
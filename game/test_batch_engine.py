@@ -0,0 +1,141 @@
+import random
+import unittest
+from typing import List
+
+from game import batch_engine as be
+from game import info as gi
+from game import ra
+from game import state as gs
+
+
+class BatchEngineTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # Required since tile bags are randomly ordered is used.
+        random.seed(10)
+
+    def assertSameGame(self, game_state: gs.GameState, other: gs.GameState) -> None:
+        self.assertEqual(game_state, other)
+        self.assertEqual(game_state.auction_tiles, other.auction_tiles)
+        self.assertEqual(
+            [player_state.points for player_state in game_state.player_states],
+            [player_state.points for player_state in other.player_states],
+        )
+
+    def test_round_trip(self) -> None:
+        game_states = [gs.GameState(["A", "B", "C"]) for _ in range(3)]
+        for game_state in game_states[1:]:
+            for _ in range(10):
+                ra.execute_action_internal(
+                    game_state, random.choice(ra.get_possible_actions(game_state))
+                )
+        states = be.BatchState.from_game_states(game_states)
+        for game, game_state in enumerate(game_states):
+            self.assertSameGame(states.to_game_state(game), game_state)
+            self.assertEqual(states.scores(game), [10, 10, 10])
+
+    def test_select(self) -> None:
+        states = be.new_batch(3, 4, random.Random(0))
+        be.step(states, [gi.DRAW] * 3)
+        selected = states.select([2, 0, 2])
+        self.assertEqual(selected.num_games, 3)
+        for game, source in enumerate([2, 0, 2]):
+            self.assertSameGame(
+                selected.to_game_state(game), states.to_game_state(source)
+            )
+        before = states.to_game_state(2)
+        be.step(selected, [be.legal_actions(selected, game)[-1] for game in range(3)])
+        self.assertSameGame(states.to_game_state(2), before)
+        self.assertNotEqual(selected.to_game_state(0), before)
+
+    def test_deal(self) -> None:
+        states = be.new_batch(4, 2, random.Random(0))
+        self.assertEqual(len(states.collection), 4 * 2 * gi.NUM_COLLECTIBLE_TILE_TYPES)
+        for game in range(4):
+            game_state = states.to_game_state(game)
+            self.assertEqual(game_state.get_num_tiles_left(), gi.STARTING_NUM_TILES)
+            self.assertEqual(
+                sorted(game_state.player_states[0].get_usable_sun()),
+                gi.STARTING_SUN[2][0],
+            )
+            self.assertEqual(
+                be.legal_actions(states, game), ra.get_possible_actions(game_state)
+            )
+        self.assertEqual(
+            be.new_batch(2, 3, random.Random(1)).draw_order,
+            be.new_batch(2, 3, random.Random(1)).draw_order,
+        )
+
+    def test_matches_scalar_engine(self) -> None:
+        rng = random.Random(0)
+        for num_players in range(gi.MIN_NUM_PLAYERS, gi.MAX_NUM_PLAYERS + 1):
+            game_states = [
+                gs.GameState([f"P{idx}" for idx in range(num_players)])
+                for _ in range(6)
+            ]
+            states = be.BatchState.from_game_states(game_states)
+            while not states.all_ended():
+                mask = be.legal_mask(states)
+                actions: List[int] = []
+                for game, game_state in enumerate(game_states):
+                    legal_actions = ra.get_possible_actions(game_state) or []
+                    self.assertEqual(
+                        legal_actions,
+                        [
+                            action
+                            for action in range(be.NUM_ACTIONS)
+                            if mask[game * be.NUM_ACTIONS + action]
+                        ],
+                    )
+                    actions.append(rng.choice(legal_actions) if legal_actions else 0)
+                tiles_drawn = be.step(states, actions)
+                for game, game_state in enumerate(game_states):
+                    if game_state.is_game_ended():
+                        continue
+                    self.assertEqual(
+                        ra.execute_action_internal(game_state, actions[game]),
+                        tiles_drawn[game],
+                    )
+                    self.assertSameGame(states.to_game_state(game), game_state)
+            self.assertTrue(
+                all(game_state.is_game_ended() for game_state in game_states)
+            )
+
+    def test_illegal_action(self) -> None:
+        states = be.new_batch(2, 2, random.Random(0))
+        with self.assertRaises(Exception):
+            be.step(states, [gi.DRAW, gi.BID_1])
+        with self.assertRaises(AssertionError):
+            be.step(states, [gi.DRAW])
+
+    def test_env(self) -> None:
+        env = be.BatchEnv(8, 3, seed=0)
+        states = env.reset()
+        rng = random.Random(0)
+        totals = [[0] * 3 for _ in range(8)]
+        dones = [False] * 8
+        while not all(dones):
+            mask = env.legal_mask()
+            actions = []
+            for game in range(8):
+                legal_actions = [
+                    action
+                    for action in range(be.NUM_ACTIONS)
+                    if mask[game * be.NUM_ACTIONS + action]
+                ]
+                actions.append(rng.choice(legal_actions) if legal_actions else 0)
+            states, rewards, dones = env.step(actions)
+            for game in range(8):
+                for player in range(3):
+                    totals[game][player] += rewards[game][player]
+        for game in range(8):
+            self.assertEqual(
+                states.scores(game),
+                [gi.STARTING_PLAYER_POINTS + total for total in totals[game]],
+            )
+
+        env.reset()
+        self.assertFalse(any(env.states.game_ended))
+
+
+if __name__ == "__main__":
+    unittest.main()
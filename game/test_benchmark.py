@@ -0,0 +1,54 @@
+import unittest
+
+from game import benchmark as b
+from game import info as gi
+
+
+class BenchmarkTest(unittest.TestCase):
+    def test_build_corpus(self) -> None:
+        corpus = b.build_corpus(seed=1, positions_per_phase=2)
+        self.assertEqual(len(corpus), 2 * len(b.PHASES) * len(gi.STARTING_SUN))
+        for position in corpus:
+            self.assertEqual(
+                position.game_state.get_num_players(), position.num_players
+            )
+            self.assertEqual(b.phase(position.game_state), position.phase)
+        self.assertEqual(
+            [hash(position.game_state) for position in corpus],
+            [
+                hash(position.game_state)
+                for position in b.build_corpus(seed=1, positions_per_phase=2)
+            ],
+        )
+
+    def test_run_all_and_compare(self) -> None:
+        corpus = b.build_corpus(positions_per_phase=1, player_counts=[3])
+        results = b.run_all(corpus, loops=1, repeat=2)
+        self.assertEqual(list(results), [benchmark.name for benchmark in b.BENCHMARKS])
+        for result in results.values():
+            self.assertGreater(result.best_ns, 0)
+            self.assertLessEqual(result.best_ns, result.median_ns)
+            self.assertEqual(result.num_calls, len(corpus))
+
+        baseline = b.to_json(results, corpus, seed=0)
+        slower = b.to_json(
+            {
+                name: result._replace(best_ns=2 * result.best_ns)
+                for name, result in results.items()
+            },
+            corpus,
+            seed=0,
+        )
+        lines = b.compare(baseline, slower)
+        self.assertEqual(len(lines), len(results))
+        self.assertTrue(all("REGRESSED" in line for line in lines))
+        self.assertFalse(
+            any("REGRESSED" in line for line in b.compare(slower, baseline))
+        )
+
+        only_hash = b.run_all(corpus, names=["hash"], loops=1, repeat=1)
+        self.assertEqual(list(only_hash), ["hash"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+
+from game import binary_history as bh
+from game import replay
+from game.test_replay import write_history
+
+
+class BinaryHistoryTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.histories = tempfile.TemporaryDirectory()
+        self.addCleanup(self.histories.cleanup)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.histories.name, name)
+
+    def test_round_trip(self) -> None:
+        write_history(self.path("game.txt"), seed=4, num_players=4)
+        history = bh.read_text(self.path("game.txt"))
+        outpath = bh.convert(self.path("game.txt"), self.histories.name)
+        self.assertEqual(outpath, self.path("game" + bh.SUFFIX))
+        self.assertTrue(bh.is_binary(outpath))
+        self.assertFalse(bh.is_binary(self.path("game.txt")))
+        self.assertLess(
+            os.path.getsize(outpath) * 2, os.path.getsize(self.path("game.txt"))
+        )
+
+        binary = bh.load(outpath)
+        self.assertEqual(binary.history(), history)
+        bh.write_text(binary.history(), self.path("copy.txt"))
+        with open(self.path("game.txt")) as f, open(self.path("copy.txt")) as copy:
+            self.assertEqual(copy.read(), f.read())
+
+    def test_random_access(self) -> None:
+        write_history(self.path("game.txt"), seed=5)
+        history = bh.read_text(self.path("game.txt"))
+        for index_interval in [1, 4, 1000]:
+            bh.write(history, self.path("game.rah"), index_interval)
+            binary = bh.load(self.path("game.rah"))
+            self.assertEqual(len(binary), len(history.moves))
+            self.assertEqual(
+                [binary.move(n) for n in range(len(binary))], history.moves
+            )
+            self.assertEqual(list(binary.moves(5, 11)), history.moves[5:11])
+            self.assertEqual(list(binary.moves(len(binary) - 2)), history.moves[-2:])
+            with self.assertRaises(IndexError):
+                binary.move(len(binary))
+
+    def test_starting_suns_and_draws(self) -> None:
+        write_history(self.path("game.txt"), seed=7)
+        history = bh.read_text(self.path("game.txt"))
+        assert history.starting_suns is not None
+        self.assertEqual(len(history.starting_suns), 3)
+        binary = bh.BinaryHistory(bh.encode(history))
+        self.assertEqual(binary.starting_suns, history.starting_suns)
+        self.assertEqual(binary.history(), history)
+
+        undealt = history._replace(starting_suns=None)
+        self.assertIsNone(bh.BinaryHistory(bh.encode(undealt)).starting_suns)
+        with self.assertRaises(ValueError):
+            bh.encode(history._replace(starting_suns=[[3, 6, 9, 12], [4]]))
+
+        # Draws only ever take the next tile of the draw order.
+        first_draw = next(
+            n for n, (_, tile) in enumerate(history.moves) if tile is not None
+        )
+        moves = list(history.moves)
+        moves[first_draw] = (moves[first_draw][0], history.draw_order[0] + 1)
+        with self.assertRaises(ValueError):
+            bh.encode(history._replace(moves=moves))
+
+    def test_replay_binary(self) -> None:
+        write_history(self.path("game.txt"), seed=6)
+        outpath = bh.convert(self.path("game.txt"), self.histories.name)
+        text, binary = replay.replay_all([self.path("game.txt"), outpath], 1)
+        self.assertIsNone(binary.error)
+        self.assertEqual(binary[1:5], text[1:5])
+
+        with open(outpath, "rb") as f:
+            data = f.read()
+        with open(self.path("truncated.rah"), "wb") as f:
+            f.write(data[:-3])
+        result = replay.replay_file(self.path("truncated.rah"))
+        self.assertIn("Truncated", result.error)
+
+
+if __name__ == "__main__":
+    unittest.main()
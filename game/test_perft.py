@@ -0,0 +1,52 @@
+import unittest
+
+from game import info as gi
+from game import perft as p
+
+# (num_players, seed, depth): leaves
+REFERENCE_COUNTS = {
+    (2, 0, 1): 2,
+    (2, 0, 4): 66,
+    (2, 0, 6): 795,
+    (3, 0, 6): 784,
+    (4, 0, 6): 290,
+    (5, 0, 6): 353,
+    (2, 1, 8): 3237,
+    (3, 1, 8): 4284,
+    (5, 1, 8): 1531,
+}
+
+
+class PerftTest(unittest.TestCase):
+    def test_reference_counts(self) -> None:
+        for (num_players, seed, depth), leaves in REFERENCE_COUNTS.items():
+            game_state = p.reference_position(num_players, seed)
+            result = p.perft(game_state, depth)
+            self.assertEqual(result.leaves, leaves, (num_players, seed, depth))
+            self.assertGreaterEqual(result.nodes, result.leaves)
+            self.assertGreater(result.nodes_per_second, 0)
+
+    def test_batch_engine_matches(self) -> None:
+        for (num_players, seed, depth), leaves in REFERENCE_COUNTS.items():
+            game_state = p.reference_position(num_players, seed)
+            self.assertEqual(
+                p.perft_batch(game_state, depth)[:2], p.perft(game_state, depth)[:2]
+            )
+
+    def test_divide(self) -> None:
+        game_state = p.reference_position(3, 0)
+        counts = p.divide(game_state, 6)
+        self.assertEqual(list(counts), [gi.DRAW, gi.AUCTION])
+        self.assertEqual(sum(counts.values()), REFERENCE_COUNTS[(3, 0, 6)])
+
+    def test_reference_position_ignores_global_random(self) -> None:
+        self.assertEqual(p.reference_position(4, 2), p.reference_position(4, 2))
+        self.assertNotEqual(p.reference_position(4, 2), p.reference_position(4, 3))
+
+    def test_depth_zero(self) -> None:
+        self.assertEqual(p.perft(p.reference_position(2), 0)[:2], (1, 0))
+        self.assertEqual(p.perft_batch(p.reference_position(2), 0)[:2], (1, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
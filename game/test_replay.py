@@ -0,0 +1,141 @@
+import os
+import random
+import tempfile
+import unittest
+from typing import List
+
+from game import info as gi
+from game import ra, replay
+from game import state as gs
+
+
+def write_history(path: str, seed: int, num_players: int = 3) -> List[int]:
+    """Writes the move history of a whole game, returning its actions."""
+    random.seed(seed)
+    player_names = [f"P{idx + 1}" for idx in range(num_players)]
+    game_state = gs.new_game(player_names)
+    draw_order = list(game_state.get_tile_bag().get_draw_order())
+    lines = [
+        " ".join(player_names),
+        " ".join(str(tile) for tile in draw_order),
+        ra.format_starting_suns(
+            player_state.get_usable_sun() for player_state in game_state.player_states
+        ),
+    ]
+    actions = []
+    while not game_state.is_game_ended():
+        legal_actions = ra.get_possible_actions(game_state)
+        assert legal_actions is not None
+        action = next(
+            (a for a in [gi.BID_NOTHING, gi.DRAW] if a in legal_actions),
+            legal_actions[0],
+        )
+        tile = ra.execute_action_internal(game_state, action, legal_actions)
+        lines.append(
+            f"{gi.DRAW_OPTIONS[0]} {tile}" if action == gi.DRAW else f"{action}"
+        )
+        actions.append(action)
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return actions
+
+
+class ReplayTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.histories = tempfile.TemporaryDirectory()
+        self.addCleanup(self.histories.cleanup)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.histories.name, name)
+
+    def test_replay_matches_ra_game(self) -> None:
+        write_history(self.path("game.txt"), seed=1)
+        result = replay.replay_file(self.path("game.txt"))
+        self.assertIsNone(result.error)
+        self.assertTrue(result.ended)
+        self.assertEqual(result.player_names, ("P1", "P2", "P3"))
+
+        self.assertFalse(result.assumed_deal)
+
+        game = ra.RaGame(["P1", "P2", "P3"], move_history_file=self.path("game.txt"))
+        game.load_actions_from_infile(self.path("game.txt"))
+        self.assertTrue(game.game_state.is_game_ended())
+        self.assertEqual(result.num_moves, len(game.logged_moves))
+        self.assertEqual(
+            result.scores,
+            tuple(
+                player_state.get_player_points()
+                for player_state in game.game_state.player_states
+            ),
+        )
+
+    def test_corrupted_histories(self) -> None:
+        write_history(self.path("good.txt"), seed=2)
+        with open(self.path("good.txt")) as f:
+            lines = f.readlines()
+        with open(self.path("illegal.txt"), "w") as f:
+            f.writelines(lines[:6] + [f"{gi.DISCARD_SPH}\n"] + lines[6:])
+        with open(self.path("wrong_tile.txt"), "w") as f:
+            f.writelines(lines[:3] + [f"{gi.DRAW} {gi.NUM_TILE_TYPES}\n"])
+        with open(self.path("truncated.txt"), "w") as f:
+            f.writelines(lines[:11])
+        with open(self.path("garbage.txt"), "w") as f:
+            f.write("P1 P2\nnot a draw order\n")
+
+        results = {
+            os.path.basename(result.path): result
+            for result in replay.replay_all(
+                replay.find_histories([self.histories.name]), max_workers=1
+            )
+        }
+        self.assertEqual(len(results), 5)
+        self.assertIsNone(results["good.txt"].error)
+        self.assertIn("move 4: illegal action", results["illegal.txt"].error)
+        self.assertEqual(results["illegal.txt"].num_moves, 3)
+        self.assertIn("move 1: drew tile", results["wrong_tile.txt"].error)
+        self.assertIsNone(results["truncated.txt"].error)
+        self.assertFalse(results["truncated.txt"].ended)
+        self.assertEqual(results["truncated.txt"].num_moves, 8)
+        self.assertIn("ValueError", results["garbage.txt"].error)
+
+        report = replay.format_report(list(results.values()), 1.0, show_scores=True)
+        self.assertIn("1 finished, 1 unfinished, 3 failed.", report)
+        self.assertIn("FAILED", report)
+        self.assertIn("(unfinished)", report)
+
+    def test_assumed_deal(self) -> None:
+        write_history(self.path("game.txt"), seed=3)
+        with open(self.path("game.txt")) as f:
+            lines = f.readlines()
+        self.assertIsNotNone(ra.parse_starting_suns(lines[2].split()))
+        # Histories written before the deal was recorded.
+        with open(self.path("old.txt"), "w") as f:
+            f.writelines(lines[:2] + lines[3:])
+
+        recorded, assumed = replay.replay_all(
+            [self.path("game.txt"), self.path("old.txt")], max_workers=1
+        )
+        self.assertFalse(recorded.assumed_deal)
+        self.assertTrue(assumed.assumed_deal)
+        self.assertIsNone(assumed.error)
+        self.assertEqual(assumed.num_moves, recorded.num_moves)
+
+        report = replay.format_report([recorded, assumed], 1.0, show_scores=True)
+        self.assertIn("1 did not record the starting suns", report)
+        flagged = [line for line in report.splitlines() if "(assumed deal)" in line]
+        self.assertEqual(len(flagged), 1)
+        self.assertTrue(flagged[0].startswith(self.path("old.txt")))
+
+    def test_replay_all_in_workers(self) -> None:
+        for seed in range(4):
+            write_history(self.path(f"game{seed}.txt"), seed, num_players=2 + seed)
+        paths = replay.find_histories([os.path.join(self.histories.name, "*.txt")])
+        self.assertEqual(len(paths), 4)
+        self.assertEqual(
+            [result[:5] for result in replay.replay_all(paths, max_workers=2)],
+            [result[:5] for result in replay.replay_all(paths, max_workers=1)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
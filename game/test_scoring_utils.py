@@ -1,8 +1,35 @@
+import random
 import unittest
+from typing import Iterable, Mapping
 
 from game import info as gi
 from game import scoring_utils
 from game import state as gs
+from game.proxy import copy
+
+
+def _simulated_value_of_auction_tiles(
+    auction_tiles: Iterable[int], p_states: Iterable[gs.PlayerState]
+) -> Mapping[int, int]:
+    """Values auction tiles by giving them to a copy of each player and rescoring."""
+    relevant_auction_tiles = [
+        tile
+        for tile in auction_tiles
+        if gi.TILE_INFO[tile]["tileType"] == gi.TileType.COLLECTIBLE
+    ]
+    values = {}
+    for p_state in copy.deepcopy(p_states):
+        p_idx = p_state.get_player_idx()
+        p_state.add_tiles(relevant_auction_tiles)
+        simulated = [other for other in p_states if other.get_player_idx() != p_idx]
+        simulated.append(p_state)
+        values[p_idx] = (
+            scoring_utils.calculate_round_end_points_gained(simulated, p_idx)[p_idx]
+            + scoring_utils.calculate_game_end_points_gained(simulated, p_idx)[p_idx]
+            - scoring_utils.calculate_round_end_points_gained(p_states, p_idx)[p_idx]
+            - scoring_utils.calculate_game_end_points_gained(p_states, p_idx)[p_idx]
+        )
+    return values
 
 
 class RaTest(unittest.TestCase):
@@ -58,6 +85,57 @@ class RaTest(unittest.TestCase):
         self.assertTrue(values3[0] == 7)
         self.assertTrue(values3[1] == 8)
 
+    def test_calculate_value_of_auction_tiles_matches_simulation(self) -> None:
+        rng = random.Random(0)
+        auctionable = [
+            idx
+            for idx, tile in enumerate(gi.TILE_INFO)
+            if tile["tileType"] != gi.TileType.RA
+        ]
+        for _ in range(500):
+            num_players = rng.randint(gi.MIN_NUM_PLAYERS, gi.MAX_NUM_PLAYERS)
+            p_states = [
+                gs.PlayerState(f"P{idx}", player_idx=idx, starting_sun=[idx + 2])
+                for idx in range(num_players)
+            ]
+            for p_state in p_states:
+                p_state.add_tiles(
+                    rng.randrange(gi.NUM_COLLECTIBLE_TILE_TYPES)
+                    for _ in range(rng.randint(0, 12))
+                )
+            auction_tiles = [rng.choice(auctionable) for _ in range(rng.randint(0, 8))]
+            self.assertEqual(
+                scoring_utils.calculate_value_of_auction_tiles(auction_tiles, p_states),
+                _simulated_value_of_auction_tiles(auction_tiles, p_states),
+            )
+
+    def test_score_game_states(self) -> None:
+        game_states = [gs.GameState(["P1", "P2", "P3"]) for _ in range(3)]
+        game_states[1].player_states[0].add_tiles(
+            [gi.INDEX_OF_PHAR, gi.INDEX_OF_FLOOD, gi.INDEX_OF_NILE, gi.INDEX_OF_FORT]
+        )
+        game_states[2].player_states[2].add_tiles([gi.INDEX_OF_GOLD] * 2)
+        game_states[2].current_round = gi.NUM_ROUNDS
+
+        scores = scoring_utils.score_game_states(game_states)
+        self.assertEqual(len(scores), 3)
+        for game_state, player_scores in zip(game_states, scores):
+            p_states = game_state.player_states
+            round_end = scoring_utils.calculate_round_end_points_gained(p_states)
+            self.assertEqual(player_scores["roundEnd"], list(round_end.values()))
+            game_end = scoring_utils.calculate_game_end_points_gained(p_states)
+            self.assertEqual(player_scores["gameEnd"], list(game_end.values()))
+            self.assertEqual(
+                player_scores["unrealized"],
+                list(
+                    scoring_utils.calculate_unrealized_points(
+                        p_states, game_state.is_final_round()
+                    ).values()
+                ),
+            )
+        self.assertEqual(scores[1]["roundEnd"], [2, -7, -7])
+        self.assertEqual(scores[2]["roundEnd"], [-2, -2, 4])
+
     def test_calculate_unrealized_points(self) -> None:
         player1_state = gs.PlayerState(
             "P1", player_idx=0, starting_sun=gi.STARTING_SUN[2][:][0]
@@ -98,6 +176,20 @@ class RaTest(unittest.TestCase):
         self.assertTrue(unrealized_points3[0] == 8)
         self.assertTrue(unrealized_points3[1] == -2)
 
+    def test_get_size_follows_slots(self) -> None:
+        game_state = gs.GameState(["P1", "P2"])
+        self.assertGreater(
+            scoring_utils.get_size(game_state),
+            sum(
+                scoring_utils.get_size(player_state)
+                for player_state in game_state.player_states
+            ),
+        )
+        self.assertGreater(
+            scoring_utils.get_size(game_state.player_states[0]),
+            scoring_utils.get_size(game_state.player_states[0].collection),
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,3 +1,4 @@
+import pickle
 import random
 import unittest
 
@@ -300,6 +301,68 @@ class PlayerStateTests(unittest.TestCase):
         self.assertEqual(p_state.get_usable_sun(), added_suns)
         self.assertEqual(sum(p_state.get_unusable_sun()), 0)
 
+    def _expected_tallies(self, p_state: gs.PlayerState) -> tuple[int, ...]:
+        civs = gi.get_civs_from_collection(p_state.get_player_collection())
+        monuments = gi.get_monuments_from_collection(p_state.get_player_collection())
+        return (
+            len([n for n in civs if n > 0]),
+            len([n for n in monuments if n > 0]),
+            sum(gi.POINTS_FOR_MON_DEPTH[n] for n in monuments),
+            sum(p_state.get_all_sun()),
+        )
+
+    def _tallies(self, p_state: gs.PlayerState) -> tuple[int, ...]:
+        return (
+            p_state.num_distinct_civs,
+            p_state.num_distinct_monuments,
+            p_state.monument_depth_points,
+            p_state.sun_total,
+        )
+
+    def test_tallies(self) -> None:
+        p_state = gs.PlayerState("Test Player", player_idx=0, starting_sun=[2, 5, 6])
+        self.assertEqual(self._tallies(p_state), (0, 0, 0, 13))
+        for _i in range(self.num_iterations):
+            kind = random.randint(0, 3)
+            idx = random.randint(0, gi.NUM_COLLECTIBLE_TILE_TYPES - 1)
+            if kind == 0 and p_state.collection[idx] < gi.index_to_starting_num(idx):
+                p_state.add_tiles([idx])
+            elif kind == 1:
+                p_state.remove_single_tiles_by_index([idx])
+            elif kind == 2 and random.random() < 0.2:
+                p_state.remove_all_tiles_by_index([idx])
+            elif kind == 3 and p_state.get_usable_sun():
+                p_state.exchange_sun(
+                    random.choice(p_state.get_usable_sun()), random.randint(1, 16)
+                )
+            self.assertEqual(self._tallies(p_state), self._expected_tallies(p_state))
+
+        p_state.make_all_suns_usable()
+        self.assertEqual(self._tallies(p_state), self._expected_tallies(p_state))
+        p_state.set_usable_sun([1, 2])
+        self.assertEqual(self._tallies(p_state), self._expected_tallies(p_state))
+
+    def test_pickle_recomputes_tallies(self) -> None:
+        p_state = gs.PlayerState("Test Player", player_idx=0, starting_sun=[2, 5, 6])
+        p_state.add_tiles([gi.INDEX_OF_ASTR, gi.INDEX_OF_FORT, gi.INDEX_OF_FORT])
+        restored = pickle.loads(pickle.dumps(p_state))
+        self.assertEqual(restored, p_state)
+        self.assertEqual(self._tallies(restored), self._tallies(p_state))
+
+        # Pickles from before the tallies existed.
+        old_keys = [
+            "collection",
+            "points",
+            "player_name",
+            "player_idx",
+            "usable_sun",
+            "unusable_sun",
+        ]
+        old_slots = {key: getattr(p_state, key) for key in old_keys}
+        restored = gs.PlayerState.shallow()
+        restored.__setstate__((None, old_slots))
+        self.assertEqual(self._tallies(restored), (1, 1, 0, 13))
+
     def test_add_points(self) -> None:
         p_state = gs.PlayerState("Test Player", player_idx=0, starting_sun=[1, 2, 3])
         current_points = p_state.get_player_points()